@@ -0,0 +1,201 @@
+#-------------------------------------
+#             Camera.py
+#-------------------------------------
+
+# Fichier contenant la caméra utilisée pour le rendu en simili-3D.
+# Informations importantes :
+# -Les tables par colonne (décalages d'angle, corrections de l'effet fish-eye) et par ligne (distance du sol vu par chaque ligne)
+#  ne sont recalculées que lorsque le fov, le nombre de colonnes ou la taille de la fenêtre changent.
+# -La résolution dynamique change le nombre de colonnes pour tenir un temps de rendu cible.
+
+# Importer les librairies
+import math
+import numpy as np
+import rasterisation as ra
+
+class Camera:
+    """Classe représentant une caméra
+    """
+
+    def __init__(self, fov: float, nb_colonnes: int, taille_fenetre: tuple) -> None:
+        """Créer une caméra
+
+        Args:
+            fov (float): champ de vision de la caméra, en degrés
+            nb_colonnes (int): nombre de colonnes (de rayons) rendues
+            taille_fenetre (tuple): taille de la fenêtre du jeu
+        """
+        self.cle_tables = None # Paramètres ayant servi à calculer les tables
+        self.fov = fov # Champ de vision de la caméra
+        self.nb_colonnes = nb_colonnes # Nombre de colonnes rendues
+        self.nb_colonnes_max = max(nb_colonnes, int(taille_fenetre[0])) # Nombre de colonnes maximum en résolution dynamique
+        self.nb_colonnes_min = min(nb_colonnes, 64) # Nombre de colonnes minimum en résolution dynamique
+        self.resolution_dynamique = False # Si le nombre de colonnes s'adapte au temps de rendu
+        self.taille_fenetre = taille_fenetre # Taille de la fenêtre du jeu
+        self.temps_rendu_cible = 1 / 120 # Temps de rendu visé en résolution dynamique, en secondes
+        self.temps_rendu_moyen = 0 # Moyenne glissante du temps de rendu
+
+        self.calculer_tables()
+
+    def ajuster_resolution(self, temps_rendu: float) -> None:
+        """Adapte le nombre de colonnes au temps de rendu de la dernière frame si la résolution dynamique est active
+
+        Args:
+            temps_rendu (float): temps de rendu de la dernière frame, en secondes
+        """
+        if not self.is_resolution_dynamique():
+            return
+
+        if self.temps_rendu_moyen <= 0: self.temps_rendu_moyen = temps_rendu
+        self.temps_rendu_moyen = self.temps_rendu_moyen * 0.9 + temps_rendu * 0.1 # Lisser pour éviter d'osciller
+        nb_colonnes = self.get_nb_colonnes()
+        if self.temps_rendu_moyen > self.get_temps_rendu_cible() * 1.1: # Trop lent, enlever des colonnes
+            nb_colonnes = int(nb_colonnes * 0.9)
+        elif self.temps_rendu_moyen < self.get_temps_rendu_cible() * 0.8: # Assez de marge, rajouter des colonnes
+            nb_colonnes = int(math.ceil(nb_colonnes * 1.05))
+        self.set_nb_colonnes(min(max(nb_colonnes, self.nb_colonnes_min), self.nb_colonnes_max))
+
+    def calculer_tables(self) -> None:
+        """Recalcule les tables par colonne si le fov, le nombre de colonnes ou la taille de la fenêtre ont changé
+        """
+        cle = (self.get_fov(), self.get_nb_colonnes(), tuple(self.get_taille_fenetre()))
+        if cle == self.cle_tables:
+            return
+        self.cle_tables = cle
+
+        fov = self.get_fov()
+        nb_colonnes = self.get_nb_colonnes()
+        decalages = np.radians(-fov / 2 + np.arange(nb_colonnes) * (fov / nb_colonnes)) # Angle de chaque colonne par rapport à l'avant
+        self.cos_decalages = np.cos(decalages)
+        self.sin_decalages = np.sin(decalages)
+        self.corrections = self.cos_decalages # Correction de l'effet fish-eye, cos(angle - angle de la colonne)
+        self.distance_ecran = self.get_taille_fenetre()[1] / 2 * math.tan(math.radians(fov / 2))
+        self.largeur_colonne = self.get_taille_fenetre()[0] / nb_colonnes
+        self.distances_lignes = ra.distances_lignes(int(self.get_taille_fenetre()[1]), self.distance_ecran) # Distance du sol vu par chaque ligne de la moitié basse
+
+    def get_corrections(self) -> np.ndarray:
+        """Retourne la correction de l'effet fish-eye de chaque colonne
+
+        Returns:
+            np.ndarray: correction de chaque colonne, de forme (nb_colonnes,)
+        """
+        return self.corrections
+
+    def get_distance_ecran(self) -> float:
+        """Retourne la distance de projection de l'écran
+
+        Returns:
+            float: distance de projection de l'écran
+        """
+        return self.distance_ecran
+
+    def get_distances_lignes(self) -> np.ndarray:
+        """Retourne la distance du sol vu par chaque ligne de la moitié basse du rendu, le plafond en étant le reflet
+
+        Returns:
+            np.ndarray: distance de chaque ligne, de forme (hauteur - hauteur // 2,)
+        """
+        return self.distances_lignes
+
+    def get_fov(self) -> float:
+        """Retourne le champ de vision de la caméra
+
+        Returns:
+            float: champ de vision de la caméra, en degrés
+        """
+        return self.fov
+
+    def get_largeur_colonne(self) -> float:
+        """Retourne la largeur d'une colonne dans la fenêtre
+
+        Returns:
+            float: largeur d'une colonne dans la fenêtre
+        """
+        return self.largeur_colonne
+
+    def get_nb_colonnes(self) -> int:
+        """Retourne le nombre de colonnes rendues
+
+        Returns:
+            int: nombre de colonnes rendues
+        """
+        return self.nb_colonnes
+
+    def get_taille_fenetre(self) -> tuple:
+        """Retourne la taille de la fenêtre du jeu
+
+        Returns:
+            tuple: taille de la fenêtre du jeu
+        """
+        return self.taille_fenetre
+
+    def get_temps_rendu_cible(self) -> float:
+        """Retourne le temps de rendu visé en résolution dynamique
+
+        Returns:
+            float: temps de rendu visé, en secondes
+        """
+        return self.temps_rendu_cible
+
+    def get_vecteurs(self, angle: float) -> np.ndarray:
+        """Retourne la direction de chaque colonne pour un angle de vue
+
+        Args:
+            angle (float): angle de vue, en degrés
+
+        Returns:
+            np.ndarray: direction de chaque colonne, de forme (nb_colonnes, 2)
+        """
+        cos_angle = math.cos(math.radians(angle))
+        sin_angle = math.sin(math.radians(angle))
+        vecteurs = np.empty((self.get_nb_colonnes(), 2))
+        vecteurs[:, 0] = cos_angle * self.cos_decalages - sin_angle * self.sin_decalages # Rotation des décalages par l'angle de vue
+        vecteurs[:, 1] = sin_angle * self.cos_decalages + cos_angle * self.sin_decalages
+        return vecteurs
+
+    def is_resolution_dynamique(self) -> bool:
+        """Retourne si la résolution dynamique est active
+
+        Returns:
+            bool: si la résolution dynamique est active
+        """
+        return self.resolution_dynamique
+
+    def set_fov(self, fov: float) -> None:
+        """Change le champ de vision de la caméra
+
+        Args:
+            fov (float): nouveau champ de vision, en degrés
+        """
+        self.fov = fov
+        self.calculer_tables()
+
+    def set_nb_colonnes(self, nb_colonnes: int) -> None:
+        """Change le nombre de colonnes rendues
+
+        Args:
+            nb_colonnes (int): nouveau nombre de colonnes
+        """
+        assert nb_colonnes > 0, ("Camera : le nombre de colonnes doit être positif.")
+        self.nb_colonnes = nb_colonnes
+        self.calculer_tables()
+
+    def set_resolution_dynamique(self, resolution_dynamique: bool, temps_rendu_cible: float = None) -> None:
+        """Active ou désactive la résolution dynamique
+
+        Args:
+            resolution_dynamique (bool): si la résolution dynamique est active
+            temps_rendu_cible (float, optionnel): temps de rendu visé en secondes, inchangé par défaut
+        """
+        self.resolution_dynamique = resolution_dynamique
+        if temps_rendu_cible != None: self.temps_rendu_cible = temps_rendu_cible
+        self.temps_rendu_moyen = 0
+
+    def set_taille_fenetre(self, taille_fenetre: tuple) -> None:
+        """Change la taille de la fenêtre du jeu
+
+        Args:
+            taille_fenetre (tuple): nouvelle taille de la fenêtre
+        """
+        self.taille_fenetre = taille_fenetre
+        self.calculer_tables()
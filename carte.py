@@ -0,0 +1,518 @@
+#-------------------------------------
+#             Carte.py
+#-------------------------------------
+
+# Fichier contenant la carte d'une scène.
+# Informations importantes :
+# -La carte est une grille dense d'identifiants de tuiles, indexée [x, y].
+# -L'identifiant 0 représente le vide, tous les autres identifiants représentent un mur.
+# -Chaque identifiant renvoie vers un Type_Tuile, partagé par toutes les cellules de ce type.
+# -Carte_Fragmentee découpe une très grande carte en fragments chargés à la demande, avec la même interface que Carte.
+
+# Importer les librairies
+from collections import OrderedDict
+import numpy as np
+import threading
+
+class Type_Tuile:
+    """Classe représentant un type de tuile, partagé par toutes les cellules de ce type
+    """
+
+    def __init__(self, nom: str, couleur_2d: tuple = (255, 0, 0), texture: str = "mur") -> None:
+        """Créer un type de tuile
+
+        Args:
+            nom (str): nom du type de tuile
+            couleur_2d (tuple, optionnel): couleur de la tuile pour un rendu 2D, par défaut à (255, 0, 0)
+            texture (str, optionnel): nom de la texture des murs de ce type, par défaut à "mur"
+        """
+        self.couleur_2d = couleur_2d # Couleur affiché sur un rendu 2D
+        self.nom = nom # Nom du type de tuile
+        self.texture = texture # Nom de la texture des murs de ce type
+
+    def get_couleur_2d(self) -> tuple:
+        """Retourne la couleur affiché sur un rendu 2D
+
+        Returns:
+            tuple: couleur affiché sur un rendu 2D
+        """
+        return self.couleur_2d
+
+    def get_nom(self) -> str:
+        """Retourne le nom du type de tuile
+
+        Returns:
+            str: nom du type de tuile
+        """
+        return self.nom
+
+    def get_texture(self) -> str:
+        """Retourne le nom de la texture des murs de ce type
+
+        Returns:
+            str: nom de la texture
+        """
+        return self.texture
+
+class Carte:
+    """Classe représentant la carte d'une scène
+    """
+
+    def __init__(self, taille: tuple, tuiles: np.ndarray = None, types_tuiles: list = None) -> None:
+        """Créer une carte, vide par défaut
+
+        Args:
+            taille (tuple): taille de la carte (largeur, hauteur)
+            tuiles (np.ndarray, optionnel): identifiants des tuiles, indexés [x, y], utilisés sans copie, par défaut du vide
+            types_tuiles (list, optionnel): table des types de tuiles, par défaut le vide et un mur
+        """
+        if tuiles is None: tuiles = np.zeros(taille, dtype=np.uint8)
+        if types_tuiles == None: types_tuiles = [Type_Tuile("vide", couleur_2d = (0, 0, 0), texture = None), Type_Tuile("mur")]
+
+        self.revision = 0 # Numéro de version des tuiles, augmenté à chaque modification
+        self.taille = taille # Taille de la carte
+        self.tuiles = tuiles # Identifiants des tuiles de la carte, indexés [x, y]
+        self.types_tuiles = types_tuiles # Table des types de tuiles, l'identifiant étant l'indice
+
+    def ajouter_type_tuile(self, type_tuile: Type_Tuile) -> int:
+        """Ajoute un type de tuile dans la carte et retourne son identifiant
+
+        Args:
+            type_tuile (Type_Tuile): type de tuile à ajouter
+
+        Returns:
+            int: identifiant du type de tuile
+        """
+        self.get_types_tuiles().append(type_tuile)
+        identifiant = len(self.get_types_tuiles()) - 1
+        if identifiant > np.iinfo(self.tuiles.dtype).max: # Agrandir les identifiants si besoin, la grille étant alors remplacée
+            self.tuiles = self.tuiles.astype(np.uint16)
+            self.revision += 1
+        return identifiant
+
+    def charger_tuiles(self, tuiles: np.ndarray) -> None:
+        """Remplace toutes les tuiles de la carte en une fois, en créant un type de mur pour chaque identifiant inconnu
+
+        Args:
+            tuiles (np.ndarray): identifiants des tuiles, indexés [x, y], de la taille de la carte
+        """
+        assert tuple(tuiles.shape) == tuple(self.get_taille()), ("Carte : les tuiles à charger n'ont pas la taille de la carte.")
+        maximum = int(tuiles.max()) if tuiles.size > 0 else 0
+        while len(self.get_types_tuiles()) <= maximum: # Créer les types de mur manquants
+            self.ajouter_type_tuile(Type_Tuile("mur " + str(len(self.get_types_tuiles()))))
+        self.tuiles = np.ascontiguousarray(tuiles, dtype=self.tuiles.dtype)
+        self.revision += 1
+
+    def est_dans_carte(self, x: int, y: int) -> bool:
+        """Retourne si une cellule est dans la carte
+
+        Args:
+            x (int): coordonnée x de la cellule
+            y (int): coordonnée y de la cellule
+
+        Returns:
+            bool: si la cellule est dans la carte
+        """
+        return x >= 0 and x < self.get_taille()[0] and y >= 0 and y < self.get_taille()[1]
+
+    def get_region(self, x_debut: int, y_debut: int, x_fin: int, y_fin: int) -> np.ndarray:
+        """Retourne les tuiles d'une région de la carte
+
+        Args:
+            x_debut (int): coordonnée x du début de la région
+            y_debut (int): coordonnée y du début de la région
+            x_fin (int): coordonnée x de la fin de la région, exclue
+            y_fin (int): coordonnée y de la fin de la région, exclue
+
+        Returns:
+            np.ndarray: tuiles de la région, indexées [x, y] dans la région
+        """
+        return self.tuiles[x_debut:x_fin, y_debut:y_fin]
+
+    def get_revision(self) -> int:
+        """Retourne le numéro de version des tuiles, qui change à chaque modification de la carte
+
+        Returns:
+            int: numéro de version des tuiles
+        """
+        return self.revision
+
+    def get_taille(self) -> tuple:
+        """Retourne la taille de la carte
+
+        Returns:
+            tuple: taille de la carte
+        """
+        return self.taille
+
+    def get_tuile(self, x: int, y: int) -> int:
+        """Retourne l'identifiant de la tuile d'une cellule
+
+        Args:
+            x (int): coordonnée x de la cellule
+            y (int): coordonnée y de la cellule
+
+        Returns:
+            int: identifiant de la tuile
+        """
+        return int(self.tuiles[x, y])
+
+    def get_tuiles(self) -> np.ndarray:
+        """Retourne la grille des identifiants de tuiles, indexée [x, y]
+
+        Returns:
+            np.ndarray: grille des identifiants de tuiles
+        """
+        return self.tuiles
+
+    def get_tuiles_cellules(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Retourne les identifiants des tuiles de plusieurs cellules
+
+        Args:
+            x (np.ndarray): coordonnées x des cellules
+            y (np.ndarray): coordonnées y des cellules
+
+        Returns:
+            np.ndarray: identifiants des tuiles
+        """
+        return self.tuiles[x, y]
+
+    def get_type_tuile(self, identifiant: int) -> Type_Tuile:
+        """Retourne un type de tuile selon son identifiant
+
+        Args:
+            identifiant (int): identifiant du type de tuile
+
+        Returns:
+            Type_Tuile: type de tuile
+        """
+        return self.get_types_tuiles()[identifiant]
+
+    def get_types_tuiles(self) -> list:
+        """Retourne la table des types de tuiles
+
+        Returns:
+            list: table des types de tuiles
+        """
+        return self.types_tuiles
+
+    def precharger_autour(self, position: tuple, rayon: float) -> None:
+        """Charge les tuiles autour d'une position, rien à faire pour une carte entièrement en mémoire
+
+        Args:
+            position (tuple): position autour de laquelle charger
+            rayon (float): distance à couvrir autour de la position, en cellules
+        """
+
+    def set_tuile(self, x: int, y: int, identifiant: int) -> None:
+        """Change la tuile d'une cellule
+
+        Args:
+            x (int): coordonnée x de la cellule
+            y (int): coordonnée y de la cellule
+            identifiant (int): identifiant de la nouvelle tuile
+        """
+        assert self.est_dans_carte(x, y), ("Carte : la cellule (" + str(x) + ", " + str(y) + ") est hors de la carte.")
+        assert identifiant >= 0 and identifiant < len(self.get_types_tuiles()), ("Carte : le type de tuile " + str(identifiant) + " n'existe pas.")
+        self.tuiles[x, y] = identifiant
+        self.revision += 1
+
+    def vider(self) -> None:
+        """Rempli la carte avec du vide
+        """
+        self.tuiles.fill(0)
+        self.revision += 1
+
+class Vue_Fragments:
+    """Classe permettant de lire les tuiles d'une carte fragmentée comme un tableau NumPy indexé [x, y]
+    """
+
+    def __init__(self, carte, taille: tuple, type_donnee: np.dtype) -> None:
+        """Créer une vue sur les tuiles d'une carte fragmentée
+
+        Args:
+            carte (Carte_Fragmentee): carte fragmentée lue par la vue
+            taille (tuple): taille de la carte (largeur, hauteur)
+            type_donnee (np.dtype): type des identifiants de tuiles
+        """
+        self.carte = carte # Carte fragmentée lue par la vue
+        self.dtype = type_donnee # Type des identifiants de tuiles, comme un tableau NumPy
+        self.shape = tuple(taille) # Taille de la carte, comme un tableau NumPy
+
+    def __array__(self, dtype: np.dtype = None, copy: bool = None) -> np.ndarray:
+        """Retourne toutes les tuiles de la carte dans un tableau, en chargeant tous les fragments
+
+        Returns:
+            np.ndarray: identifiants des tuiles, indexés [x, y]
+        """
+        tuiles = self.carte.get_region(0, 0, self.shape[0], self.shape[1])
+        return tuiles if dtype == None else tuiles.astype(dtype)
+
+    def __getitem__(self, cle: tuple):
+        """Retourne les tuiles d'une cellule, de cellules (tableaux de coordonnées) ou d'une région (tranches)
+
+        Args:
+            cle (tuple): coordonnées x et y
+
+        Returns:
+            identifiant de la tuile, ou tableau des identifiants
+        """
+        x, y = cle
+        if isinstance(x, slice) or isinstance(y, slice): # Région de la carte
+            debut_x, fin_x, _ = (x if isinstance(x, slice) else slice(x, x + 1)).indices(self.shape[0])
+            debut_y, fin_y, _ = (y if isinstance(y, slice) else slice(y, y + 1)).indices(self.shape[1])
+            region = self.carte.get_region(debut_x, debut_y, fin_x, fin_y)
+            return region[:, 0] if not isinstance(y, slice) else (region[0] if not isinstance(x, slice) else region)
+        if np.ndim(x) == 0 and np.ndim(y) == 0: # Une seule cellule
+            return self.carte.get_tuile(int(x), int(y))
+        return self.carte.get_tuiles_cellules(np.asarray(x), np.asarray(y))
+
+class Carte_Fragmentee(Carte):
+    """Classe représentant une carte découpée en fragments carrés, chargés à la demande et oubliés quand la mémoire manque
+    """
+
+    def __init__(self, taille: tuple, source, taille_fragment: int = 64, budget_memoire: int = 64 * 1024 * 1024, types_tuiles: list = None, type_donnee: np.dtype = np.uint8) -> None:
+        """Créer une carte fragmentée
+
+        Args:
+            taille (tuple): taille de la carte (largeur, hauteur)
+            source: fonction (x_debut, y_debut, x_fin, y_fin) -> np.ndarray retournant les tuiles d'une région, None pour une carte vide
+            taille_fragment (int, optionnel): côté d'un fragment en cellules, par défaut à 64
+            budget_memoire (int, optionnel): mémoire maximum occupée par les fragments non modifiés, en octets, par défaut à 64 Mo
+            types_tuiles (list, optionnel): table des types de tuiles, par défaut le vide et un mur
+            type_donnee (np.dtype, optionnel): type des identifiants de tuiles, par défaut à np.uint8
+        """
+        type_donnee = np.dtype(type_donnee)
+        super().__init__(taille, tuiles = Vue_Fragments(self, taille, type_donnee), types_tuiles = types_tuiles)
+
+        self.budget_memoire = budget_memoire # Mémoire maximum occupée par les fragments non modifiés
+        self.fragments = OrderedDict() # Fragments chargés, de clé leur position, du moins au plus récemment utilisé
+        self.fragments_modifies = {} # Fragments modifiés, gardés en mémoire pour ne pas perdre les modifications
+        self.verrou = threading.RLock() # Verrou des fragments, la carte pouvant être lue par plusieurs fils de rendu
+        self.nb_chargements = 0 # Nombre de fragments chargés depuis la source
+        self.source = source # Fonction retournant les tuiles d'une région
+        self.taille_fragment = taille_fragment # Côté d'un fragment en cellules
+        self.type_donnee = type_donnee # Type des identifiants de tuiles
+
+    def ajouter_type_tuile(self, type_tuile: Type_Tuile) -> int:
+        """Ajoute un type de tuile dans la carte et retourne son identifiant
+
+        Args:
+            type_tuile (Type_Tuile): type de tuile à ajouter
+
+        Returns:
+            int: identifiant du type de tuile
+        """
+        assert len(self.get_types_tuiles()) <= np.iinfo(self.type_donnee).max, ("Carte fragmentée : trop de types de tuiles pour le type des identifiants.")
+        self.get_types_tuiles().append(type_tuile)
+        return len(self.get_types_tuiles()) - 1
+
+    def charger_tuiles(self, tuiles: np.ndarray) -> None:
+        """Remplace toutes les tuiles de la carte, qui sont ensuite lues fragment par fragment
+
+        Args:
+            tuiles (np.ndarray): identifiants des tuiles, indexés [x, y], de la taille de la carte
+        """
+        assert tuple(tuiles.shape) == tuple(self.get_taille()), ("Carte fragmentée : les tuiles à charger n'ont pas la taille de la carte.")
+        maximum = int(tuiles.max()) if tuiles.size > 0 else 0
+        while len(self.get_types_tuiles()) <= maximum: # Créer les types de mur manquants
+            self.ajouter_type_tuile(Type_Tuile("mur " + str(len(self.get_types_tuiles()))))
+        self.source = lambda x_debut, y_debut, x_fin, y_fin: tuiles[x_debut:x_fin, y_debut:y_fin]
+        self.fragments.clear()
+        self.fragments_modifies.clear()
+        self.revision += 1
+
+    def get_fragment(self, fragment_x: int, fragment_y: int) -> np.ndarray:
+        """Retourne un fragment, en le chargeant depuis la source si besoin
+
+        Args:
+            fragment_x (int): coordonnée x du fragment
+            fragment_y (int): coordonnée y du fragment
+
+        Returns:
+            np.ndarray: tuiles du fragment, indexées [x, y] dans le fragment
+        """
+        assert 0 <= fragment_x * self.taille_fragment < self.get_taille()[0] and 0 <= fragment_y * self.taille_fragment < self.get_taille()[1], ("Carte fragmentée : le fragment (" + str(fragment_x) + ", " + str(fragment_y) + ") est hors de la carte.")
+        with self.verrou:
+            cle = (fragment_x, fragment_y)
+            fragment = self.fragments_modifies.get(cle)
+            if fragment is not None:
+                return fragment
+            fragment = self.fragments.get(cle)
+            if fragment is not None: # Fragment déjà chargé
+                self.fragments.move_to_end(cle)
+                return fragment
+
+            # Charger le fragment depuis la source
+            taille = self.get_taille()
+            x_debut, y_debut = fragment_x * self.taille_fragment, fragment_y * self.taille_fragment
+            x_fin, y_fin = min(x_debut + self.taille_fragment, taille[0]), min(y_debut + self.taille_fragment, taille[1])
+            if self.source == None:
+                fragment = np.zeros((x_fin - x_debut, y_fin - y_debut), dtype=self.type_donnee)
+            else:
+                fragment = np.array(self.source(x_debut, y_debut, x_fin, y_fin), dtype=self.type_donnee)
+            self.fragments[cle] = fragment
+            self.nb_chargements += 1
+
+            # Oublier les fragments les moins récemment utilisés au-delà du budget, en gardant celui-ci
+            octets_fragment = self.taille_fragment * self.taille_fragment * self.type_donnee.itemsize
+            while len(self.fragments) > 1 and len(self.fragments) * octets_fragment > self.budget_memoire:
+                self.fragments.popitem(last = False)
+            return fragment
+
+    def get_memoire_utilisee(self) -> int:
+        """Retourne la mémoire occupée par les fragments chargés
+
+        Returns:
+            int: mémoire occupée, en octets
+        """
+        return sum(fragment.nbytes for fragment in self.fragments.values()) + sum(fragment.nbytes for fragment in self.fragments_modifies.values())
+
+    def get_nb_chargements(self) -> int:
+        """Retourne le nombre de fragments chargés depuis la source
+
+        Returns:
+            int: nombre de fragments chargés
+        """
+        return self.nb_chargements
+
+    def get_nb_fragments(self) -> int:
+        """Retourne le nombre de fragments en mémoire
+
+        Returns:
+            int: nombre de fragments en mémoire
+        """
+        return len(self.fragments) + len(self.fragments_modifies)
+
+    def get_region(self, x_debut: int, y_debut: int, x_fin: int, y_fin: int) -> np.ndarray:
+        """Retourne les tuiles d'une région de la carte
+
+        Args:
+            x_debut (int): coordonnée x du début de la région
+            y_debut (int): coordonnée y du début de la région
+            x_fin (int): coordonnée x de la fin de la région, exclue
+            y_fin (int): coordonnée y de la fin de la région, exclue
+
+        Returns:
+            np.ndarray: tuiles de la région, indexées [x, y] dans la région
+        """
+        region = np.zeros((max(x_fin - x_debut, 0), max(y_fin - y_debut, 0)), dtype=self.type_donnee)
+        t = self.taille_fragment
+        for fragment_x in range(x_debut // t, (x_fin - 1) // t + 1):
+            for fragment_y in range(y_debut // t, (y_fin - 1) // t + 1):
+                fragment = self.get_fragment(fragment_x, fragment_y)
+                x0, y0 = max(x_debut, fragment_x * t), max(y_debut, fragment_y * t)
+                x1, y1 = min(x_fin, fragment_x * t + fragment.shape[0]), min(y_fin, fragment_y * t + fragment.shape[1])
+                region[x0 - x_debut:x1 - x_debut, y0 - y_debut:y1 - y_debut] = fragment[x0 - fragment_x * t:x1 - fragment_x * t, y0 - fragment_y * t:y1 - fragment_y * t]
+        return region
+
+    def get_tuile(self, x: int, y: int) -> int:
+        """Retourne l'identifiant de la tuile d'une cellule
+
+        Args:
+            x (int): coordonnée x de la cellule
+            y (int): coordonnée y de la cellule
+
+        Returns:
+            int: identifiant de la tuile
+        """
+        t = self.taille_fragment
+        return int(self.get_fragment(x // t, y // t)[x % t, y % t])
+
+    def get_tuiles_cellules(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Retourne les identifiants des tuiles de plusieurs cellules, en chargeant chaque fragment touché une seule fois
+
+        Args:
+            x (np.ndarray): coordonnées x des cellules
+            y (np.ndarray): coordonnées y des cellules
+
+        Returns:
+            np.ndarray: identifiants des tuiles
+        """
+        x, y = np.broadcast_arrays(x, y)
+        retour = np.zeros(x.shape, dtype=self.type_donnee)
+        if x.size == 0:
+            return retour
+        assert x.min() >= 0 and y.min() >= 0 and x.max() < self.get_taille()[0] and y.max() < self.get_taille()[1], ("Carte fragmentée : des cellules sont hors de la carte.")
+        t = self.taille_fragment
+        fragments_x, fragments_y = x // t, y // t
+        cles = fragments_x.ravel() * (self.get_taille()[1] // t + 1) + fragments_y.ravel()
+        if cles.min() == cles.max(): # Toutes les cellules dans le même fragment, cas le plus courant
+            fragment = self.get_fragment(int(fragments_x.flat[0]), int(fragments_y.flat[0]))
+            return fragment[x % t, y % t]
+        ordre = np.argsort(cles, kind = "stable") # Regrouper les cellules par fragment
+        x_tries, y_tries, cles_triees = x.ravel()[ordre], y.ravel()[ordre], cles[ordre]
+        limites = np.flatnonzero(np.diff(cles_triees)) + 1
+        plat = retour.reshape(-1)
+        for debut, fin in zip(np.concatenate(([0], limites)), np.concatenate((limites, [len(cles_triees)]))): # Lire chaque fragment touché
+            fragment = self.get_fragment(int(x_tries[debut]) // t, int(y_tries[debut]) // t)
+            plat[ordre[debut:fin]] = fragment[x_tries[debut:fin] % t, y_tries[debut:fin] % t]
+        return retour
+
+    def get_tuiles_grille(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Retourne les tuiles d'une grille de cellules, chaque x avec chaque y, lues ligne par ligne directement depuis la source :
+        aucun fragment n'est chargé ni oublié, pour échantillonner toute la carte (la minicarte) sans vider le cache des fragments
+
+        Args:
+            x (np.ndarray): coordonnées x des lignes de la grille
+            y (np.ndarray): coordonnées y des colonnes de la grille
+
+        Returns:
+            np.ndarray: identifiants des tuiles, de forme (len(x), len(y))
+        """
+        x, y = np.asarray(x, dtype=np.intp), np.asarray(y, dtype=np.intp)
+        retour = np.zeros((len(x), len(y)), dtype=self.type_donnee)
+        if len(x) == 0 or len(y) == 0:
+            return retour
+        assert x.min() >= 0 and y.min() >= 0 and x.max() < self.get_taille()[0] and y.max() < self.get_taille()[1], ("Carte fragmentée : des cellules sont hors de la carte.")
+        with self.verrou:
+            if self.source != None:
+                y_debut, y_fin = int(y.min()), int(y.max()) + 1
+                for i, cellule_x in enumerate(x.tolist()): # Une seule ligne de la source en mémoire à la fois
+                    retour[i] = np.asarray(self.source(cellule_x, y_debut, cellule_x + 1, y_fin))[0, y - y_debut]
+            t = self.taille_fragment
+            for (fragment_x, fragment_y), fragment in self.fragments_modifies.items(): # Les modifications ne sont pas dans la source
+                lignes, colonnes = np.flatnonzero(x // t == fragment_x), np.flatnonzero(y // t == fragment_y)
+                if len(lignes) > 0 and len(colonnes) > 0:
+                    retour[np.ix_(lignes, colonnes)] = fragment[np.ix_(x[lignes] % t, y[colonnes] % t)]
+        return retour
+
+    def precharger_autour(self, position: tuple, rayon: float) -> None:
+        """Charge les fragments autour d'une position, par exemple celle du joueur
+
+        Args:
+            position (tuple): position autour de laquelle charger
+            rayon (float): distance à couvrir autour de la position, en cellules
+        """
+        taille = self.get_taille()
+        t = self.taille_fragment
+        for fragment_x in range(max(int(position[0] - rayon), 0) // t, min(int(position[0] + rayon), taille[0] - 1) // t + 1):
+            for fragment_y in range(max(int(position[1] - rayon), 0) // t, min(int(position[1] + rayon), taille[1] - 1) // t + 1):
+                self.get_fragment(fragment_x, fragment_y)
+
+    def set_tuile(self, x: int, y: int, identifiant: int) -> None:
+        """Change la tuile d'une cellule, le fragment modifié restant alors en mémoire
+
+        Args:
+            x (int): coordonnée x de la cellule
+            y (int): coordonnée y de la cellule
+            identifiant (int): identifiant de la nouvelle tuile
+        """
+        assert self.est_dans_carte(x, y), ("Carte fragmentée : la cellule (" + str(x) + ", " + str(y) + ") est hors de la carte.")
+        assert identifiant >= 0 and identifiant < len(self.get_types_tuiles()), ("Carte : le type de tuile " + str(identifiant) + " n'existe pas.")
+        t = self.taille_fragment
+        cle = (x // t, y // t)
+        fragment = self.get_fragment(cle[0], cle[1])
+        if cle not in self.fragments_modifies: # Ne plus oublier ce fragment
+            self.fragments.pop(cle, None)
+            self.fragments_modifies[cle] = fragment
+        fragment[x % t, y % t] = identifiant
+        self.revision += 1
+
+    def vider(self) -> None:
+        """Rempli la carte avec du vide
+        """
+        self.source = None
+        self.fragments.clear()
+        self.fragments_modifies.clear()
+        self.revision += 1
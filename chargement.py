@@ -0,0 +1,127 @@
+#-------------------------------------
+#            Chargement.py
+#-------------------------------------
+
+# Fichier contenant le préchargement d'une scène en arrière-plan.
+# Informations importantes :
+# -Un fil d'exécution travailleur lit la carte et construit tout ce qui ne dépend pas de pygame (carte, index spatial, stock
+#  des entités, scène physique, champ de distance aux murs), en rapportant son étape et sa progression.
+# -Les surfaces pygame (scène graphique, textures) ne sont créées que sur le fil principal, par Scene.finaliser,
+#  quand le moteur de jeu voit que le travailleur a fini : la boucle de rendu n'attend jamais le chargement.
+# -Une erreur du travailleur est relancée sur le fil principal, au moment de finaliser.
+
+# Importer les librairies
+from concurrent.futures import Future
+import threading
+
+class Chargement:
+    """Classe représentant le préchargement d'une scène
+    """
+
+    def __init__(self, nom: str) -> None:
+        """Créer un préchargement, pas encore lancé
+
+        Args:
+            nom (str): nom de la scène chargée
+        """
+        self.etape = "attente" # Étape en cours du chargement
+        self.futur = None # Résultat du travailleur, la scène pas encore finalisée
+        self.nom = nom # Nom de la scène chargée
+        self.progression = 0 # Avancée du chargement, entre 0 et 1
+        self.scene = None # Scène finalisée, None tant qu'elle n'est pas prête
+        self.verrou = threading.Lock() # Verrou de l'étape et de la progression, écrites par le travailleur
+
+    def attendre(self, temps_max: float = None):
+        """Attend la fin du travailleur et retourne la scène, finalisée ou non
+
+        Args:
+            temps_max (float, optionnel): temps d'attente maximum, en secondes, sans limite si None
+
+        Returns:
+            sc.Scene: scène chargée, l'erreur du travailleur étant relancée s'il y en a eu une
+        """
+        return self.futur.result(temps_max)
+
+    def finaliser(self):
+        """Finalise la scène chargée sur le fil principal et la retourne, le travailleur devant avoir fini
+
+        Returns:
+            sc.Scene: scène prête à être jouée
+        """
+        assert self.is_fini(), ("Chargement \"" + self.nom + "\" : la scène ne peut pas être finalisée avant la fin du travailleur.")
+        if self.scene == None:
+            scene = self.attendre()
+            self.rapporter("finalisation", 0.9)
+            scene.finaliser()
+            self.scene = scene
+            self.rapporter("pret", 1)
+        return self.scene
+
+    def get_etape(self) -> str:
+        """Retourne l'étape en cours du chargement
+
+        Returns:
+            str: étape en cours ("attente", "lecture", "structures", "distances", "visibilite", "finalisation" ou "pret")
+        """
+        with self.verrou:
+            return self.etape
+
+    def get_nom(self) -> str:
+        """Retourne le nom de la scène chargée
+
+        Returns:
+            str: nom de la scène
+        """
+        return self.nom
+
+    def get_progression(self) -> float:
+        """Retourne l'avancée du chargement
+
+        Returns:
+            float: avancée du chargement, entre 0 et 1
+        """
+        with self.verrou:
+            return self.progression
+
+    def get_scene(self):
+        """Retourne la scène finalisée
+
+        Returns:
+            sc.Scene: scène prête à être jouée, None si elle n'est pas encore finalisée
+        """
+        return self.scene
+
+    def is_fini(self) -> bool:
+        """Retourne si le travailleur a fini, avec ou sans erreur
+
+        Returns:
+            bool: si le travailleur a fini
+        """
+        return self.futur != None and self.futur.done()
+
+    def is_pret(self) -> bool:
+        """Retourne si la scène est finalisée et prête à être jouée
+
+        Returns:
+            bool: si la scène est prête
+        """
+        return self.scene != None
+
+    def rapporter(self, etape: str, progression: float) -> None:
+        """Change l'étape en cours et la progression du chargement, appelé depuis le travailleur
+
+        Args:
+            etape (str): étape en cours
+            progression (float): avancée du chargement, entre 0 et 1
+        """
+        with self.verrou:
+            self.etape = etape
+            self.progression = progression
+
+    def set_futur(self, futur: Future) -> None:
+        """Change le résultat attendu du travailleur
+
+        Args:
+            futur (Future): résultat du travailleur, la scène pas encore finalisée
+        """
+        self.futur = futur
@@ -0,0 +1,322 @@
+#-------------------------------------
+#             Entites.py
+#-------------------------------------
+
+# Fichier contenant le stock des entités d'une scène.
+# Informations importantes :
+# -Les positions, angles, vitesses, mouvements et vecteurs avant de toutes les entités sont rangés dans des tableaux NumPy
+#  contigus, une ligne par entité : un Objet n'est qu'une vue (son stock et sa ligne) sur ces tableaux.
+# -Une étape de simulation déplace et tourne toutes les entités qui ont une vitesse en une seule opération (voir integrer),
+#  sans boucle par entité.
+# -Le corps physique d'une entité (taille, forme, vitesse et déplacement demandé) est rangé dans les mêmes tableaux : la scène
+#  physique déplace tous les corps d'un stock ensemble (voir Scene_Physique.deplacer).
+# -La pose de chaque entité à l'étape précédente est gardée : le rendu interpole toutes les entités ensemble entre les deux étapes
+#  (voir interpoler_poses).
+# -Les tableaux doublent de taille quand ils sont pleins, les lignes des entités retirées sont réutilisées.
+
+# Importer les librairies
+import numpy as np
+
+class Stock_Entites:
+    """Classe représentant le stock des entités d'une scène, en tableaux NumPy
+    """
+
+    def __init__(self, capacite: int = 64) -> None:
+        """Créer un stock d'entités vide
+
+        Args:
+            capacite (int, optionnel): nombre d'entités avant le premier agrandissement des tableaux, par défaut à 64
+        """
+        assert capacite > 0, ("Stock d'entités : la capacité doit être positive.")
+
+        self.angles = np.zeros(capacite) # Angle de chaque entité, en degrés
+        self.angles_precedents = np.zeros(capacite) # Angle de chaque entité à l'étape de simulation précédente
+        self.cercles = np.zeros(capacite, dtype=bool) # Si le corps de chaque entité est un cercle, sinon une boîte
+        self.corps = np.zeros(capacite, dtype=bool) # Si chaque entité a un corps physique, qui la déplace avec les collisions à la place du stock
+        self.deplacements = np.zeros((capacite, 3)) # Déplacement du corps de chaque entité demandé depuis la dernière étape de la physique
+        self.lignes_libres = [] # Lignes des entités retirées, à réutiliser
+        self.mouvements = np.zeros((capacite, 3)) # Dernier mouvement de chaque entité
+        self.nb_lignes = 0 # Nombre de lignes utilisées, entités retirées comprises
+        self.objets = np.full(capacite, None, dtype=object) # Objet de chaque ligne, None si la ligne est libre
+        self.positions = np.zeros((capacite, 3)) # Position de chaque entité
+        self.positions_precedentes = np.zeros((capacite, 3)) # Position de chaque entité à l'étape de simulation précédente
+        self.tailles_corps = np.zeros(capacite) # Rayon du cercle ou demi-côté de la boîte du corps de chaque entité
+        self.utilisees = np.zeros(capacite, dtype=bool) # Si chaque ligne contient une entité
+        self.vecteurs_avant = np.zeros((capacite, 3)) # Vecteur pour aller en avant de chaque entité
+        self.vitesses = np.zeros((capacite, 3)) # Vitesse de chaque entité, en cellules par seconde
+        self.vitesses_corps = np.zeros((capacite, 3)) # Vitesse propre du corps de chaque entité, ajoutée à celle de l'entité, en cellules par seconde
+        self.vitesses_angulaires = np.zeros(capacite) # Vitesse de rotation de chaque entité, en degrés par seconde
+
+    def __len__(self) -> int:
+        """Retourne le nombre d'entités dans le stock
+
+        Returns:
+            int: nombre d'entités
+        """
+        return self.nb_lignes - len(self.lignes_libres)
+
+    def agrandir(self) -> None:
+        """Double la taille des tableaux du stock
+        """
+        capacite = len(self.utilisees) * 2
+        for nom in ("angles", "angles_precedents", "cercles", "corps", "deplacements", "mouvements", "objets", "positions", "positions_precedentes", "tailles_corps", "utilisees", "vecteurs_avant", "vitesses", "vitesses_angulaires", "vitesses_corps"):
+            ancien = getattr(self, nom)
+            nouveau = np.full((capacite,) + ancien.shape[1:], None if ancien.dtype == object else 0, dtype=ancien.dtype)
+            nouveau[:len(ancien)] = ancien
+            setattr(self, nom, nouveau)
+
+    def ajouter(self, objet, position: tuple, angle: float = 0) -> int:
+        """Ajoute une entité dans le stock et retourne sa ligne
+
+        Args:
+            objet (ob.Objet): vue de l'entité
+            position (tuple): position de l'entité
+            angle (float, optionnel): angle de l'entité, par défaut à 0
+
+        Returns:
+            int: ligne de l'entité dans les tableaux
+        """
+        if len(self.lignes_libres) > 0:
+            ligne = self.lignes_libres.pop()
+        else:
+            if self.nb_lignes == len(self.utilisees): self.agrandir()
+            ligne = self.nb_lignes
+            self.nb_lignes += 1
+
+        self.objets[ligne] = objet
+        self.utilisees[ligne] = True
+        self.positions[ligne] = position
+        self.positions_precedentes[ligne] = position
+        self.angles[ligne] = angle
+        self.angles_precedents[ligne] = angle
+        self.corps[ligne] = False
+        self.deplacements[ligne] = 0
+        self.mouvements[ligne] = 0
+        self.vitesses[ligne] = 0
+        self.vitesses_angulaires[ligne] = 0
+        self.vitesses_corps[ligne] = 0
+        self.calculer_vecteurs(np.array([ligne]))
+        return ligne
+
+    def calculer_vecteurs(self, lignes: np.ndarray) -> None:
+        """Recalcule les vecteurs avant de plusieurs entités selon leur angle
+
+        Args:
+            lignes (np.ndarray): lignes des entités
+        """
+        radians = np.radians(self.angles[lignes])
+        self.vecteurs_avant[lignes, 0] = np.cos(radians)
+        self.vecteurs_avant[lignes, 1] = np.sin(radians)
+        self.vecteurs_avant[lignes, 2] = 0
+
+    def get_angles(self) -> np.ndarray:
+        """Retourne l'angle de chaque ligne
+
+        Returns:
+            np.ndarray: angles, en degrés
+        """
+        return self.angles
+
+    def get_angles_precedents(self) -> np.ndarray:
+        """Retourne l'angle de chaque ligne à l'étape de simulation précédente
+
+        Returns:
+            np.ndarray: angles précédents, en degrés
+        """
+        return self.angles_precedents
+
+    def get_cercles(self) -> np.ndarray:
+        """Retourne si le corps de chaque ligne est un cercle
+
+        Returns:
+            np.ndarray: si chaque corps est un cercle, sinon une boîte
+        """
+        return self.cercles
+
+    def get_corps(self) -> np.ndarray:
+        """Retourne si chaque entité a un corps physique
+
+        Returns:
+            np.ndarray: si chaque entité a un corps physique
+        """
+        return self.corps
+
+    def get_deplacements(self) -> np.ndarray:
+        """Retourne le déplacement demandé du corps de chaque ligne depuis la dernière étape de la physique
+
+        Returns:
+            np.ndarray: déplacements demandés, de forme (capacité, 3)
+        """
+        return self.deplacements
+
+    def get_lignes_corps(self) -> np.ndarray:
+        """Retourne les lignes contenant une entité ayant un corps physique
+
+        Returns:
+            np.ndarray: lignes des corps du stock
+        """
+        n = self.nb_lignes
+        return np.flatnonzero(self.utilisees[:n] & self.corps[:n])
+
+    def get_lignes_utilisees(self) -> np.ndarray:
+        """Retourne les lignes contenant une entité
+
+        Returns:
+            np.ndarray: lignes des entités du stock
+        """
+        return np.flatnonzero(self.utilisees[:self.nb_lignes])
+
+    def get_mouvements(self) -> np.ndarray:
+        """Retourne le dernier mouvement de chaque ligne
+
+        Returns:
+            np.ndarray: mouvements, de forme (capacité, 3)
+        """
+        return self.mouvements
+
+    def get_objets(self) -> np.ndarray:
+        """Retourne la vue de l'entité de chaque ligne
+
+        Returns:
+            np.ndarray: objets, None pour une ligne libre
+        """
+        return self.objets
+
+    def get_positions(self) -> np.ndarray:
+        """Retourne la position de chaque ligne
+
+        Returns:
+            np.ndarray: positions, de forme (capacité, 3)
+        """
+        return self.positions
+
+    def get_positions_precedentes(self) -> np.ndarray:
+        """Retourne la position de chaque ligne à l'étape de simulation précédente
+
+        Returns:
+            np.ndarray: positions précédentes, de forme (capacité, 3)
+        """
+        return self.positions_precedentes
+
+    def get_tailles_corps(self) -> np.ndarray:
+        """Retourne la taille du corps de chaque ligne
+
+        Returns:
+            np.ndarray: rayons des cercles ou demi-côtés des boîtes
+        """
+        return self.tailles_corps
+
+    def get_vecteurs_avant(self) -> np.ndarray:
+        """Retourne le vecteur avant de chaque ligne
+
+        Returns:
+            np.ndarray: vecteurs avant, de forme (capacité, 3)
+        """
+        return self.vecteurs_avant
+
+    def get_vitesses(self) -> np.ndarray:
+        """Retourne la vitesse de chaque ligne
+
+        Returns:
+            np.ndarray: vitesses en cellules par seconde, de forme (capacité, 3)
+        """
+        return self.vitesses
+
+    def get_vitesses_angulaires(self) -> np.ndarray:
+        """Retourne la vitesse de rotation de chaque ligne
+
+        Returns:
+            np.ndarray: vitesses de rotation, en degrés par seconde
+        """
+        return self.vitesses_angulaires
+
+    def get_vitesses_corps(self) -> np.ndarray:
+        """Retourne la vitesse propre du corps de chaque ligne
+
+        Returns:
+            np.ndarray: vitesses des corps en cellules par seconde, de forme (capacité, 3)
+        """
+        return self.vitesses_corps
+
+    def integrer(self, delta_time: float) -> tuple:
+        """Déplace et tourne ensemble toutes les entités ayant une vitesse, pendant une durée, sauf le déplacement des entités ayant
+        un corps physique : leur vitesse est appliquée par la scène physique, avec les collisions contre les murs
+
+        Args:
+            delta_time (float): durée de l'étape, en secondes
+
+        Returns:
+            tuple: lignes des entités déplacées et leurs positions avant le déplacement, de forme (n, 3)
+        """
+        n = self.nb_lignes
+        tournent = np.flatnonzero(self.utilisees[:n] & (self.vitesses_angulaires[:n] != 0))
+        if len(tournent) > 0:
+            self.angles[tournent] += self.vitesses_angulaires[tournent] * delta_time
+            self.calculer_vecteurs(tournent)
+
+        bougent = np.flatnonzero(self.utilisees[:n] & ~self.corps[:n] & np.any(self.vitesses[:n] != 0, axis = 1))
+        anciennes_positions = self.positions[bougent]
+        if len(bougent) > 0:
+            self.mouvements[bougent] = self.vitesses[bougent] * delta_time
+            self.positions[bougent] += self.mouvements[bougent]
+        return bougent, anciennes_positions
+
+    def set_corps(self, ligne: int, corps: bool) -> None:
+        """Indique si l'entité d'une ligne a un corps physique, qui la déplace alors à la place du stock
+
+        Args:
+            ligne (int): ligne de l'entité
+            corps (bool): si l'entité a un corps physique
+        """
+        assert self.utilisees[ligne], ("Stock d'entités : la ligne " + str(ligne) + " ne contient pas d'entité.")
+        self.corps[ligne] = corps
+
+    def interpoler_poses(self, lignes: np.ndarray, alpha: float) -> tuple:
+        """Retourne la position et l'angle de plusieurs entités interpolés entre l'étape de simulation précédente et l'actuelle
+
+        Args:
+            lignes (np.ndarray): lignes des entités
+            alpha (float): avancée entre l'étape précédente (0) et l'actuelle (1)
+
+        Returns:
+            tuple: positions interpolées de forme (n, 3) et angles interpolés, en degrés
+        """
+        positions, angles = self.positions[lignes], self.angles[lignes]
+        if alpha >= 1:
+            return positions, angles
+        positions_precedentes, angles_precedents = self.positions_precedentes[lignes], self.angles_precedents[lignes]
+        return positions_precedentes + (positions - positions_precedentes) * alpha, angles_precedents + (angles - angles_precedents) * alpha
+
+    def memoriser_poses(self) -> None:
+        """Garde la position et l'angle actuels de toutes les entités comme pose de l'étape précédente, pour l'interpolation du rendu
+        """
+        n = self.nb_lignes
+        self.positions_precedentes[:n] = self.positions[:n]
+        self.angles_precedents[:n] = self.angles[:n]
+
+    def ont_bouge(self, lignes: np.ndarray) -> bool:
+        """Retourne si au moins une de plusieurs entités a bougé ou tourné pendant la dernière étape de simulation
+
+        Args:
+            lignes (np.ndarray): lignes des entités
+
+        Returns:
+            bool: si la pose interpolée d'une des entités dépend de l'avancée entre les deux étapes
+        """
+        return bool(np.any(self.positions_precedentes[lignes] != self.positions[lignes]) or np.any(self.angles_precedents[lignes] != self.angles[lignes]))
+
+    def retirer(self, ligne: int) -> None:
+        """Retire l'entité d'une ligne du stock, la ligne sera réutilisée
+
+        Args:
+            ligne (int): ligne de l'entité
+        """
+        assert self.utilisees[ligne], ("Stock d'entités : la ligne " + str(ligne) + " ne contient pas d'entité.")
+        self.objets[ligne] = None
+        self.utilisees[ligne] = False
+        self.corps[ligne] = False
+        self.deplacements[ligne] = 0
+        self.vitesses[ligne] = 0
+        self.vitesses_angulaires[ligne] = 0
+        self.vitesses_corps[ligne] = 0
+        self.lignes_libres.append(ligne)
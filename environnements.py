@@ -0,0 +1,331 @@
+#-------------------------------------
+#          Environnements.py
+#-------------------------------------
+
+# Fichier contenant les environnements vectorisés, qui simulent beaucoup de parties en même temps (par exemple pour entraîner des agents).
+# Informations importantes :
+# -Chaque environnement est une Scene sans partie graphique (donc sans pygame), toutes les scènes partageant la même
+#  carte, en lecture seule.
+# -Une étape avance tous les joueurs ensemble avec NumPy : actions, déplacements avec collisions (voir ph.deplacer_corps) et
+#  rotations, comme Scene.simuler_joueur, puis un seul raycast par lot pour les rayons de tous les environnements,
+#  chacun partant de son joueur.
+# -La pose des joueurs est gardée dans des tableaux pendant les étapes, et n'est recopiée dans les scènes que quand on
+#  les demande (voir get_scene). Seuls les joueurs sont simulés, les autres objets des scènes ne bougent pas.
+# -Avec plusieurs processus, les environnements sont répartis en groupes : chaque groupe vit dans son propre processus,
+#  qui garde ses scènes et ne lit la carte qu'une fois. Seules les actions et les observations sont échangées.
+# -Sans structure de base donnée, le cache des cartes compilées est rangé dans le dossier temporaire du système
+#  (voir DOSSIER_CACHE_CARTES), pour ne pas écrire dans le dossier courant.
+
+# Importer les librairies
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import os
+import physique as ph
+import raycast as rc
+import scene as sc
+import structure_de_base as sb
+import tempfile
+
+ACTIONS = ("avancer", "reculer", "gauche", "droite")
+ACTIONS_DISCRETES = np.array([[0, 0, 0, 0], [1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]], dtype=bool) # Actions pressées par chaque action discrète : rien, avancer, reculer, gauche, droite
+DOSSIER_CACHE_CARTES = os.path.join(tempfile.gettempdir(), "cache_cartes") # Dossier du cache des cartes compilées de la structure de base par défaut
+RAYON_JOUEUR = 0.2 # Rayon du corps du joueur, le même que dans Scene.nouvel_objet
+
+_groupe_travailleur = None # Environnements du groupe d'un processus travailleur
+
+def _creer_groupe(carte: str, nb_environnements: int, nb_rayons: int, departs: np.ndarray, fonction_recompense, fov: float, frequence_simulation: float, dossier_cache_cartes: str) -> None:
+    """Crée les environnements du groupe d'un processus travailleur
+
+    Args:
+        carte (str): chemin d'accés vers la carte
+        nb_environnements (int): nombre d'environnements du groupe
+        nb_rayons (int): nombre de rayons observés par environnement
+        departs (np.ndarray): position x, y et angle de départ de chaque environnement du groupe
+        fonction_recompense: fonction des récompenses, None pour des récompenses nulles
+        fov (float): champ de vision des joueurs, en degrés
+        frequence_simulation (float): nombre d'étapes par seconde simulée
+        dossier_cache_cartes (str): dossier du cache des cartes compilées, None pour aucun cache
+    """
+    global _groupe_travailleur
+    structure_de_base = sb.Structure_De_Base(taille_fenetre = (0, 0), sans_fenetre = True)
+    structure_de_base.set_fov(fov)
+    structure_de_base.set_frequence_simulation(frequence_simulation)
+    structure_de_base.set_dossier_cache_cartes(dossier_cache_cartes)
+    _groupe_travailleur = Environnements(carte, nb_environnements, nb_rayons, departs, fonction_recompense, structure_de_base = structure_de_base)
+
+def _etape_groupe(actions: np.ndarray) -> tuple:
+    """Réalise une étape des environnements du groupe du processus travailleur
+
+    Args:
+        actions (np.ndarray): actions des environnements du groupe
+
+    Returns:
+        tuple: retour de Environnements.etape
+    """
+    return _groupe_travailleur.etape(actions)
+
+def _reinitialiser_groupe(indices: np.ndarray) -> tuple:
+    """Remet des environnements du groupe du processus travailleur à leur départ
+
+    Args:
+        indices (np.ndarray): indices des environnements dans le groupe
+
+    Returns:
+        tuple: retour de Environnements.reinitialiser
+    """
+    return _groupe_travailleur.reinitialiser(indices)
+
+class Environnements:
+    """Classe représentant des environnements vectorisés, chacun étant une scène avec son joueur
+    """
+
+    def __init__(self, carte: str, nb_environnements: int, nb_rayons: int = 32, departs: np.ndarray = None, fonction_recompense = None, nb_processus: int = 1, structure_de_base: sb.Structure_De_Base = None) -> None:
+        """Créer des environnements vectorisés
+
+        Args:
+            carte (str): chemin d'accés vers la carte, lue une seule fois et partagée par toutes les scènes
+            nb_environnements (int): nombre d'environnements
+            nb_rayons (int, optionnel): nombre de rayons observés par environnement, répartis sur le fov comme les colonnes de la caméra, par défaut à 32
+            departs (np.ndarray, optionnel): position x, y et angle de départ de tous les environnements (3,) ou de chacun (nb_environnements, 3),
+                                             par défaut la pose du joueur à la création de la scène
+            fonction_recompense (optionnel): fonction appelée après chaque étape avec les environnements et les actions pressées (nb_environnements, 4),
+                                             qui retourne la récompense de chaque environnement, picklable avec plusieurs processus, par défaut des récompenses nulles
+            nb_processus (int, optionnel): nombre de processus se partageant les environnements, par défaut à 1 (aucun processus)
+            structure_de_base (sb.Structure_De_Base, optionnel): structure de base des scènes (fov, fréquence de simulation), par défaut une nouvelle structure sans fenêtre
+                                                                  avec le cache des cartes dans DOSSIER_CACHE_CARTES
+        """
+        assert nb_environnements > 0, ("Environnements : le nombre d'environnements doit être positif.")
+        assert nb_rayons > 0, ("Environnements : le nombre de rayons doit être positif.")
+        assert nb_processus > 0, ("Environnements : le nombre de processus doit être positif.")
+        if structure_de_base == None:
+            structure_de_base = sb.Structure_De_Base(taille_fenetre = (0, 0), sans_fenetre = True)
+            structure_de_base.set_dossier_cache_cartes(DOSSIER_CACHE_CARTES)
+
+        self.carte = None # Carte partagée par toutes les scènes, None si les scènes sont dans les processus
+        self.delta_time = 1 / structure_de_base.get_frequence_simulation() # Durée d'une étape, en secondes
+        self.distances = np.zeros((nb_environnements, nb_rayons)) # Distance au mur touché par chaque rayon de chaque environnement, infinie si aucun
+        self.distances_murs = None # Champ de distance aux murs de la carte, si les sauts accélèrent le raycast
+        self.etapes = np.zeros(nb_environnements, dtype=np.int64) # Nombre d'étapes de chaque environnement depuis son départ
+        self.fonction_recompense = fonction_recompense # Fonction des récompenses, None pour des récompenses nulles
+        self.groupes = [] # Environnements de début (inclus) et de fin (exclus) de chaque processus
+        self.nb_environnements = nb_environnements
+        self.nb_rayons = nb_rayons
+        self.positions_precedentes = np.zeros((nb_environnements, 2)) # Position de chaque joueur avant la dernière étape
+        self.processus = [] # Groupe de processus d'un seul travailleur par groupe d'environnements, pour que chaque groupe reste dans son processus
+        self.scenes = [] # Scène de chaque environnement, vide si les scènes sont dans les processus
+        self.scenes_a_jour = True # Si la pose des joueurs des scènes est celle des tableaux
+        self.structure_de_base = structure_de_base
+
+        fov = structure_de_base.get_fov()
+        self.decalages = np.radians(-fov / 2 + np.arange(nb_rayons) * (fov / nb_rayons)) # Angle de chaque rayon par rapport à l'avant, comme les colonnes de la caméra
+
+        if nb_processus > 1: # Répartir les environnements en groupes, chacun dans son processus
+            limites = np.linspace(0, nb_environnements, min(nb_processus, nb_environnements) + 1).astype(int)
+            self.groupes = [(int(limites[i]), int(limites[i + 1])) for i in range(len(limites) - 1)]
+            departs_groupes = [None] * len(self.groupes)
+            if departs is not None:
+                departs = np.broadcast_to(np.asarray(departs, dtype=np.float64), (nb_environnements, 3))
+                departs_groupes = [departs[debut:fin].copy() for debut, fin in self.groupes]
+            self.processus = [ProcessPoolExecutor(max_workers = 1, initializer = _creer_groupe, initargs = (carte, fin - debut, nb_rayons, departs_groupes[i], fonction_recompense, fov, structure_de_base.get_frequence_simulation(), structure_de_base.get_dossier_cache_cartes())) for i, (debut, fin) in enumerate(self.groupes)]
+            self.departs = None
+            observations = [processus.submit(_reinitialiser_groupe, None) for processus in self.processus]
+            observations = [observation.result() for observation in observations]
+            self.distances = np.concatenate([observation[0] for observation in observations])
+            self.positions = np.concatenate([observation[1] for observation in observations])
+            self.angles = np.concatenate([observation[2] for observation in observations])
+            self.positions_precedentes = self.positions.copy()
+            return
+
+        # Lire la carte une seule fois, puis la partager en lecture seule entre toutes les scènes
+        premiere = sc.Scene("environnement_0", carte, structure_de_base.get_taille_fenetre(), structure_de_base, graphique = False, physique = True)
+        self.carte = premiere.get_carte()
+        assert isinstance(self.carte.get_tuiles(), np.ndarray), ("Environnements : la carte doit tenir en mémoire, une carte fragmentée ne peut pas être partagée.")
+        self.carte.get_tuiles().setflags(write = False)
+        self.scenes = [premiere] + [sc.Scene("environnement_" + str(i), self.carte, structure_de_base.get_taille_fenetre(), structure_de_base, graphique = False, physique = True) for i in range(1, nb_environnements)]
+        distances_murs = rc.distances_murs(self.carte.get_tuiles())
+        if rc.saut_rentable(self.carte.get_tuiles(), distances_murs): self.distances_murs = distances_murs
+
+        joueur = premiere.get_joueur()
+        self.vitesse = joueur.get_vitesse() # Vitesse des joueurs, en cellules par seconde
+        self.vitesse_rotation = joueur.get_vitesse_rotation() # Vitesse de rotation des joueurs, en degrés par seconde
+        if departs is None: departs = (joueur.get_position()[0], joueur.get_position()[1], joueur.get_angle())
+        self.departs = np.array(np.broadcast_to(np.asarray(departs, dtype=np.float64), (nb_environnements, 3))) # Position x, y et angle de départ de chaque environnement
+        self.positions = self.departs[:, :2].copy() # Position de chaque joueur
+        self.angles = self.departs[:, 2].copy() # Angle de chaque joueur, en degrés
+        self.reinitialiser()
+
+    def etape(self, actions: np.ndarray) -> tuple:
+        """Réalise une étape de simulation de tous les environnements
+
+        Args:
+            actions (np.ndarray): action discrète de chaque environnement (voir ACTIONS_DISCRETES), de forme (nb_environnements,),
+                                  ou si chaque action de ACTIONS est pressée, de forme (nb_environnements, 4)
+
+        Returns:
+            tuple: distances des rayons (nb_environnements, nb_rayons), positions (nb_environnements, 2), angles et récompenses de chaque environnement
+        """
+        actions = np.asarray(actions)
+        pressees = ACTIONS_DISCRETES[actions] if actions.ndim == 1 else actions.astype(bool)
+        assert pressees.shape == (self.get_nb_environnements(), len(ACTIONS)), ("Environnements : il faut une action par environnement.")
+        self.positions_precedentes = self.positions.copy()
+        self.etapes += 1
+        if len(self.processus) > 0:
+            travaux = [processus.submit(_etape_groupe, pressees[debut:fin]) for processus, (debut, fin) in zip(self.processus, self.groupes)]
+            resultats = [travail.result() for travail in travaux] # Attendre tous les groupes, en remontant leurs erreurs
+            self.distances, self.positions, self.angles, recompenses = (np.concatenate(valeurs) for valeurs in zip(*resultats))
+            return self.distances.copy(), self.positions.copy(), self.angles.copy(), recompenses
+
+        # Avancer et tourner tous les joueurs ensemble, comme Scene.simuler_joueur
+        radians = np.radians(self.angles)
+        avancees = self.vitesse * self.delta_time * (pressees[:, 0].astype(np.float64) - pressees[:, 1])
+        deplacements = np.stack((avancees * np.cos(radians), avancees * np.sin(radians)), axis = 1)
+        self.positions, _ = ph.deplacer_corps(self.get_carte().get_tuiles(), self.positions, deplacements, RAYON_JOUEUR, True)
+        self.angles += self.vitesse_rotation * self.delta_time * (pressees[:, 3].astype(np.float64) - pressees[:, 2])
+        self.scenes_a_jour = False
+
+        self.observer()
+        recompenses = np.zeros(self.get_nb_environnements())
+        if self.fonction_recompense != None: recompenses = np.asarray(self.fonction_recompense(self, pressees), dtype=np.float64)
+        return self.distances.copy(), self.positions.copy(), self.angles.copy(), recompenses
+
+    def fermer(self) -> None:
+        """Arrête les processus des groupes d'environnements
+        """
+        for processus in self.processus: processus.shutdown()
+        self.processus = []
+
+    def get_angles(self) -> np.ndarray:
+        """Retourne l'angle de chaque joueur
+
+        Returns:
+            np.ndarray: angle de chaque joueur, en degrés
+        """
+        return self.angles
+
+    def get_carte(self):
+        """Retourne la carte partagée par toutes les scènes
+
+        Returns:
+            ca.Carte: carte en lecture seule, None si les scènes sont dans les processus
+        """
+        return self.carte
+
+    def get_distances(self) -> np.ndarray:
+        """Retourne les distances observées à la dernière étape
+
+        Returns:
+            np.ndarray: distance au mur touché par chaque rayon, de forme (nb_environnements, nb_rayons), infinie si aucun
+        """
+        return self.distances
+
+    def get_etapes(self) -> np.ndarray:
+        """Retourne le nombre d'étapes de chaque environnement depuis son départ
+
+        Returns:
+            np.ndarray: nombre d'étapes de chaque environnement
+        """
+        return self.etapes
+
+    def get_nb_environnements(self) -> int:
+        """Retourne le nombre d'environnements
+
+        Returns:
+            int: nombre d'environnements
+        """
+        return self.nb_environnements
+
+    def get_nb_rayons(self) -> int:
+        """Retourne le nombre de rayons observés par environnement
+
+        Returns:
+            int: nombre de rayons
+        """
+        return self.nb_rayons
+
+    def get_positions(self) -> np.ndarray:
+        """Retourne la position de chaque joueur
+
+        Returns:
+            np.ndarray: position x, y de chaque joueur, de forme (nb_environnements, 2)
+        """
+        return self.positions
+
+    def get_positions_precedentes(self) -> np.ndarray:
+        """Retourne la position de chaque joueur avant la dernière étape
+
+        Returns:
+            np.ndarray: position x, y de chaque joueur, de forme (nb_environnements, 2)
+        """
+        return self.positions_precedentes
+
+    def get_scene(self, indice: int) -> sc.Scene:
+        """Retourne la scène d'un environnement, avec la pose actuelle de son joueur
+
+        Args:
+            indice (int): indice de l'environnement
+
+        Returns:
+            sc.Scene: scène de l'environnement
+        """
+        assert len(self.processus) == 0, ("Environnements : les scènes sont dans les processus des groupes.")
+        if not self.scenes_a_jour: self.synchroniser()
+        return self.scenes[indice]
+
+    def get_structure_de_base(self) -> sb.Structure_De_Base:
+        """Retourne la structure de base des scènes
+
+        Returns:
+            sb.Structure_De_Base: structure de base des scènes
+        """
+        return self.structure_de_base
+
+    def observer(self) -> np.ndarray:
+        """Lance les rayons de tous les environnements en un seul raycast par lot et retourne leurs distances
+
+        Returns:
+            np.ndarray: distance au mur touché par chaque rayon, de forme (nb_environnements, nb_rayons), infinie si aucun
+        """
+        radians = (np.radians(self.angles)[:, None] + self.decalages).ravel()
+        vecteurs = np.stack((np.cos(radians), np.sin(radians)), axis = 1)
+        departs = np.repeat(self.positions, self.get_nb_rayons(), axis = 0) # Chaque rayon part de son joueur
+        raycasts = rc.ray_cast_batch(self.get_carte().get_tuiles(), departs, vecteurs, self.distances_murs)
+        self.distances = raycasts.get_distances().reshape(self.get_nb_environnements(), self.get_nb_rayons())
+        return self.distances
+
+    def reinitialiser(self, indices: np.ndarray = None) -> tuple:
+        """Remet des environnements à leur départ
+
+        Args:
+            indices (np.ndarray, optionnel): indices des environnements à remettre à leur départ, par défaut tous
+
+        Returns:
+            tuple: distances des rayons (nb_environnements, nb_rayons), positions (nb_environnements, 2) et angles de tous les environnements
+        """
+        indices = np.arange(self.get_nb_environnements()) if indices is None else np.asarray(indices, dtype=np.intp).reshape(-1)
+        self.etapes[indices] = 0
+        if len(self.processus) > 0:
+            travaux = []
+            for processus, (debut, fin) in zip(self.processus, self.groupes):
+                locaux = indices[(indices >= debut) & (indices < fin)] - debut
+                if len(locaux) > 0: travaux.append((debut, fin, processus.submit(_reinitialiser_groupe, locaux)))
+            for debut, fin, travail in travaux:
+                self.distances[debut:fin], self.positions[debut:fin], self.angles[debut:fin] = travail.result()
+            self.positions_precedentes[indices] = self.positions[indices]
+            return self.distances.copy(), self.positions.copy(), self.angles.copy()
+
+        self.positions[indices] = self.departs[indices, :2]
+        self.angles[indices] = self.departs[indices, 2]
+        self.positions_precedentes[indices] = self.positions[indices]
+        self.scenes_a_jour = False
+        self.observer()
+        return self.distances.copy(), self.positions.copy(), self.angles.copy()
+
+    def synchroniser(self) -> None:
+        """Recopie la pose de chaque joueur des tableaux dans sa scène
+        """
+        for i, scene in enumerate(self.scenes):
+            joueur = scene.get_joueur()
+            joueur.set_position((float(self.positions[i, 0]), float(self.positions[i, 1]), joueur.get_position()[2]))
+            joueur.set_angle(float(self.angles[i]))
+            joueur.calculer_vecteurs()
+        self.scenes_a_jour = True
@@ -0,0 +1,191 @@
+#-------------------------------------
+#          Format_carte.py
+#-------------------------------------
+
+# Fichier contenant le format binaire des cartes compilées (.cwad) et le cache des cartes texte (.wad).
+# Informations importantes :
+# -Un fichier .cwad contient, dans l'ordre :
+#     -un en-tête : "RCWD", version, taille d'un identifiant de tuile, largeur, hauteur, nombre de types de tuiles, position des tuiles,
+#     -la table des types de tuiles : couleur 2D, nom et texture de chaque type,
+#     -les tuiles brutes, indexées [x, y], alignées sur 16 octets pour être lues avec numpy.memmap sans copie.
+# -Une très grande carte compilée peut être lue en fragments (voir carte.Carte_Fragmentee), seuls les fragments utilisés étant lus.
+# -Le cache garde une carte compilée par fichier .wad, à jour tant que la date de modification du .wad ne change pas : les
+#  entrées des dates précédentes (carte compilée et PVS) sont supprimées quand une nouvelle est écrite (voir nettoyer_cache).
+# -Les fichiers sont écrits à côté puis renommés (voir ecrire_fichier) : un fichier lu n'est jamais à moitié écrit.
+# -Utilisation en ligne de commande : python format_carte.py carte.wad carte.cwad
+
+# Importer les librairies
+import carte as ca
+import hashlib
+import numpy as np
+import os
+import struct
+import sys
+
+EN_TETE = struct.Struct("<4sHBxIIHxxI") # Signature, version, octets par tuile, largeur, hauteur, nombre de types, position des tuiles
+SIGNATURE = b"RCWD"
+VERSION = 1
+
+def chemin_cache(chemin: str, dossier_cache: str) -> str:
+    """Retourne le chemin de la carte compilée en cache pour une carte texte, selon son chemin et sa date de modification
+
+    Args:
+        chemin (str): chemin d'accés vers la carte texte
+        dossier_cache (str): dossier du cache
+
+    Returns:
+        str: chemin de la carte compilée en cache
+    """
+    cle = hashlib.sha1(os.path.abspath(chemin).encode("utf-8")).hexdigest()
+    return os.path.join(dossier_cache, cle + "_" + str(os.stat(chemin).st_mtime_ns) + ".cwad")
+
+def compiler_carte(source: str, destination: str) -> ca.Carte:
+    """Convertit une carte texte (.wad) en carte compilée (.cwad) et la retourne
+
+    Args:
+        source (str): chemin d'accés vers la carte texte
+        destination (str): chemin d'accés vers la carte compilée à écrire
+
+    Returns:
+        ca.Carte: carte convertie
+    """
+    fichier = open(source, "r")
+    contenu = fichier.read().split("\n")
+    fichier.close()
+
+    taille = (int(contenu[0].split(" ")[0]), int(contenu[0].split(" ")[1]))
+    carte = ca.Carte(taille)
+    carte.charger_tuiles(tuiles_depuis_texte(contenu[1:taille[1] + 1], taille))
+    ecrire_carte_compilee(destination, carte)
+    return carte
+
+def ecrire_carte_compilee(chemin: str, carte: ca.Carte) -> None:
+    """Écrit une carte dans un fichier compilé
+
+    Args:
+        chemin (str): chemin d'accés vers le fichier à écrire
+        carte (ca.Carte): carte à écrire
+    """
+    # Écrire la table des types de tuiles
+    table = bytearray()
+    for type_tuile in carte.get_types_tuiles():
+        nom = type_tuile.get_nom().encode("utf-8")
+        texture = b"" if type_tuile.get_texture() == None else type_tuile.get_texture().encode("utf-8")
+        table += bytes(type_tuile.get_couleur_2d()[:3])
+        table += struct.pack("<B", len(nom)) + nom
+        table += struct.pack("<B", 255 if type_tuile.get_texture() == None else len(texture)) + texture # 255 : pas de texture
+
+    tuiles = carte.get_tuiles()
+    position_tuiles = EN_TETE.size + len(table)
+    position_tuiles += -position_tuiles % 16 # Aligner les tuiles
+    en_tete = EN_TETE.pack(SIGNATURE, VERSION, tuiles.dtype.itemsize, carte.get_taille()[0], carte.get_taille()[1], len(carte.get_types_tuiles()), position_tuiles)
+
+    ecrire_fichier(chemin, (en_tete, table, bytes(position_tuiles - EN_TETE.size - len(table)), np.ascontiguousarray(tuiles, dtype=tuiles.dtype.newbyteorder("<")).tobytes()))
+
+def ecrire_fichier(chemin: str, morceaux: tuple) -> None:
+    """Écrit un fichier binaire à côté puis le renomme, pour ne jamais laisser de fichier à moitié écrit à son chemin
+
+    Args:
+        chemin (str): chemin d'accés vers le fichier à écrire, dont le dossier est créé s'il n'existe pas
+        morceaux (tuple): octets à écrire, dans l'ordre
+    """
+    dossier = os.path.dirname(chemin)
+    if dossier != "": os.makedirs(dossier, exist_ok = True)
+    temporaire = chemin + ".tmp"
+    fichier = open(temporaire, "wb")
+    for morceau in morceaux:
+        fichier.write(morceau)
+    fichier.close()
+    os.replace(temporaire, chemin)
+
+def lire_carte_compilee(chemin: str) -> ca.Carte:
+    """Lit une carte compilée, les tuiles étant projetées en mémoire sans copie
+
+    Args:
+        chemin (str): chemin d'accés vers la carte compilée
+
+    Returns:
+        ca.Carte: carte lue, copiée seulement là où elle est modifiée
+    """
+    type_donnee, taille, types_tuiles, position_tuiles = lire_en_tete(chemin)
+    tuiles = np.memmap(chemin, dtype=type_donnee, mode="c", offset=position_tuiles, shape=taille)
+    return ca.Carte(taille, tuiles = tuiles, types_tuiles = types_tuiles)
+
+def lire_carte_fragmentee(chemin: str, taille_fragment: int = 64, budget_memoire: int = 64 * 1024 * 1024) -> ca.Carte_Fragmentee:
+    """Lit une carte compilée en fragments, chaque fragment n'étant lu du fichier que lorsqu'il est utilisé
+
+    Args:
+        chemin (str): chemin d'accés vers la carte compilée
+        taille_fragment (int, optionnel): côté d'un fragment en cellules, par défaut à 64
+        budget_memoire (int, optionnel): mémoire maximum occupée par les fragments non modifiés, en octets, par défaut à 64 Mo
+
+    Returns:
+        ca.Carte_Fragmentee: carte lue
+    """
+    type_donnee, taille, types_tuiles, position_tuiles = lire_en_tete(chemin)
+    tuiles = np.memmap(chemin, dtype=type_donnee, mode="r", offset=position_tuiles, shape=taille)
+    source = lambda x_debut, y_debut, x_fin, y_fin: tuiles[x_debut:x_fin, y_debut:y_fin] # Copié par la carte, seules ces pages sont lues
+    return ca.Carte_Fragmentee(taille, source, taille_fragment = taille_fragment, budget_memoire = budget_memoire, types_tuiles = types_tuiles, type_donnee = type_donnee.newbyteorder("="))
+
+def lire_en_tete(chemin: str) -> tuple:
+    """Lit l'en-tête et la table des types de tuiles d'une carte compilée
+
+    Args:
+        chemin (str): chemin d'accés vers la carte compilée
+
+    Returns:
+        tuple: type des identifiants de tuiles, taille de la carte, table des types de tuiles, position des tuiles dans le fichier
+    """
+    fichier = open(chemin, "rb")
+    signature, version, octets_tuile, largeur, hauteur, nb_types, position_tuiles = EN_TETE.unpack(fichier.read(EN_TETE.size))
+    assert signature == SIGNATURE, ("Format carte : le fichier \"" + chemin + "\" n'est pas une carte compilée.")
+    assert version == VERSION, ("Format carte : la carte compilée \"" + chemin + "\" a une version non supportée (" + str(version) + ").")
+
+    # Lire la table des types de tuiles
+    table = fichier.read(position_tuiles - EN_TETE.size)
+    fichier.close()
+    types_tuiles = []
+    position = 0
+    for _ in range(nb_types):
+        couleur_2d = tuple(table[position:position + 3])
+        longueur = table[position + 3]
+        nom = table[position + 4:position + 4 + longueur].decode("utf-8")
+        position += 4 + longueur
+        longueur = table[position]
+        texture = None if longueur == 255 else table[position + 1:position + 1 + longueur].decode("utf-8")
+        position += 1 + (0 if longueur == 255 else longueur)
+        types_tuiles.append(ca.Type_Tuile(nom, couleur_2d = couleur_2d, texture = texture))
+
+    return np.dtype("<u" + str(octets_tuile)), (largeur, hauteur), types_tuiles, position_tuiles
+
+def nettoyer_cache(chemin: str) -> None:
+    """Supprime les entrées du cache laissées par les dates de modification précédentes de la même carte texte
+
+    Args:
+        chemin (str): chemin de la carte compilée en cache à garder (voir chemin_cache), son PVS étant gardé avec elle
+    """
+    dossier, nom = os.path.split(chemin)
+    prefixe = nom.split("_")[0] + "_" # Empreinte du chemin de la carte texte, commune à toutes ses entrées
+    gardees = (nom, nom[:-len("cwad")] + "pvs")
+    for entree in os.listdir(dossier if dossier != "" else "."):
+        if entree.startswith(prefixe) and entree not in gardees:
+            os.remove(os.path.join(dossier, entree))
+
+def tuiles_depuis_texte(lignes: list, taille: tuple) -> np.ndarray:
+    """Retourne les tuiles d'une carte texte, chaque chiffre étant l'identifiant d'une tuile
+
+    Args:
+        lignes (list): lignes de la carte, sans l'en-tête ni les retours à la ligne
+        taille (tuple): taille de la carte (largeur, hauteur)
+
+    Returns:
+        np.ndarray: identifiants des tuiles, indexés [x, y]
+    """
+    chiffres = np.frombuffer("".join(lignes).encode("ascii"), dtype=np.uint8).reshape((taille[1], taille[0]))
+    assert ((chiffres >= ord("0")) & (chiffres <= ord("9"))).all(), ("Format carte : la carte contient autre chose que des chiffres.")
+    return (chiffres - ord("0")).T # Les lignes du fichier sont les y, la carte est indexée [x, y]
+
+if __name__ == "__main__":
+    assert len(sys.argv) == 3, ("Utilisation : python format_carte.py carte.wad carte.cwad")
+    carte_compilee = compiler_carte(sys.argv[1], sys.argv[2])
+    print("Carte " + str(carte_compilee.get_taille()[0]) + "x" + str(carte_compilee.get_taille()[1]) + " compilée dans \"" + sys.argv[2] + "\".")
@@ -0,0 +1,193 @@
+#-------------------------------------
+#          Index_spatial.py
+#-------------------------------------
+
+# Fichier contenant l'index spatial des objets mobiles d'une scène.
+# Informations importantes :
+# -L'index est une table de hachage de cellules carrées : chaque objet est rangé dans la cellule qui contient sa position.
+# -Un objet indexé prévient lui-même l'index quand il bouge (voir Objet.set_position), seul un changement de cellule coûte quelque chose.
+# -Les requêtes (cellule, rayon, rectangle) ne parcourent que les cellules concernées, leur coût dépend donc de la réponse
+#  et non du nombre total d'objets.
+# -La révision de l'index augmente à chaque ajout, retrait ou mouvement d'un objet : deux révisions égales garantissent
+#  qu'aucun objet n'a bougé entre-temps (utilisé par le cache du rendu, voir Scene_Graphique.rendu_3d).
+
+# Importer les librairies
+import math
+import numpy as np
+
+class Index_Spatial:
+    """Classe représentant un index spatial d'objets, par cellules carrées
+    """
+
+    def __init__(self, taille_cellule: float = 1) -> None:
+        """Créer un index spatial vide
+
+        Args:
+            taille_cellule (float, optionnel): côté d'une cellule de l'index, par défaut à 1 (une cellule de la carte)
+        """
+        assert taille_cellule > 0, ("Index spatial : la taille des cellules doit être positive.")
+
+        self.cellules = {} # Objets de chaque cellule non vide, de clé la cellule et de valeur un dictionnaire utilisé comme ensemble ordonné
+        self.cellules_objets = {} # Cellule de chaque objet indexé, de clé l'objet
+        self.revision = 0 # Nombre d'ajouts, de retraits et de mouvements des objets indexés
+        self.taille_cellule = taille_cellule # Côté d'une cellule de l'index
+
+    def __contains__(self, objet) -> bool:
+        """Retourne si un objet est dans l'index
+
+        Args:
+            objet (ob.Objet): objet à chercher
+
+        Returns:
+            bool: si l'objet est dans l'index
+        """
+        return objet in self.cellules_objets
+
+    def __len__(self) -> int:
+        """Retourne le nombre d'objets dans l'index
+
+        Returns:
+            int: nombre d'objets indexés
+        """
+        return len(self.cellules_objets)
+
+    def ajouter(self, objet) -> None:
+        """Ajoute un objet dans l'index, qui le tiendra à jour quand l'objet bouge
+
+        Args:
+            objet (ob.Objet): objet à ajouter
+        """
+        assert objet not in self.cellules_objets, ("Index spatial : l'objet \"" + objet.get_nom() + "\" est déjà dans l'index.")
+        cellule = self.get_cellule(objet.get_position())
+        self.cellules.setdefault(cellule, {})[objet] = None
+        self.cellules_objets[objet] = cellule
+        self.revision += 1
+        objet.set_index_spatial(self)
+
+    def get_cellule(self, position: tuple) -> tuple:
+        """Retourne la cellule de l'index contenant une position
+
+        Args:
+            position (tuple): position à chercher
+
+        Returns:
+            tuple: coordonnées de la cellule
+        """
+        return (math.floor(position[0] / self.taille_cellule), math.floor(position[1] / self.taille_cellule))
+
+    def get_objets_cellule(self, x: int, y: int) -> list:
+        """Retourne les objets d'une cellule de l'index
+
+        Args:
+            x (int): coordonnée x de la cellule
+            y (int): coordonnée y de la cellule
+
+        Returns:
+            list: objets de la cellule
+        """
+        return list(self.cellules.get((x, y), ()))
+
+    def get_objets_rayon(self, position: tuple, rayon: float) -> list:
+        """Retourne les objets à une distance d'une position inférieure ou égale à un rayon
+
+        Args:
+            position (tuple): centre de la recherche
+            rayon (float): rayon de la recherche
+
+        Returns:
+            list: objets dans le rayon
+        """
+        retour = []
+        rayon_carre = rayon * rayon
+        for objet in self.get_objets_rectangle((position[0] - rayon, position[1] - rayon), (position[0] + rayon, position[1] + rayon)):
+            position_objet = objet.get_position()
+            if (position_objet[0] - position[0]) * (position_objet[0] - position[0]) + (position_objet[1] - position[1]) * (position_objet[1] - position[1]) <= rayon_carre:
+                retour.append(objet)
+        return retour
+
+    def get_objets_rectangle(self, minimum: tuple, maximum: tuple) -> list:
+        """Retourne les objets dans un rectangle aligné sur les axes, bords compris
+
+        Args:
+            minimum (tuple): coin du rectangle de plus petites coordonnées
+            maximum (tuple): coin du rectangle de plus grandes coordonnées
+
+        Returns:
+            list: objets dans le rectangle
+        """
+        retour = []
+        cellule_min = self.get_cellule(minimum)
+        cellule_max = self.get_cellule(maximum)
+        nb_cellules = (cellule_max[0] - cellule_min[0] + 1) * (cellule_max[1] - cellule_min[1] + 1)
+        if nb_cellules > len(self.cellules): # Moins de cellules non vides que de cellules couvertes, les parcourir directement
+            cellules = [objets for cellule, objets in self.cellules.items() if cellule_min[0] <= cellule[0] <= cellule_max[0] and cellule_min[1] <= cellule[1] <= cellule_max[1]]
+        else:
+            cellules = [self.cellules[(x, y)] for x in range(cellule_min[0], cellule_max[0] + 1) for y in range(cellule_min[1], cellule_max[1] + 1) if (x, y) in self.cellules]
+
+        for objets in cellules:
+            for objet in objets:
+                position = objet.get_position()
+                if minimum[0] <= position[0] <= maximum[0] and minimum[1] <= position[1] <= maximum[1]:
+                    retour.append(objet)
+        return retour
+
+    def get_revision(self) -> int:
+        """Retourne la révision de l'index, qui change dès qu'un objet est ajouté, retiré ou bouge
+
+        Returns:
+            int: révision de l'index
+        """
+        return self.revision
+
+    def get_taille_cellule(self) -> float:
+        """Retourne le côté d'une cellule de l'index
+
+        Returns:
+            float: côté d'une cellule
+        """
+        return self.taille_cellule
+
+    def mettre_a_jour(self, objet) -> None:
+        """Range un objet dans la cellule de sa position actuelle, appelé par l'objet quand il bouge
+
+        Args:
+            objet (ob.Objet): objet ayant bougé
+        """
+        self.revision += 1
+        ancienne_cellule = self.cellules_objets[objet]
+        cellule = self.get_cellule(objet.get_position())
+        if cellule == ancienne_cellule: # Toujours dans la même cellule, rien à faire
+            return
+
+        objets = self.cellules[ancienne_cellule]
+        del objets[objet]
+        if len(objets) == 0: del self.cellules[ancienne_cellule] # Ne garder que les cellules non vides
+        self.cellules.setdefault(cellule, {})[objet] = None
+        self.cellules_objets[objet] = cellule
+
+    def mettre_a_jour_lot(self, objets: np.ndarray, anciennes_positions: np.ndarray, positions: np.ndarray) -> None:
+        """Range plusieurs objets ayant bougé ensemble, seuls ceux qui ont changé de cellule coûtant quelque chose
+
+        Args:
+            objets (np.ndarray): objets ayant bougé, tous dans l'index
+            anciennes_positions (np.ndarray): positions des objets avant leur mouvement, de forme (n, 2) ou (n, 3)
+            positions (np.ndarray): positions actuelles des objets, de forme (n, 2) ou (n, 3)
+        """
+        self.revision += 1
+        anciennes_cellules = np.floor(anciennes_positions[:, :2] / self.taille_cellule)
+        cellules = np.floor(positions[:, :2] / self.taille_cellule)
+        for i in np.flatnonzero(np.any(anciennes_cellules != cellules, axis = 1)): # Objets ayant changé de cellule
+            self.mettre_a_jour(objets[i])
+
+    def retirer(self, objet) -> None:
+        """Retire un objet de l'index
+
+        Args:
+            objet (ob.Objet): objet à retirer
+        """
+        cellule = self.cellules_objets.pop(objet)
+        objets = self.cellules[cellule]
+        del objets[objet]
+        if len(objets) == 0: del self.cellules[cellule]
+        self.revision += 1
+        objet.set_index_spatial(None)
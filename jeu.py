@@ -3,26 +3,43 @@
 #-------------------------------------
 
 # Importer les librairies
+import chargement as ch
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import os
 import pygame as pg
 import scene as sc
 import structure_de_base as sb
 import sys
+import time
 
 class Moteur_De_Jeu:
     """Classe représentant un moteur de jeu
     """
 
-    def __init__(self, taille_fenetre: tuple) -> None:
+    def __init__(self, taille_fenetre: tuple, sans_fenetre: bool = False) -> None:
         """Créer un moteur de jeu
+
+        Args:
+            taille_fenetre (tuple): taille de la fenêtre du jeu
+            sans_fenetre (bool, optionnel): si le jeu est rendu dans une surface hors écran, sans ouvrir de fenêtre, par défaut à "False"
         """
+        self.chargements = {} # Scènes en cours de préchargement, de clé leur nom et de valeur leur chargement
+        self.executeur_chargements = None # Fil d'exécution travailleur des préchargements, créé au premier préchargement
         self.scene_actuelle = "" # Scène actuelle affichée
+        self.scene_demandee = None # Scène en cours de préchargement à mettre en scène actuelle dès qu'elle est prête
         self.scenes = {} # Dictionnaire des scène créees avec en clé le nom de la scène et en valeur la scène
-        self.structure_de_base = sb.Structure_De_Base(taille_fenetre = taille_fenetre)
+        self.structure_de_base = sb.Structure_De_Base(taille_fenetre = taille_fenetre, sans_fenetre = sans_fenetre)
         self.taille_fenetre = taille_fenetre
 
+        if sans_fenetre: os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # Ne pas dépendre d'un écran
         pg.init()
-        self.fenetre = pg.display.set_mode(self.get_taille_fenetre())
+        if sans_fenetre:
+            self.fenetre = pg.Surface(self.get_taille_fenetre(), 0, 32) # Surface hors écran remplaçant la fenêtre
+        else:
+            self.fenetre = pg.display.set_mode(self.get_taille_fenetre())
         self.horloge = pg.time.Clock()
+        self.structure_de_base.set_touches_actions({pg.K_UP: "avancer", pg.K_DOWN: "reculer", pg.K_LEFT: "gauche", pg.K_RIGHT: "droite"}) # Les scènes ne lisent que des actions
 
     def ajouter_scene(self, nom: str, scene: sc.Scene) -> None:
         """Ajoute une scène dans le jeu
@@ -31,15 +48,37 @@ class Moteur_De_Jeu:
             nom (str): nom de la scène à ajouter
             scene (sc.Scene): scène à ajouter
         """
-        assert list(self.get_scenes().keys()).count(nom) <= 0, ("Moteur de jeu : la scène \"" + nom + "\" existe déjà dans le jeu.")
+        assert nom not in self.get_scenes(), ("Moteur de jeu : la scène \"" + nom + "\" existe déjà dans le jeu.")
         self.get_scenes()[nom] = scene
 
+    def afficher(self) -> None:
+        """Copie le rendu de la scène actuelle dans la fenêtre
+        """
+        profileur = self.get_structure_de_base().get_profileur()
+        with profileur.mesurer("rendu"):
+            rendu = self.get_scene_actuelle().rendu()
+        with profileur.mesurer("blit"):
+            self.get_fenetre().blit(rendu, (0, 0, rendu.get_width(), rendu.get_height()))
+        if profileur.is_affiche(): profileur.dessiner(self.get_fenetre()) # Afficher les mesures par-dessus le rendu
+
+    def finaliser_chargements(self) -> None:
+        """Finalise sur le fil principal au plus une scène dont le préchargement est fini, et la met en scène actuelle si elle était demandée
+        """
+        for nom, chargement in self.get_chargements().items():
+            if chargement.is_fini():
+                del self.get_chargements()[nom] # Même en cas d'erreur, qui est relancée ici
+                self.ajouter_scene(nom, chargement.finaliser())
+                if self.scene_demandee == nom:
+                    self.scene_actuelle = nom
+                    self.scene_demandee = None
+                return # Une finalisation par frame, pour ne pas ralentir le rendu
+
     def frame(self) -> None:
         """Réaliser une frame du jeu
         """
-        self.get_scene_actuelle().frame()
-        rendu = self.get_scene_actuelle().rendu()
-        self.get_fenetre().blit(rendu, (0, 0, rendu.get_width(), rendu.get_height()))
+        with self.get_structure_de_base().get_profileur().mesurer("scene"):
+            self.get_scene_actuelle().frame()
+        self.afficher()
 
     def gerer_evenements(self) -> None:
         """Gère les évènements du jeu
@@ -56,6 +95,25 @@ class Moteur_De_Jeu:
                 if self.get_structure_de_base().get_touches_pressees().count(evenement.key) > 0:
                     self.get_structure_de_base().get_touches_pressees().remove(evenement.key)
 
+    def get_chargement(self, nom: str) -> ch.Chargement:
+        """Retourne le préchargement en cours d'une scène
+
+        Args:
+            nom (str): nom de la scène
+
+        Returns:
+            ch.Chargement: préchargement de la scène, None si elle n'est pas en cours de préchargement
+        """
+        return self.get_chargements().get(nom)
+
+    def get_chargements(self) -> dict:
+        """Retourne les préchargements en cours
+
+        Returns:
+            dict: préchargements en cours, de clé le nom de leur scène
+        """
+        return self.chargements
+
     def get_fenetre(self) -> pg.Surface:
         """Retourne la fenêtre du jeu
 
@@ -72,6 +130,28 @@ class Moteur_De_Jeu:
         """
         return self.horloge
 
+    def get_image(self) -> np.ndarray:
+        """Retourne une copie des pixels de la fenêtre
+
+        Returns:
+            np.ndarray: pixels de la fenêtre, de forme (largeur, hauteur, 3)
+        """
+        return pg.surfarray.array3d(self.get_fenetre())
+
+    def get_progression_chargement(self, nom: str) -> float:
+        """Retourne l'avancée du chargement d'une scène
+
+        Args:
+            nom (str): nom de la scène
+
+        Returns:
+            float: avancée du chargement entre 0 et 1, 1 si la scène est déjà dans le jeu
+        """
+        assert nom in self.get_scenes() or nom in self.get_chargements(), ("Moteur de jeu : la scène \"" + nom + "\" n'existe pas et n'est pas en cours de chargement.")
+        if nom in self.get_scenes():
+            return 1
+        return self.get_chargement(nom).get_progression()
+
     def get_nom_scene_actuelle(self) -> str:
         """Retourne le nom de la scène actuelle dans le jeu
 
@@ -112,16 +192,105 @@ class Moteur_De_Jeu:
         """
         return self.taille_fenetre
     
+    def get_temps_chargement(self, nom: str) -> float:
+        """Retourne le temps de chargement de la carte d'une scène
+
+        Args:
+            nom (str): nom de la scène
+
+        Returns:
+            float: temps de chargement de la carte, en secondes
+        """
+        return self.get_scenes()[nom].get_temps_chargement()
+
     def lancer(self) -> None:
-        """Lance le jeu
+        """Lance le jeu : la simulation avance par étapes de durée fixe, le rendu interpolant entre les deux dernières étapes
         """
+        structure_de_base = self.get_structure_de_base()
+        profileur = structure_de_base.get_profileur()
+        accumulateur = 0 # Temps réel pas encore simulé
+        precedent = time.perf_counter()
+        scene_affichee = None # Scène dont le rendu est dans la fenêtre
         while True: # Boucle infini pour simuler le jeu
-            self.gerer_evenements()
+            with profileur.mesurer("evenements"):
+                self.gerer_evenements()
+            if len(self.get_chargements()) > 0:
+                with profileur.mesurer("chargement"):
+                    self.finaliser_chargements()
+            if self.get_nom_scene_actuelle() not in self.get_scenes(): # La première scène n'est pas encore chargée
+                precedent = time.perf_counter()
+                profileur.fin_frame()
+                self.get_horloge().tick(60)
+                continue
+
+            # Simuler autant d'étapes fixes que le temps écoulé, sans dépasser le nombre d'étapes de rattrapage
+            pas = 1 / structure_de_base.get_frequence_simulation()
+            maintenant = time.perf_counter()
+            accumulateur += maintenant - precedent
+            precedent = maintenant
+            nb_etapes = 0
+            while accumulateur >= pas and nb_etapes < structure_de_base.get_nb_etapes_rattrapage():
+                structure_de_base.set_delta_time(pas)
+                with profileur.mesurer("simulation"):
+                    self.get_scene_actuelle().simuler()
+                accumulateur -= pas
+                nb_etapes += 1
+            if accumulateur >= pas: accumulateur = accumulateur % pas # Trop de retard : l'oublier plutôt que de ralentir encore
+            profileur.compter("etapes_simulation", nb_etapes)
+
+            with profileur.mesurer("scene"):
+                self.get_scene_actuelle().rendre(accumulateur / pas)
+            if not self.get_scene_actuelle().is_rendu_inchange() or scene_affichee != self.get_nom_scene_actuelle() or profileur.is_affiche(): # La fenêtre montre déjà ce rendu sinon
+                self.afficher()
+                if not structure_de_base.is_sans_fenetre():
+                    with profileur.mesurer("flip"):
+                        pg.display.flip()
+                scene_affichee = self.get_nom_scene_actuelle()
+            profileur.fin_frame()
+            if structure_de_base.get_frequence_rendu() == None: self.get_horloge().tick()
+            else: self.get_horloge().tick(structure_de_base.get_frequence_rendu())
+
+    def lancer_sans_fenetre(self, nb_frames: int, delta_time: float = None, dossier_images: str = None, flux_brut = None) -> dict:
+        """Réalise un nombre fixe de frames sans limite d'images par seconde et retourne les mesures du rendu
+
+        Args:
+            nb_frames (int): nombre de frames à réaliser
+            delta_time (float, optionnel): temps simulé entre deux frames, le temps réel si None
+            dossier_images (str, optionnel): dossier où enregistrer chaque frame en PNG, aucun enregistrement si None
+            flux_brut (optionnel): fichier binaire où écrire chaque frame en RGB brut, aucune écriture si None
+
+        Returns:
+            dict: nombre de frames, durée totale des frames en secondes, frames par seconde et nombre de rendus repris du cache
+        """
+        if dossier_images != None: os.makedirs(dossier_images, exist_ok = True)
+
+        while self.get_nom_scene_actuelle() not in self.get_scenes() and self.scene_demandee in self.get_chargements(): # Attendre la première scène plutôt que de jouer à vide
+            self.get_chargements()[self.scene_demandee].attendre()
+            self.finaliser_chargements()
+        assert self.get_nom_scene_actuelle() in self.get_scenes(), ("Moteur de jeu : aucune scène actuelle à jouer, créez-en une ou préchargez-la avant de lancer le jeu.")
+        scene = self.get_scene_actuelle()
+        succes_cache = scene.get_scene_graphique().get_nb_succes_cache() if scene.is_graphique() else 0
+        duree = 0
+        if delta_time != None: self.get_structure_de_base().set_delta_time(delta_time) # Toutes les frames simulent la même durée, la première comprise
+        for i in range(nb_frames):
+            debut = time.perf_counter()
+            if len(self.get_chargements()) > 0: self.finaliser_chargements()
             self.frame()
-            pg.display.flip()
-            self.get_structure_de_base().set_delta_time(self.get_horloge().tick(120) * 0.001)
+            temps_frame = time.perf_counter() - debut
+            duree += temps_frame
+            self.get_structure_de_base().get_profileur().fin_frame()
+
+            if dossier_images != None: # Enregistrer la frame
+                pg.image.save(self.get_fenetre(), os.path.join(dossier_images, "frame_" + str(i).zfill(5) + ".png"))
+            if flux_brut != None:
+                flux_brut.write(pg.image.tobytes(self.get_fenetre(), "RGB"))
+
+            if delta_time == None: self.get_structure_de_base().set_delta_time(temps_frame) # La frame suivante simule la durée réelle de celle-ci
+
+        if scene.is_graphique(): succes_cache = scene.get_scene_graphique().get_nb_succes_cache() - succes_cache
+        return {"nb_frames": nb_frames, "duree": duree, "frames_par_seconde": nb_frames / duree if duree > 0 else 0, "succes_cache_rendu": succes_cache}
     
-    def nouvelle_scene(self, nom: str, carte: str, graphique: bool = True, physique: bool = True) -> sc.Scene:
+    def nouvelle_scene(self, nom: str, carte: str, graphique: bool = True, physique: bool = True, visibilite: bool = False) -> sc.Scene:
         """Crée une nouvelle scène dans le jeu et la retoure
 
         Args:
@@ -129,20 +298,45 @@ class Moteur_De_Jeu:
             carte (str): chemin d'accés vers une carte à charger
             graphique (bool): si la scène utilise une partie graphique, par défaut à "True"
             physique (bool): si la scène utilise une partie physique, par défaut à "True"
+            visibilite (bool): si le PVS de la carte est lu ou calculé avec la scène, par défaut à "False"
 
         Returns:
             sc.Scene: scène crée
         """
-        assert list(self.get_scenes().keys()).count(nom) <= 0, ("Moteur de jeu : la scène \"" + nom + "\" existe déjà dans le jeu.")
-        scene = sc.Scene(nom, carte, self.get_taille_fenetre(), self.get_structure_de_base(), graphique = graphique, physique = physique)
+        assert nom not in self.get_scenes() and nom not in self.get_chargements(), ("Moteur de jeu : la scène \"" + nom + "\" existe déjà dans le jeu.")
+        scene = sc.Scene(nom, carte, self.get_taille_fenetre(), self.get_structure_de_base(), graphique = graphique, physique = physique, visibilite = visibilite)
         self.ajouter_scene(nom, scene)
         return scene
     
+    def precharger_scene(self, nom: str, carte: str, graphique: bool = True, physique: bool = True, visibilite: bool = False) -> ch.Chargement:
+        """Lance le chargement d'une nouvelle scène en arrière-plan et retourne son préchargement, la scène est ajoutée au jeu une fois finalisée
+
+        Args:
+            nom (str): nom de la scène à créer
+            carte (str): chemin d'accés vers une carte à charger
+            graphique (bool): si la scène utilise une partie graphique, par défaut à "True"
+            physique (bool): si la scène utilise une partie physique, par défaut à "True"
+            visibilite (bool): si le PVS de la carte est lu ou calculé avec la scène, par défaut à "False"
+
+        Returns:
+            ch.Chargement: préchargement de la scène
+        """
+        assert nom not in self.get_scenes() and nom not in self.get_chargements(), ("Moteur de jeu : la scène \"" + nom + "\" existe déjà dans le jeu.")
+        if self.executeur_chargements == None: self.executeur_chargements = ThreadPoolExecutor(max_workers = 1, thread_name_prefix = "chargement")
+        chargement = ch.Chargement(nom)
+        chargement.set_futur(self.executeur_chargements.submit(sc.Scene, nom, carte, self.get_taille_fenetre(), self.get_structure_de_base(), graphique = graphique, physique = physique, visibilite = visibilite, finaliser = False, rapporter = chargement.rapporter))
+        self.get_chargements()[nom] = chargement
+        return chargement
+
     def set_scene_actuelle(self, nom: str) -> None:
-        """Change la valeur de la scène actuelle
+        """Change la valeur de la scène actuelle, une scène en cours de préchargement le devenant dès qu'elle est prête
 
         Args:
             nom (str): valeur de la scène actuelle
         """
-        assert list(self.get_scenes().keys()).count(nom) > 0, ("Moteur de jeu : la scène \"" + nom + "\" que vous essayez de mettre en scène actuelle n'existe pas.")
-        self.scene_actuelle = nom
\ No newline at end of file
+        assert nom in self.get_scenes() or nom in self.get_chargements(), ("Moteur de jeu : la scène \"" + nom + "\" que vous essayez de mettre en scène actuelle n'existe pas.")
+        if nom in self.get_chargements(): # Continuer à jouer la scène actuelle pendant le chargement
+            self.scene_demandee = nom
+            return
+        self.scene_actuelle = nom
+        self.scene_demandee = None
\ No newline at end of file
@@ -7,6 +7,8 @@ import jeu
 
 moteur_de_jeu = jeu.Moteur_De_Jeu((550, 550))
 scene = moteur_de_jeu.nouvelle_scene("test", "cartes/niveau0.wad")
+for i, (x, y) in enumerate(((6.5, 2.5), (12.5, 1.5), (17.5, 3.5))): # Quelques tonneaux, dessinés en sprites
+    scene.nouvel_objet("tonneau " + str(i), x, y, sprite = "tonneau")
 moteur_de_jeu.set_scene_actuelle("test")
 
 moteur_de_jeu.lancer()
\ No newline at end of file
@@ -0,0 +1,123 @@
+#-------------------------------------
+#            Minicarte.py
+#-------------------------------------
+
+# Fichier contenant la minicarte d'une scène, vue de dessus.
+# Informations importantes :
+# -La minicarte a deux couches : une couche statique avec les tuiles de la carte, et une couche dynamique avec les objets qui bougent.
+# -La couche statique est une surface calculée d'un seul coup avec NumPy (une couleur par type de tuile), puis gardée tant que
+#  la carte ne change pas (même carte et même révision, voir Carte.get_revision) : aucun dessin par tuile à chaque frame.
+# -Une carte plus grande que la minicarte n'est lue qu'une cellule par pixel. Une carte fragmentée est lue directement depuis sa
+#  source, une ligne de cellules à la fois (voir Carte_Fragmentee.get_tuiles_grille) : la couche statique ne charge aucun fragment
+#  et ne chasse pas ceux du rendu, même quand elle est recalculée après une modification de la carte.
+# -La couche dynamique est redessinée à chaque frame par-dessus la couche statique, seulement avec les objets mobiles et la caméra.
+
+# Importer les librairies
+import carte as ca
+import math
+import numpy as np
+import pygame as pg
+import structure_de_base as sb
+
+class Minicarte:
+    """Classe représentant une minicarte, avec sa couche statique pré-rendue
+    """
+
+    def __init__(self, taille: tuple, structure_de_base: sb.Structure_De_Base) -> None:
+        """Créer une minicarte
+
+        Args:
+            taille (tuple): taille de la minicarte, en pixels
+            structure_de_base (sb.Structure_De_Base): structure de base du jeu
+        """
+        assert taille[0] > 0 and taille[1] > 0, ("Minicarte : la taille doit être positive.")
+
+        self.cle_statique = None # Carte, révision et taille ayant servi à calculer la couche statique
+        self.couche_statique = None # Surface des tuiles de la carte, à la taille de la minicarte
+        self.nb_couches_statiques = 0 # Nombre de fois où la couche statique a été calculée
+        self.structure_de_base = structure_de_base # Structure de base du jeu
+        self.taille = (int(taille[0]), int(taille[1])) # Taille de la minicarte, en pixels
+
+    def calculer_couche_statique(self, carte: ca.Carte) -> None:
+        """Calcule la couche statique à partir des tuiles de la carte
+
+        Args:
+            carte (ca.Carte): carte à dessiner
+        """
+        largeur, hauteur = carte.get_taille()
+        if largeur * hauteur <= self.taille[0] * self.taille[1] * 4: # Petite carte : lire toutes les tuiles
+            x, y = np.arange(largeur), np.arange(hauteur)
+        else: # Grande carte : lire seulement la cellule au centre de chaque pixel
+            x = ((np.arange(self.taille[0]) + 0.5) * largeur / self.taille[0]).astype(np.intp)
+            y = ((np.arange(self.taille[1]) + 0.5) * hauteur / self.taille[1]).astype(np.intp)
+        if isinstance(carte, ca.Carte_Fragmentee): # Par la source, sans passer par le cache des fragments
+            tuiles = carte.get_tuiles_grille(x, y)
+        else:
+            tuiles = np.asarray(carte.get_tuiles())[x[:, None], y[None, :]]
+
+        couleurs = np.array([type_tuile.get_couleur_2d()[:3] for type_tuile in carte.get_types_tuiles()], dtype=np.uint8) # Couleur de chaque type de tuile
+        pixels = couleurs[np.minimum(tuiles, len(couleurs) - 1)]
+        surface = pg.transform.scale(pg.surfarray.make_surface(pixels), self.taille)
+        if not self.get_structure_de_base().is_sans_fenetre(): surface = surface.convert()
+        self.couche_statique = surface
+        self.nb_couches_statiques += 1
+
+    def dessiner(self, surface: pg.Surface, destination: tuple, carte: ca.Carte, objets: list, position: tuple = None, angle: float = None, alpha: float = 1) -> None:
+        """Dessine la minicarte dans une surface : la couche statique, puis les objets mobiles et la caméra
+
+        Args:
+            surface (pg.Surface): surface où dessiner
+            destination (tuple): coin en haut à gauche de la minicarte dans la surface
+            carte (ca.Carte): carte dessinée
+            objets (list): objets graphiques mobiles à dessiner
+            position (tuple, optionnel): position de la caméra, pas de caméra dessinée si None
+            angle (float, optionnel): angle de la caméra en degrés, pas de direction dessinée si None
+            alpha (float, optionnel): avancée entre l'avant-dernière (0) et la dernière (1) étape de simulation où interpoler les objets, par défaut à 1
+        """
+        cle = (id(carte), carte.get_revision(), self.taille)
+        if cle != self.cle_statique: # La carte a changé depuis le dernier calcul
+            self.calculer_couche_statique(carte)
+            self.cle_statique = cle
+        surface.blit(self.couche_statique, destination)
+
+        echelle_x = self.taille[0] / carte.get_taille()[0]
+        echelle_y = self.taille[1] / carte.get_taille()[1]
+        rayon = max(echelle_x / 2, 1)
+        for objet in objets: # Dessiner les objets mobiles
+            position_objet = objet.get_objet().get_position_interpolee(alpha)
+            centre = (destination[0] + position_objet[0] * echelle_x, destination[1] + position_objet[1] * echelle_y)
+            if objet.get_forme_2d() == "cercle":
+                pg.draw.circle(surface, objet.get_couleur_2d(), centre, rayon)
+            else:
+                pg.draw.rect(surface, objet.get_couleur_2d(), (centre[0] - echelle_x / 2, centre[1] - echelle_y / 2, max(echelle_x, 1), max(echelle_y, 1)))
+
+        if position != None: # Dessiner la caméra et sa direction
+            centre = (destination[0] + position[0] * echelle_x, destination[1] + position[1] * echelle_y)
+            pg.draw.circle(surface, (0, 255, 0), centre, max(rayon, 2))
+            if angle != None:
+                longueur = max(rayon, 2) * 3
+                pg.draw.line(surface, (0, 255, 0), centre, (centre[0] + math.cos(math.radians(angle)) * longueur, centre[1] + math.sin(math.radians(angle)) * longueur))
+
+    def get_nb_couches_statiques(self) -> int:
+        """Retourne le nombre de fois où la couche statique a été calculée
+
+        Returns:
+            int: nombre de calculs de la couche statique
+        """
+        return self.nb_couches_statiques
+
+    def get_structure_de_base(self) -> sb.Structure_De_Base:
+        """Retourne la structure de base du jeu
+
+        Returns:
+            sb.Structure_De_Base: structure de base du jeu
+        """
+        return self.structure_de_base
+
+    def get_taille(self) -> tuple:
+        """Retourne la taille de la minicarte
+
+        Returns:
+            tuple: taille de la minicarte, en pixels
+        """
+        return self.taille
@@ -5,11 +5,13 @@
 # Fichier où tous ce qui est nécessaire au fonctionnement des objets dans le jeu se trouve.
 # Informations importantes :
 # -Chaques classes représente un style d"objet différent :
-#     -Objet représente un objet dans le jeu.
-#     -Objet_Graphique permet de donner un visuel graphique à un Objet.
+#     -Objet représente un objet dans le jeu, comme une vue sur sa ligne d'un stock d'entités (voir entites.py).
+#     -Objet_Graphique permet de donner un visuel graphique à un Objet : sa forme sur la minicarte, et un sprite dans le rendu en simili-3D.
 #     -Objet_Physique permet de donner de la physique à un Objet.
 
 # Importer les librairies
+import entites as en
+import index_spatial as isp
 import math
 
 def calculer_vecteur(angle: float) -> tuple:
@@ -21,7 +23,8 @@ def calculer_vecteur(angle: float) -> tuple:
     Returns:
         tuple: vecteur final
     """
-    return normaliser_vecteur((math.cos(math.radians(angle)), math.sin(math.radians(angle)), 0))
+    radians = math.radians(angle)
+    return (math.cos(radians), math.sin(radians), 0) # Déjà de norme 1
 
 def distance(position_1: tuple, position_2: tuple) -> float:
     """Retourne la distance entre deux points
@@ -49,27 +52,33 @@ def normaliser_vecteur(vecteur: tuple) -> tuple:
     return (vecteur[0] * multiplier, vecteur[1] * multiplier, vecteur[2] * multiplier)
 
 class Objet:
-    """Classe représentant un objet dans le jeu
+    """Classe représentant un objet dans le jeu, vue sur une ligne d'un stock d'entités
     """
 
-    def __init__(self, nom: str, position: tuple = (0, 0, 0)) -> None:
+    __slots__ = ("index_spatial", "ligne", "nom", "stock")
+
+    def __init__(self, nom: str, position: tuple = (0, 0, 0), stock: en.Stock_Entites = None) -> None:
         """Créer un objet dans le jeu
-        """
-        self.angle = 0 # Angle de l'objet
-        self.mouvement = (0, 0, 0) # Mouvement de l'objet
-        self.nom = nom # Nom de l'objet dans le jeu
-        self.position = position # Position de l'objet dans le jeu
 
-        self.vecteur_avant = (1, 0, 0) # Vecteur pour aller en avant dans le jeu
+        Args:
+            nom (str): nom de l'objet
+            position (tuple, optionnel): position de l'objet, par défaut à (0, 0, 0)
+            stock (en.Stock_Entites, optionnel): stock où ranger l'objet, par défaut un stock propre à l'objet
+        """
+        if stock == None: stock = en.Stock_Entites(1) # Un objet hors d'une scène a son propre stock
 
-        self.calculer_vecteurs()
+        self.index_spatial = None # Index spatial à prévenir quand l'objet bouge, None si l'objet n'est pas indexé
+        self.nom = nom # Nom de l'objet dans le jeu
+        self.stock = stock # Stock contenant la position, l'angle et les vitesses de l'objet
+        self.ligne = stock.ajouter(self, position) # Ligne de l'objet dans les tableaux du stock
 
     def calculer_vecteurs(self) -> None:
         """Recalculer les vecteurs
         """
 
         # Calculer le vecteur avant en utilisant de la trigonométrie
-        self.vecteur_avant = calculer_vecteur(self.get_angle())
+        vecteur_avant = calculer_vecteur(self.get_angle())
+        self.stock.get_vecteurs_avant()[self.ligne] = vecteur_avant
 
     def get_angle(self) -> float:
         """Retourne l'angle de l'objet
@@ -77,7 +86,34 @@ class Objet:
         Returns:
             float: angle de l'objet
         """
-        return self.angle
+        return float(self.stock.get_angles()[self.ligne])
+
+    def get_angle_interpole(self, alpha: float) -> float:
+        """Retourne l'angle de l'objet interpolé entre l'étape de simulation précédente et l'actuelle
+
+        Args:
+            alpha (float): avancée entre l'étape précédente (0) et l'actuelle (1)
+
+        Returns:
+            float: angle interpolé
+        """
+        return float(self.stock.interpoler_poses(self.ligne, alpha)[1])
+
+    def get_index_spatial(self) -> isp.Index_Spatial:
+        """Retourne l'index spatial contenant l'objet
+
+        Returns:
+            isp.Index_Spatial: index spatial contenant l'objet, None si l'objet n'est pas indexé
+        """
+        return self.index_spatial
+
+    def get_ligne(self) -> int:
+        """Retourne la ligne de l'objet dans les tableaux de son stock
+
+        Returns:
+            int: ligne de l'objet
+        """
+        return self.ligne
 
     def get_mouvement(self) -> tuple:
         """Retourne le mouvement de l'objet
@@ -85,7 +121,7 @@ class Objet:
         Returns:
             tuple: mouvement de l'objet
         """
-        return self.mouvement
+        return tuple(self.stock.get_mouvements()[self.ligne].tolist())
 
     def get_nom(self) -> str:
         """Retourne le nom de l'objet dans le jeu
@@ -101,15 +137,50 @@ class Objet:
         Returns:
             tuple: position de l'objet dans le jeu
         """
-        return self.position
+        return tuple(self.stock.get_positions()[self.ligne].tolist())
     
+    def get_position_interpolee(self, alpha: float) -> tuple:
+        """Retourne la position de l'objet interpolée entre l'étape de simulation précédente et l'actuelle
+
+        Args:
+            alpha (float): avancée entre l'étape précédente (0) et l'actuelle (1)
+
+        Returns:
+            tuple: position interpolée
+        """
+        return tuple(self.stock.interpoler_poses(self.ligne, alpha)[0].tolist())
+
+    def get_stock(self) -> en.Stock_Entites:
+        """Retourne le stock contenant l'objet
+
+        Returns:
+            en.Stock_Entites: stock de l'objet
+        """
+        return self.stock
+
     def get_vecteur_avant(self) -> tuple:
         """Retourne le vecteur avant de l'objet
 
         Returns:
             tuple: vecteur avant de l'objet
         """
-        return self.vecteur_avant
+        return tuple(self.stock.get_vecteurs_avant()[self.ligne].tolist())
+
+    def get_vitesse_angulaire(self) -> float:
+        """Retourne la vitesse de rotation de l'objet, appliquée par le stock à chaque étape de simulation
+
+        Returns:
+            float: vitesse de rotation, en degrés par seconde
+        """
+        return float(self.stock.get_vitesses_angulaires()[self.ligne])
+
+    def get_vitesse_lineaire(self) -> tuple:
+        """Retourne la vitesse de l'objet, appliquée par le stock à chaque étape de simulation, ou par la scène physique avec les collisions si l'objet a un corps
+
+        Returns:
+            tuple: vitesse de l'objet, en cellules par seconde
+        """
+        return tuple(self.stock.get_vitesses()[self.ligne].tolist())
     
     def frame(self, delta_time: float) -> None:
         """Effectue une frame de l'objet, dédié à l'héritage
@@ -118,15 +189,23 @@ class Objet:
             delta_time (float): temps entre la dernière frame et la frame actuelle
         """
 
+    def memoriser_pose(self) -> None:
+        """Garde la position et l'angle actuels comme pose de l'étape de simulation précédente, pour l'interpolation du rendu
+        """
+        self.stock.get_angles_precedents()[self.ligne] = self.stock.get_angles()[self.ligne]
+        self.stock.get_positions_precedentes()[self.ligne] = self.stock.get_positions()[self.ligne]
+
     def move(self, mouvement: tuple) -> None:
         """Bouge l'objet
 
         Args:
             mouvement (tuple): mouvement à appliquer à l'objet
         """
-        self.mouvement = mouvement
-        position = self.get_position()
-        self.set_position((position[0] + self.get_mouvement()[0], position[1] + self.get_mouvement()[1], position[2] + self.get_mouvement()[2]))
+        self.stock.get_mouvements()[self.ligne] = mouvement
+        if mouvement[0] == 0 and mouvement[1] == 0 and mouvement[2] == 0: # Pas de mouvement, la position ne change pas
+            return
+        self.stock.get_positions()[self.ligne] += mouvement
+        if self.index_spatial != None: self.index_spatial.mettre_a_jour(self)
 
     def rotate(self, angle: float) -> None:
         """Tourne l'objet d'un certain angle
@@ -134,7 +213,7 @@ class Objet:
         Args:
             angle (float): angle pour faire tourner l'objet
         """
-        if self.get_angle() != angle:
+        if angle != 0:
             self.set_angle(self.get_angle() + angle)
             self.calculer_vecteurs()
 
@@ -144,26 +223,65 @@ class Objet:
         Args:
             angle (float): nouvelle valeur de l'angle
         """
-        self.angle = angle
+        self.stock.get_angles()[self.ligne] = angle
     
+    def set_index_spatial(self, index_spatial: isp.Index_Spatial) -> None:
+        """Change l'index spatial contenant l'objet, appelé par l'index lui-même
+
+        Args:
+            index_spatial (isp.Index_Spatial): index spatial contenant l'objet, None si l'objet n'est plus indexé
+        """
+        self.index_spatial = index_spatial
+
     def set_position(self, position: tuple) -> None:
-        """Change la position de l'objet
+        """Change la position de l'objet, en tenant à jour l'index spatial qui le contient
 
         Args:
             position (tuple): nouvelle position de l'objet
         """
-        self.position = position
+        positions = self.stock.get_positions()
+        if positions[self.ligne, 0] == position[0] and positions[self.ligne, 1] == position[1] and positions[self.ligne, 2] == position[2]: # Même position, rien à faire
+            return
+        positions[self.ligne] = position
+        if self.index_spatial != None: self.index_spatial.mettre_a_jour(self)
+
+    def set_vitesse_angulaire(self, vitesse_angulaire: float) -> None:
+        """Change la vitesse de rotation de l'objet
+
+        Args:
+            vitesse_angulaire (float): nouvelle vitesse de rotation, en degrés par seconde
+        """
+        self.stock.get_vitesses_angulaires()[self.ligne] = vitesse_angulaire
+
+    def set_vitesse_lineaire(self, vitesse_lineaire: tuple) -> None:
+        """Change la vitesse de l'objet
+
+        Args:
+            vitesse_lineaire (tuple): nouvelle vitesse, en cellules par seconde
+        """
+        self.stock.get_vitesses()[self.ligne] = vitesse_lineaire
     
 class Objet_Graphique:
     """Classe représentant un affichage pour un objet
     """
 
-    def __init__(self, objet: Objet, couleur_2d: tuple = (0, 0, 0), forme_2d: str = "rectangle") -> None:
+    def __init__(self, objet: Objet, couleur_2d: tuple = (0, 0, 0), forme_2d: str = "rectangle", sprite: str = None, taille_sprite: float = 0.5) -> None:
         """Créer un affichage pour un objet
+
+        Args:
+            objet (Objet): objet affilié à cet affichage
+            couleur_2d (tuple, optionnel): couleur de l'objet lors d'un rendu 2D, par défaut à (0, 0, 0)
+            forme_2d (str, optionnel): forme de l'objet lors d'un rendu 2D, par défaut à "rectangle"
+            sprite (str, optionnel): nom de la texture du sprite de l'objet dans le rendu en simili-3D, pas de sprite si None
+            taille_sprite (float, optionnel): hauteur du sprite par rapport à celle d'un mur, par défaut à 0.5
         """
+        assert taille_sprite > 0, ("Objet graphique \"" + objet.get_nom() + "\" : la taille du sprite doit être positive.")
+
         self.couleur_2d = couleur_2d # Couleur affiché sur un rendu 2D
         self.forme_2d = forme_2d # Forme affiché sur un rendu 2D
         self.objet = objet # Objet affilié à cet affichage
+        self.sprite = sprite # Texture du sprite dessiné dans le rendu en simili-3D, None si pas de sprite
+        self.taille_sprite = taille_sprite # Hauteur du sprite par rapport à celle d'un mur
 
     def frame(self, delta_time: float) -> None:
         """Effectue une frame de l'objet, dédié à l'héritage
@@ -195,16 +313,55 @@ class Objet_Graphique:
             Objet: objet affilié à cet affichage
         """
         return self.objet
+
+    def get_sprite(self) -> str:
+        """Retourne le nom de la texture du sprite de l'objet
+
+        Returns:
+            str: texture du sprite, None si l'objet n'a pas de sprite
+        """
+        return self.sprite
+
+    def get_taille_sprite(self) -> float:
+        """Retourne la hauteur du sprite de l'objet
+
+        Returns:
+            float: hauteur du sprite par rapport à celle d'un mur
+        """
+        return self.taille_sprite
     
 class Objet_Physique:
-    """Classe représentant une physique pour un objet
+    """Classe représentant une physique pour un objet, dont la taille, la forme, la vitesse et le déplacement demandé sont rangés
+    dans le stock de l'objet
     """
 
-    def __init__(self, objet: Objet) -> None:
+    def __init__(self, objet: Objet, forme: str = "cercle", taille: float = 0.25) -> None:
         """Créer une physique pour un objet
+
+        Args:
+            objet (Objet): objet affilié à cette physique
+            forme (str, optionnel): forme du corps, "cercle" ou "boite" (alignée sur les axes), par défaut à "cercle"
+            taille (float, optionnel): rayon du cercle ou demi-côté de la boîte, par défaut à 0.25
         """
+        assert forme in ("cercle", "boite"), ("Objet physique \"" + objet.get_nom() + "\" : la forme \"" + str(forme) + "\" n'existe pas.")
+        assert taille > 0, ("Objet physique \"" + objet.get_nom() + "\" : la taille doit être positive.")
+
         self.objet = objet # Objet affilié à cet physique
 
+        stock, ligne = objet.get_stock(), objet.get_ligne()
+        stock.get_cercles()[ligne] = forme == "cercle"
+        stock.get_deplacements()[ligne] = 0
+        stock.get_tailles_corps()[ligne] = taille
+        stock.get_vitesses_corps()[ligne] = 0
+
+    def deplacer(self, mouvement: tuple) -> None:
+        """Demande un déplacement du corps, appliqué avec les collisions à la prochaine étape de la physique
+
+        Args:
+            mouvement (tuple): déplacement à ajouter
+        """
+        self.objet.get_stock().get_deplacements()[self.objet.get_ligne()] += mouvement
+
     def frame(self, delta_time: float) -> None:
         """Effectue une frame de l'objet, dédié à l'héritage
 
@@ -212,6 +369,22 @@ class Objet_Physique:
             delta_time (float): temps entre la dernière frame et la frame actuelle
         """
 
+    def get_deplacement(self) -> tuple:
+        """Retourne le déplacement demandé depuis la dernière étape de la physique
+
+        Returns:
+            tuple: déplacement demandé
+        """
+        return tuple(self.objet.get_stock().get_deplacements()[self.objet.get_ligne()].tolist())
+
+    def get_forme(self) -> str:
+        """Retourne la forme du corps
+
+        Returns:
+            str: "cercle" ou "boite"
+        """
+        return "cercle" if self.objet.get_stock().get_cercles()[self.objet.get_ligne()] else "boite"
+
     def get_objet(self) -> Objet:
         """Retourne l'objet affilié à cette physique
 
@@ -219,18 +392,53 @@ class Objet_Physique:
             Objet: objet affilié à cette physique
         """
         return self.objet
+
+    def get_taille(self) -> float:
+        """Retourne le rayon du cercle ou le demi-côté de la boîte
+
+        Returns:
+            float: taille du corps
+        """
+        return float(self.objet.get_stock().get_tailles_corps()[self.objet.get_ligne()])
+
+    def get_vitesse(self) -> tuple:
+        """Retourne la vitesse du corps
+
+        Returns:
+            tuple: vitesse du corps, en cellules par seconde
+        """
+        return tuple(self.objet.get_stock().get_vitesses_corps()[self.objet.get_ligne()].tolist())
+
+    def set_deplacement(self, deplacement: tuple) -> None:
+        """Change le déplacement demandé depuis la dernière étape de la physique
+
+        Args:
+            deplacement (tuple): nouveau déplacement demandé
+        """
+        self.objet.get_stock().get_deplacements()[self.objet.get_ligne()] = deplacement
+
+    def set_vitesse(self, vitesse: tuple) -> None:
+        """Change la vitesse du corps
+
+        Args:
+            vitesse (tuple): nouvelle vitesse, en cellules par seconde
+        """
+        self.objet.get_stock().get_vitesses_corps()[self.objet.get_ligne()] = vitesse
     
 class Joueur(Objet):
     """Classe représentant le joueur, héritant de Objet
     """
 
-    def __init__(self, position: tuple = (0, 0, 0)) -> None:
+    __slots__ = ("vitesse", "vitesse_rotation")
+
+    def __init__(self, position: tuple = (0, 0, 0), stock: en.Stock_Entites = None) -> None:
         """Créer un joueur
 
         Args:
             position (tuple, optionnel): position du joueur, par défaut à (0, 0, 0)
+            stock (en.Stock_Entites, optionnel): stock où ranger le joueur, par défaut un stock propre au joueur
         """
-        super().__init__("joueur", position)
+        super().__init__("joueur", position, stock)
 
         self.vitesse = 5 # Vitesse du joueur
         self.vitesse_rotation = 90 # Vitesse de rotation du joueur
@@ -0,0 +1,276 @@
+#-------------------------------------
+#             Palette.py
+#-------------------------------------
+
+# Fichier contenant la palette de 256 couleurs et les tables de lumière et de brouillard du rendu en couleurs indexées.
+# Informations importantes :
+# -En couleurs indexées, le tampon contient un octet par pixel (l'indice d'une couleur de la palette) au lieu de quatre,
+#  et n'est converti vers les couleurs de l'écran qu'une fois par frame, à la mise à l'échelle.
+# -La palette est calculée par coupe médiane sur les couleurs des textures chargées, à tous les niveaux d'ombrage,
+#  pour que les couleurs assombries ou noyées dans le brouillard y aient aussi leur place.
+# -Les distances sont découpées en bandes. Pour chaque bande, une table (colormap) donne l'indice de la couleur
+#  assombrie et mélangée au brouillard de chaque couleur de la palette.
+# -Les textures sont gardées déjà ombrées pour chaque bande (voir get_pile_ombree) : l'ombrage d'un texel est compris
+#  dans sa lecture, aucune opération par pixel n'est ajoutée au rendu.
+
+# Importer les librairies
+import numpy as np
+
+def bandes_distances(distances: np.ndarray, nb_bandes: int, distance_brouillard: float) -> np.ndarray:
+    """Retourne la bande d'ombrage de chaque distance, la dernière bande allant de la distance du brouillard à l'infini
+
+    Args:
+        distances (np.ndarray): distances à découper
+        nb_bandes (int): nombre de bandes
+        distance_brouillard (float): distance où le brouillard recouvre tout
+
+    Returns:
+        np.ndarray: bande de chaque distance, entre 0 et nb_bandes - 1
+    """
+    bandes = np.nan_to_num(np.asarray(distances, dtype=np.float64) * (nb_bandes / distance_brouillard), nan = nb_bandes, posinf = nb_bandes)
+    return np.clip(bandes, 0, nb_bandes - 1).astype(np.intp)
+
+def couleurs_proches(couleurs: np.ndarray, palette: np.ndarray, taille_lot: int = 16384) -> np.ndarray:
+    """Retourne l'indice de la couleur de la palette la plus proche de chaque couleur
+
+    Args:
+        couleurs (np.ndarray): couleurs à chercher, de forme (n, 3)
+        palette (np.ndarray): couleurs de la palette, de forme (nb_couleurs, 3)
+        taille_lot (int, optionnel): nombre de couleurs cherchées ensemble, pour borner la mémoire, par défaut à 16384
+
+    Returns:
+        np.ndarray: indice de la couleur la plus proche, de forme (n,)
+    """
+    couleurs = np.asarray(couleurs, dtype=np.float32).reshape(-1, 3)
+    palette = np.asarray(palette, dtype=np.float32)
+    normes_palette = (palette ** 2).sum(axis = 1)
+    retour = np.empty(len(couleurs), dtype=np.uint8)
+    for debut in range(0, len(couleurs), taille_lot): # Distance au carré, sans le carré de la couleur cherchée qui ne change pas le minimum
+        lot = couleurs[debut:debut + taille_lot]
+        retour[debut:debut + taille_lot] = np.argmin(normes_palette[None, :] - 2 * lot @ palette.T, axis = 1)
+    return retour
+
+def coupe_mediane(couleurs: np.ndarray, nb_couleurs: int = 256) -> np.ndarray:
+    """Retourne une palette résumant des couleurs, en coupant en deux la boîte de couleurs la plus étendue jusqu'à en avoir assez
+
+    Args:
+        couleurs (np.ndarray): couleurs à résumer, de forme (n, 3)
+        nb_couleurs (int, optionnel): nombre de couleurs de la palette, par défaut à 256
+
+    Returns:
+        np.ndarray: couleurs de la palette, de forme (nb_couleurs, 3), complétée avec du noir s'il y a moins de couleurs différentes
+    """
+    boites = [np.unique(np.clip(np.rint(couleurs), 0, 255).astype(np.int32).reshape(-1, 3), axis = 0)]
+    etendues = [np.ptp(boites[0], axis = 0)]
+    while len(boites) < nb_couleurs:
+        i = int(np.argmax([etendue.max() for etendue in etendues]))
+        if etendues[i].max() == 0: # Chaque boîte n'a plus qu'une couleur
+            break
+        boite = boites.pop(i)
+        axe = int(np.argmax(etendues.pop(i)))
+        boite = boite[np.argsort(boite[:, axe], kind = "stable")]
+        for moitie in (boite[:len(boite) // 2], boite[len(boite) // 2:]):
+            boites.append(moitie)
+            etendues.append(np.ptp(moitie, axis = 0))
+
+    palette = np.zeros((nb_couleurs, 3), dtype=np.uint8)
+    palette[:len(boites)] = np.rint([boite.mean(axis = 0) for boite in boites])
+    return palette
+
+class Palette:
+    """Classe représentant une palette de 256 couleurs, avec ses tables de lumière et de brouillard par bande de distance
+    """
+
+    def __init__(self, nb_bandes: int = 32, distance_brouillard: float = 16, couleur_brouillard: tuple = (0, 0, 0), lumiere: float = 1) -> None:
+        """Créer une palette, calculée au premier appel de mettre_a_jour
+
+        Args:
+            nb_bandes (int, optionnel): nombre de bandes de distance, par défaut à 32
+            distance_brouillard (float, optionnel): distance, en cellules, où le brouillard recouvre tout, par défaut à 16
+            couleur_brouillard (tuple, optionnel): couleur du brouillard, noir pour une lumière qui diminue avec la distance, par défaut à (0, 0, 0)
+            lumiere (float, optionnel): niveau de lumière de la scène, entre 0 et 1, par défaut à 1
+        """
+        assert 0 < nb_bandes <= 256, ("Palette : le nombre de bandes doit être entre 1 et 256.")
+        assert distance_brouillard > 0, ("Palette : la distance du brouillard doit être positive.")
+        assert 0 <= lumiere <= 1, ("Palette : le niveau de lumière doit être entre 0 et 1.")
+
+        self.cle = None # Textures et réglages ayant servi au dernier calcul
+        self.colormaps = None # Indice de la couleur ombrée de chaque couleur de la palette, indexé [bande, couleur]
+        self.couleur_brouillard = tuple(couleur_brouillard[:3]) # Couleur du brouillard
+        self.couleurs = None # Couleurs de la palette, de forme (256, 3)
+        self.distance_brouillard = distance_brouillard # Distance où le brouillard recouvre tout
+        self.lumiere = lumiere # Niveau de lumière de la scène
+        self.nb_bandes = nb_bandes # Nombre de bandes de distance
+        self.nb_textures = 0 # Nombre de textures de la pile ombrée
+        self.pile_ombree = None # Indices des texels des textures ombrés dans chaque bande, indexés [bande * nb_textures + texture, u, v]
+        self.revision = 0 # Nombre de calculs de la palette
+
+    def calculer(self, pile_couleurs: np.ndarray, couleurs_unies: list) -> None:
+        """Calcule la palette, les tables d'ombrage et la pile des textures ombrées
+
+        Args:
+            pile_couleurs (np.ndarray): couleurs des texels des textures, indexées [texture, u, v, canal]
+            couleurs_unies (list): couleurs utilisées sans texture (plafond, sol et murs unis), à garder dans la palette
+        """
+        facteurs = self.get_facteurs_bandes()
+        couleurs = np.concatenate((pile_couleurs.reshape(-1, 3), np.array(couleurs_unies, dtype=np.uint8).reshape(-1, 3)))
+        couleurs = np.unique(couleurs, axis = 0).astype(np.float32)
+        echantillons = [self.ombrer(couleurs, facteur) for facteur in facteurs[::max(self.get_nb_bandes() // 8, 1)]] # Quelques niveaux d'ombrage
+        self.couleurs = coupe_mediane(np.concatenate(echantillons))
+
+        # Table de chaque bande, puis textures converties en indices et ombrées dans chaque bande
+        self.colormaps = np.stack([couleurs_proches(self.ombrer(self.couleurs.astype(np.float32), facteur), self.couleurs) for facteur in facteurs])
+        indices = couleurs_proches(pile_couleurs.reshape(-1, 3), self.couleurs).reshape(pile_couleurs.shape[:3])
+        self.nb_textures = len(pile_couleurs)
+        self.pile_ombree = self.colormaps[:, indices].reshape((-1,) + pile_couleurs.shape[1:3])
+        self.revision += 1
+
+    def get_bandes(self, distances: np.ndarray) -> np.ndarray:
+        """Retourne la bande d'ombrage de chaque distance
+
+        Args:
+            distances (np.ndarray): distances, en cellules
+
+        Returns:
+            np.ndarray: bande de chaque distance
+        """
+        return bandes_distances(distances, self.get_nb_bandes(), self.get_distance_brouillard())
+
+    def get_colormaps(self) -> np.ndarray:
+        """Retourne les tables d'ombrage de chaque bande
+
+        Returns:
+            np.ndarray: indice de la couleur ombrée de chaque couleur de la palette, indexé [bande, couleur]
+        """
+        return self.colormaps
+
+    def get_couleur_brouillard(self) -> tuple:
+        """Retourne la couleur du brouillard
+
+        Returns:
+            tuple: couleur du brouillard
+        """
+        return self.couleur_brouillard
+
+    def get_couleurs(self) -> np.ndarray:
+        """Retourne les couleurs de la palette
+
+        Returns:
+            np.ndarray: couleurs de la palette, de forme (256, 3)
+        """
+        return self.couleurs
+
+    def get_distance_brouillard(self) -> float:
+        """Retourne la distance où le brouillard recouvre tout
+
+        Returns:
+            float: distance du brouillard, en cellules
+        """
+        return self.distance_brouillard
+
+    def get_facteurs_bandes(self) -> np.ndarray:
+        """Retourne la part de brouillard au milieu de chaque bande, de 0 (aucun brouillard) à 1 (que du brouillard)
+
+        Returns:
+            np.ndarray: part de brouillard de chaque bande
+        """
+        facteurs = (np.arange(self.get_nb_bandes()) + 0.5) / self.get_nb_bandes()
+        facteurs[-1] = 1 # La dernière bande va jusqu'à l'infini
+        return facteurs
+
+    def get_indice(self, couleur: tuple) -> int:
+        """Retourne l'indice de la couleur de la palette la plus proche d'une couleur
+
+        Args:
+            couleur (tuple): couleur cherchée
+
+        Returns:
+            int: indice dans la palette
+        """
+        return int(couleurs_proches(np.array(couleur[:3]), self.get_couleurs())[0])
+
+    def get_lumiere(self) -> float:
+        """Retourne le niveau de lumière de la scène
+
+        Returns:
+            float: niveau de lumière, entre 0 et 1
+        """
+        return self.lumiere
+
+    def get_nb_bandes(self) -> int:
+        """Retourne le nombre de bandes de distance
+
+        Returns:
+            int: nombre de bandes
+        """
+        return self.nb_bandes
+
+    def get_nb_textures(self) -> int:
+        """Retourne le nombre de textures de la pile ombrée
+
+        Returns:
+            int: nombre de textures, l'écart entre deux bandes d'une même texture dans la pile ombrée
+        """
+        return self.nb_textures
+
+    def get_pile_ombree(self) -> np.ndarray:
+        """Retourne les textures en indices de la palette, ombrées dans chaque bande
+
+        Returns:
+            np.ndarray: indices des texels, indexés [bande * nb_textures + texture, u, v]
+        """
+        return self.pile_ombree
+
+    def get_reglages(self) -> tuple:
+        """Retourne les réglages de l'ombrage
+
+        Returns:
+            tuple: nombre de bandes, distance du brouillard, couleur du brouillard et niveau de lumière
+        """
+        return (self.get_nb_bandes(), self.get_distance_brouillard(), self.get_couleur_brouillard(), self.get_lumiere())
+
+    def get_revision(self) -> int:
+        """Retourne le nombre de calculs de la palette, qui change dès que les couleurs ou les tables changent
+
+        Returns:
+            int: révision de la palette
+        """
+        return self.revision
+
+    def mettre_a_jour(self, pile_couleurs: np.ndarray, couleurs_unies: list) -> None:
+        """Recalcule la palette si des textures ont été chargées ou si les réglages ont changé depuis le dernier calcul
+
+        Args:
+            pile_couleurs (np.ndarray): couleurs des texels des textures, indexées [texture, u, v, canal]
+            couleurs_unies (list): couleurs utilisées sans texture, à garder dans la palette
+        """
+        cle = (len(pile_couleurs), tuple(tuple(couleur) for couleur in couleurs_unies), self.get_reglages())
+        if cle != self.cle:
+            self.calculer(pile_couleurs, couleurs_unies)
+            self.cle = cle
+
+    def ombrer(self, couleurs: np.ndarray, facteur: float) -> np.ndarray:
+        """Retourne des couleurs éclairées selon la lumière de la scène puis mélangées au brouillard
+
+        Args:
+            couleurs (np.ndarray): couleurs à ombrer, de forme (n, 3)
+            facteur (float): part de brouillard, entre 0 et 1
+
+        Returns:
+            np.ndarray: couleurs ombrées, de forme (n, 3)
+        """
+        return couleurs * (self.get_lumiere() * (1 - facteur)) + np.array(self.get_couleur_brouillard(), dtype=np.float32) * facteur
+
+    def set_brouillard(self, distance_brouillard: float, couleur_brouillard: tuple = None, lumiere: float = None) -> None:
+        """Change les réglages de l'ombrage, appliqués au prochain appel de mettre_a_jour
+
+        Args:
+            distance_brouillard (float): distance, en cellules, où le brouillard recouvre tout
+            couleur_brouillard (tuple, optionnel): couleur du brouillard, inchangée par défaut
+            lumiere (float, optionnel): niveau de lumière de la scène entre 0 et 1, inchangé par défaut
+        """
+        assert distance_brouillard > 0, ("Palette : la distance du brouillard doit être positive.")
+        assert lumiere == None or 0 <= lumiere <= 1, ("Palette : le niveau de lumière doit être entre 0 et 1.")
+        self.distance_brouillard = distance_brouillard
+        if couleur_brouillard != None: self.couleur_brouillard = tuple(couleur_brouillard[:3])
+        if lumiere != None: self.lumiere = lumiere
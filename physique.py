@@ -0,0 +1,136 @@
+#-------------------------------------
+#            Physique.py
+#-------------------------------------
+
+# Fichier contenant les collisions des corps mobiles avec les murs de la carte.
+# Informations importantes :
+# -Tous les corps d'une frame sont déplacés ensemble avec des opérations sur des tableaux NumPy, sans boucle par corps.
+# -Un déplacement est découpé en sous-pas plus petits que la moitié du corps pour qu'aucun corps ne traverse un mur (déplacement balayé).
+# -Une boîte (AABB) est déplacée axe par axe et s'arrête contre le premier mur, un cercle est repoussé hors des murs
+#  qu'il touche. Dans les deux cas, la partie du déplacement le long du mur est gardée : le corps glisse.
+# -Les cellules hors de la carte sont considérées comme des murs.
+
+# Importer les librairies
+import numpy as np
+
+FORMES = ("cercle", "boite")
+EPSILON = 1e-9
+
+def _murs(occupation: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Retourne si des cellules sont des murs, les cellules hors de la carte en étant
+
+    Args:
+        occupation (np.ndarray): grille d'occupation, indexée [x, y], 0 pour le vide
+        x (np.ndarray): coordonnées x des cellules
+        y (np.ndarray): coordonnées y des cellules
+
+    Returns:
+        np.ndarray: si chaque cellule est un mur
+    """
+    largeur, hauteur = occupation.shape
+    dans_carte = (x >= 0) & (x < largeur) & (y >= 0) & (y < hauteur)
+    retour = ~dans_carte
+    if dans_carte.any():
+        retour[dans_carte] = occupation[x[dans_carte], y[dans_carte]] != 0
+    return retour
+
+def _balayer_axe(occupation: np.ndarray, positions: np.ndarray, deplacements: np.ndarray, demi_tailles: np.ndarray, axe: int) -> None:
+    """Déplace des boîtes le long d'un axe en les arrêtant contre le premier mur, sur place
+
+    Args:
+        occupation (np.ndarray): grille d'occupation, indexée [x, y], 0 pour le vide
+        positions (np.ndarray): centre de chaque boîte, de forme (n, 2), modifié sur place
+        deplacements (np.ndarray): déplacement de chaque boîte le long de l'axe, plus petit qu'une cellule
+        demi_tailles (np.ndarray): demi-côté de chaque boîte
+        axe (int): 0 pour l'axe x, 1 pour l'axe y
+    """
+    autre = 1 - axe
+    positions[:, axe] += deplacements
+    bougent = deplacements != 0
+    if not bougent.any():
+        return
+
+    # Ligne (ou colonne) de cellules atteinte par le bord avant de chaque boîte
+    vers_plus = deplacements > 0
+    bord = positions[:, axe] + np.where(vers_plus, demi_tailles, -demi_tailles)
+    rangee = np.floor(np.where(vers_plus, bord - EPSILON, bord + EPSILON)).astype(np.intp) # Une boîte collée contre un mur ne le touche pas
+
+    # Cellules couvertes par chaque boîte sur l'autre axe
+    premieres = np.floor(positions[:, autre] - demi_tailles + EPSILON).astype(np.intp)
+    dernieres = np.floor(positions[:, autre] + demi_tailles - EPSILON).astype(np.intp)
+    touche = np.zeros(len(positions), dtype=bool)
+    for decalage in range(int((dernieres - premieres).max()) + 1):
+        cellules = premieres + decalage
+        a_tester = bougent & (cellules <= dernieres)
+        x, y = (rangee, cellules) if axe == 0 else (cellules, rangee)
+        touche |= a_tester & _murs(occupation, x, y)
+
+    # Coller les boîtes qui touchent un mur contre celui-ci
+    positions[:, axe] = np.where(touche & vers_plus, rangee - demi_tailles, positions[:, axe])
+    positions[:, axe] = np.where(touche & ~vers_plus, rangee + 1 + demi_tailles, positions[:, axe])
+
+def _repousser_cercles(occupation: np.ndarray, positions: np.ndarray, rayons: np.ndarray, actifs: np.ndarray) -> None:
+    """Repousse des cercles hors des murs qu'ils touchent, sur place
+
+    Args:
+        occupation (np.ndarray): grille d'occupation, indexée [x, y], 0 pour le vide
+        positions (np.ndarray): centre de chaque cercle, de forme (n, 2), modifié sur place
+        rayons (np.ndarray): rayon de chaque cercle
+        actifs (np.ndarray): si chaque cercle doit être repoussé
+    """
+    portee = int(np.ceil(rayons[actifs].max()))
+    decalages = [(i, j) for i in range(-portee, portee + 1) for j in range(-portee, portee + 1) if (i, j) != (0, 0)]
+    decalages.sort(key = lambda decalage: abs(decalage[0]) + abs(decalage[1])) # Les côtés avant les coins, pour glisser le long des murs
+    for i, j in decalages:
+        cellules_x = np.floor(positions[:, 0]).astype(np.intp) + i
+        cellules_y = np.floor(positions[:, 1]).astype(np.intp) + j
+        proches = np.clip(positions, np.stack((cellules_x, cellules_y), axis = 1), np.stack((cellules_x + 1, cellules_y + 1), axis = 1)) # Point du mur le plus proche
+        ecarts = positions - proches
+        distances = np.sqrt((ecarts * ecarts).sum(axis = 1))
+        penetrent = actifs & (distances < rayons) & (distances > 0)
+        if not penetrent.any():
+            continue
+        penetrent[penetrent] = _murs(occupation, cellules_x[penetrent], cellules_y[penetrent])
+        distances = np.where(penetrent, distances, 1)
+        positions += np.where(penetrent[:, None], ecarts / distances[:, None] * (rayons - distances)[:, None], 0)
+
+def deplacer_corps(occupation: np.ndarray, positions: np.ndarray, deplacements: np.ndarray, tailles: np.ndarray, cercles: np.ndarray) -> tuple:
+    """Déplace des corps dans la grille en les faisant glisser contre les murs
+
+    Args:
+        occupation (np.ndarray): grille d'occupation, indexée [x, y], 0 pour le vide
+        positions (np.ndarray): centre de chaque corps, de forme (n, 2)
+        deplacements (np.ndarray): déplacement voulu de chaque corps, de forme (n, 2)
+        tailles (np.ndarray): rayon de chaque cercle ou demi-côté de chaque boîte
+        cercles (np.ndarray): si chaque corps est un cercle, sinon une boîte
+
+    Returns:
+        tuple: nouvelles positions de forme (n, 2), et si chaque corps a été bloqué sur chaque axe, de forme (n, 2)
+    """
+    positions = np.array(positions, dtype=np.float64).reshape(-1, 2)
+    deplacements = np.asarray(deplacements, dtype=np.float64).reshape(-1, 2)
+    tailles = np.broadcast_to(np.asarray(tailles, dtype=np.float64), (len(positions),))
+    cercles = np.broadcast_to(np.asarray(cercles, dtype=bool), (len(positions),))
+    depart = positions.copy()
+    if len(positions) == 0:
+        return positions, np.zeros((0, 2), dtype=bool)
+
+    # Nombre de sous-pas de chaque corps, pour ne jamais avancer de plus que la moitié de sa taille (ou d'une demi-cellule)
+    pas_max = np.clip(tailles / 2, 0.005, 0.5)
+    nb_sous_pas = np.maximum(np.ceil(np.abs(deplacements).max(axis = 1) / pas_max), 1).astype(np.intp)
+    sous_pas = deplacements / nb_sous_pas[:, None]
+    boites = ~cercles
+    for etape in range(int(nb_sous_pas.max())):
+        actifs = (nb_sous_pas > etape) & np.any(sous_pas != 0, axis = 1)
+        if not actifs.any():
+            break
+        if (actifs & boites).any():
+            pas_boites = np.where((actifs & boites)[:, None], sous_pas, 0)
+            _balayer_axe(occupation, positions, pas_boites[:, 0], tailles, 0)
+            _balayer_axe(occupation, positions, pas_boites[:, 1], tailles, 1)
+        if (actifs & cercles).any():
+            positions += np.where((actifs & cercles)[:, None], sous_pas, 0)
+            _repousser_cercles(occupation, positions, tailles, actifs & cercles)
+
+    bloques = np.abs((positions - depart) - deplacements) > EPSILON
+    return positions, bloques
@@ -0,0 +1,257 @@
+#-------------------------------------
+#            Profileur.py
+#-------------------------------------
+
+# Fichier contenant le profileur des frames du jeu.
+# Informations importantes :
+# -Chaque étape d'une frame (évènements, objets, rendu_3d, raycast, affichage...) est chronométrée avec "with profileur.mesurer(nom):",
+#  et des compteurs (rayons lancés, cellules parcourues, rectangles dessinés...) sont augmentés avec profileur.compter(nom, valeur).
+# -Les temps et les compteurs d'une frame sont additionnés, puis rangés dans un tampon circulaire de taille fixe à la fin de la frame :
+#  les percentiles (p50, p95, p99) portent donc sur les dernières frames.
+# -Les étapes et les compteurs ont chacun leurs séries : une étape et un compteur de même nom (comme "sprites") restent distincts.
+# -Désactivé, le profileur ne fait qu'un test : mesurer retourne une mesure vide partagée et compter ne fait rien.
+
+# Importer les librairies
+import csv
+import json
+import numpy as np
+import time
+
+class Mesure:
+    """Classe représentant le chronométrage d'une étape, à utiliser avec "with"
+    """
+
+    def __init__(self, profileur, nom: str) -> None:
+        """Créer une mesure
+
+        Args:
+            profileur (Profileur): profileur recevant le temps mesuré
+            nom (str): nom de l'étape mesurée
+        """
+        self.debut = 0 # Début de la mesure
+        self.nom = nom # Nom de l'étape mesurée
+        self.profileur = profileur # Profileur recevant le temps mesuré
+
+    def __enter__(self):
+        """Démarre la mesure
+        """
+        self.debut = time.perf_counter()
+        return self
+
+    def __exit__(self, type_erreur, erreur, trace) -> None:
+        """Arrête la mesure et l'ajoute à la frame en cours du profileur
+        """
+        self.profileur.ajouter_temps(self.nom, time.perf_counter() - self.debut)
+
+class Mesure_Vide:
+    """Classe représentant une mesure qui ne fait rien, utilisée quand le profileur est désactivé
+    """
+
+    def __enter__(self):
+        """Ne fait rien
+        """
+        return self
+
+    def __exit__(self, type_erreur, erreur, trace) -> None:
+        """Ne fait rien
+        """
+
+MESURE_VIDE = Mesure_Vide()
+
+class Profileur:
+    """Classe représentant un profileur des étapes et des compteurs de chaque frame
+    """
+
+    def __init__(self, taille: int = 600, actif: bool = False) -> None:
+        """Créer un profileur
+
+        Args:
+            taille (int, optionnel): nombre de frames gardées dans le tampon circulaire, par défaut à 600
+            actif (bool, optionnel): si le profileur mesure, par défaut à "False"
+        """
+        assert taille > 0, ("Profileur : la taille du tampon doit être positive.")
+
+        self.actif = actif # Si le profileur mesure
+        self.affiche = False # Si les mesures sont affichées par-dessus le rendu
+        self.compteurs_frame = {} # Compteurs de la frame en cours, de clé leur nom
+        self.index = 0 # Prochaine case du tampon circulaire
+        self.nb_frames = 0 # Nombre de frames rangées dans le tampon, au plus sa taille
+        self.police = None # Police de l'affichage, chargée au premier affichage
+        self.series_compteurs = {} # Compteurs de chaque frame du tampon circulaire, de clé leur nom
+        self.series_temps = {} # Temps des étapes (en secondes) de chaque frame du tampon circulaire, de clé leur nom
+        self.taille = taille # Nombre de frames gardées
+        self.temps_frame = {} # Temps des étapes de la frame en cours, de clé leur nom
+
+    def ajouter_temps(self, nom: str, temps: float) -> None:
+        """Ajoute un temps à une étape de la frame en cours
+
+        Args:
+            nom (str): nom de l'étape
+            temps (float): temps à ajouter, en secondes
+        """
+        self.temps_frame[nom] = self.temps_frame.get(nom, 0) + temps
+
+    def compter(self, nom: str, valeur: int = 1) -> None:
+        """Augmente un compteur de la frame en cours
+
+        Args:
+            nom (str): nom du compteur
+            valeur (int, optionnel): valeur à ajouter, par défaut à 1
+        """
+        if self.actif:
+            self.compteurs_frame[nom] = self.compteurs_frame.get(nom, 0) + valeur
+
+    def dessiner(self, surface) -> None:
+        """Dessine les statistiques des étapes et des compteurs en haut à gauche d'une surface
+
+        Args:
+            surface (pg.Surface): surface où dessiner
+        """
+        import pygame as pg # Seul l'affichage dépend de pygame
+
+        if self.police == None:
+            if not pg.font.get_init(): pg.font.init()
+            self.police = pg.font.SysFont("monospace", 12)
+        lignes = ["etape (ms)          p50      p95      p99"]
+        statistiques = self.get_statistiques()
+        for genre, format_valeur, echelle in (("temps", "%.2f", 1000), ("compteurs", "%.0f", 1)): # Les étapes en millisecondes, puis les compteurs entiers
+            for nom in sorted(statistiques[genre]):
+                lignes.append(nom[:14].ljust(14) + "".join((format_valeur % (statistiques[genre][nom][p] * echelle)).rjust(9) for p in ("p50", "p95", "p99")))
+
+        hauteur_ligne = self.police.get_linesize()
+        fond = pg.Surface((290, hauteur_ligne * len(lignes) + 4), pg.SRCALPHA)
+        fond.fill((0, 0, 0, 170))
+        surface.blit(fond, (0, 0))
+        for i, ligne in enumerate(lignes):
+            surface.blit(self.police.render(ligne, True, (255, 255, 0)), (4, 2 + i * hauteur_ligne))
+
+    def exporter_csv(self, chemin: str) -> None:
+        """Exporte les mesures de chaque frame du tampon en CSV, une ligne par frame et une colonne par étape ("temps.nom")
+        ou compteur ("compteurs.nom")
+
+        Args:
+            chemin (str): chemin d'accés vers le fichier à écrire
+        """
+        series = self.get_series()
+        colonnes = [(genre, nom) for genre in ("temps", "compteurs") for nom in sorted(series[genre])]
+        fichier = open(chemin, "w", newline = "")
+        ecrivain = csv.writer(fichier)
+        ecrivain.writerow(["frame"] + [genre + "." + nom for genre, nom in colonnes])
+        for i in range(self.nb_frames):
+            ecrivain.writerow([i] + [repr(float(series[genre][nom][i])) for genre, nom in colonnes])
+        fichier.close()
+
+    def exporter_json(self, chemin: str) -> None:
+        """Exporte les statistiques et les mesures de chaque frame du tampon en JSON
+
+        Args:
+            chemin (str): chemin d'accés vers le fichier à écrire
+        """
+        fichier = open(chemin, "w")
+        json.dump({
+            "nb_frames": self.nb_frames,
+            "statistiques": self.get_statistiques(),
+            "series": {genre: {nom: serie.tolist() for nom, serie in series.items()} for genre, series in self.get_series().items()},
+        }, fichier, indent = 1)
+        fichier.close()
+
+    def fin_frame(self) -> None:
+        """Range les temps et les compteurs de la frame en cours dans le tampon circulaire
+        """
+        if not self.actif:
+            return
+
+        for frame, series in ((self.temps_frame, self.series_temps), (self.compteurs_frame, self.series_compteurs)):
+            for nom in set(frame) | set(series): # Une étape absente d'une frame y a duré 0, un compteur absent y vaut 0
+                serie = series.get(nom)
+                if serie is None:
+                    serie = np.zeros(self.taille)
+                    series[nom] = serie
+                serie[self.index] = frame.get(nom, 0)
+        self.index = (self.index + 1) % self.taille
+        self.nb_frames = min(self.nb_frames + 1, self.taille)
+        self.temps_frame.clear()
+        self.compteurs_frame.clear()
+
+    def get_series(self) -> dict:
+        """Retourne les mesures des frames du tampon, de la plus ancienne à la plus récente
+
+        Returns:
+            dict: de clé "temps" (étapes, en secondes) et "compteurs", et de valeur les mesures de chaque frame de clé leur nom
+        """
+        ordre = (np.arange(self.nb_frames) + (self.index - self.nb_frames)) % self.taille
+        return {genre: {nom: serie[ordre] for nom, serie in series.items()} for genre, series in (("temps", self.series_temps), ("compteurs", self.series_compteurs))}
+
+    def get_statistiques(self) -> dict:
+        """Retourne les statistiques des étapes et des compteurs sur les frames du tampon
+
+        Returns:
+            dict: de clé "temps" (étapes) et "compteurs", et de valeur un dictionnaire de clé leur nom et de valeur un dictionnaire
+                  avec "p50", "p95", "p99", "moyenne" et "max" (en secondes pour les étapes)
+        """
+        retour = {}
+        for genre, series in self.get_series().items():
+            retour[genre] = {}
+            for nom, serie in series.items():
+                if len(serie) == 0: continue
+                p50, p95, p99 = np.percentile(serie, (50, 95, 99))
+                retour[genre][nom] = {"p50": float(p50), "p95": float(p95), "p99": float(p99), "moyenne": float(serie.mean()), "max": float(serie.max())}
+        return retour
+
+    def is_actif(self) -> bool:
+        """Retourne si le profileur mesure
+
+        Returns:
+            bool: si le profileur mesure
+        """
+        return self.actif
+
+    def is_affiche(self) -> bool:
+        """Retourne si les mesures sont affichées par-dessus le rendu
+
+        Returns:
+            bool: si les mesures sont affichées
+        """
+        return self.affiche
+
+    def mesurer(self, nom: str):
+        """Retourne une mesure d'une étape, à utiliser avec "with"
+
+        Args:
+            nom (str): nom de l'étape
+
+        Returns:
+            Mesure: mesure de l'étape, ou une mesure vide si le profileur est désactivé
+        """
+        if not self.actif:
+            return MESURE_VIDE
+        return Mesure(self, nom)
+
+    def reinitialiser(self) -> None:
+        """Oublie toutes les mesures
+        """
+        self.compteurs_frame.clear()
+        self.index = 0
+        self.nb_frames = 0
+        self.series_compteurs.clear()
+        self.series_temps.clear()
+        self.temps_frame.clear()
+
+    def set_actif(self, actif: bool) -> None:
+        """Active ou désactive le profileur
+
+        Args:
+            actif (bool): si le profileur mesure
+        """
+        self.actif = actif
+        self.compteurs_frame.clear()
+        self.temps_frame.clear()
+
+    def set_affiche(self, affiche: bool) -> None:
+        """Change si les mesures sont affichées par-dessus le rendu, ce qui active le profileur
+
+        Args:
+            affiche (bool): si les mesures sont affichées
+        """
+        self.affiche = affiche
+        if affiche: self.set_actif(True)
@@ -0,0 +1,215 @@
+#-------------------------------------
+#          Rasterisation.py
+#-------------------------------------
+
+# Fichier contenant la rasterisation des colonnes du rendu en simili-3D dans un tampon de pixels.
+# Informations importantes :
+# -Le tampon est un tableau NumPy de forme (largeur, hauteur) de pixels entiers, dans la disposition de pygame.surfarray.pixels2d.
+# -Les couleurs sont donc données au format des pixels de la surface (voir pygame.Surface.map_rgb).
+# -Chaque colonne du tampon correspond à un rayon, le tampon est ensuite mis à l'échelle de la fenêtre.
+# -Le sol et le plafond texturés sont calculés en une passe sur toute la moitié basse : chaque ligne du tampon voit le sol à une
+#  distance fixe (voir distances_lignes), d'où la position dans le monde de chaque pixel. Le plafond est le reflet du sol
+#  par rapport à l'horizon et réutilise les mêmes coordonnées de texture.
+# -En couleurs indexées (voir palette.py), le tampon et les textures contiennent des indices de la palette au lieu de pixels,
+#  les textures étant déjà ombrées pour chaque bande de distance : les mêmes fonctions écrivent les deux tampons.
+
+# Importer les librairies
+import numpy as np
+
+DECALAGE_TEXELS = 2 ** 20 # Décalage des coordonnées du sol en texels, multiple de toute taille de texture jusqu'à 2 ** 20
+
+def limites_colonnes(hauteurs: np.ndarray, hauteur_tampon: int) -> tuple:
+    """Retourne les lignes de début et de fin de chaque mur dans le tampon
+
+    Args:
+        hauteurs (np.ndarray): hauteur projetée du mur de chaque colonne, 0 si aucun mur
+        hauteur_tampon (int): hauteur du tampon en pixels
+
+    Returns:
+        tuple: lignes de début (incluses) et de fin (exclues) de chaque mur
+    """
+    hauteurs = np.nan_to_num(hauteurs, nan = 0, posinf = 0)
+    milieu = hauteur_tampon / 2
+    debuts = np.clip(milieu - hauteurs / 2, 0, hauteur_tampon).astype(np.intp)
+    fins = np.clip(milieu + hauteurs / 2, 0, hauteur_tampon).astype(np.intp)
+    return debuts, fins
+
+def masque_murs(debuts: np.ndarray, fins: np.ndarray, hauteur_tampon: int) -> np.ndarray:
+    """Retourne le masque des pixels couverts par un mur
+
+    Args:
+        debuts (np.ndarray): ligne de début de chaque mur
+        fins (np.ndarray): ligne de fin de chaque mur
+        hauteur_tampon (int): hauteur du tampon en pixels
+
+    Returns:
+        np.ndarray: masque des pixels de mur, de forme (nb_colonnes, hauteur_tampon)
+    """
+    lignes = np.arange(hauteur_tampon)
+    return (lignes >= debuts[:, None]) & (lignes < fins[:, None])
+
+def rasteriser_colonnes(tampon: np.ndarray, hauteurs: np.ndarray, couleur_plafond: int, couleur_mur: int, couleur_sol: int) -> None:
+    """Écrit le plafond, les murs et le sol de chaque colonne dans le tampon
+
+    Args:
+        tampon (np.ndarray): tampon de pixels de forme (nb_colonnes, hauteur), modifié sur place
+        hauteurs (np.ndarray): hauteur projetée du mur de chaque colonne, 0 si aucun mur
+        couleur_plafond (int): couleur du plafond, au format des pixels du tampon
+        couleur_mur (int): couleur des murs, au format des pixels du tampon
+        couleur_sol (int): couleur du sol, au format des pixels du tampon
+    """
+    hauteur_tampon = tampon.shape[1]
+    tampon[:, :hauteur_tampon // 2] = couleur_plafond
+    tampon[:, hauteur_tampon // 2:] = couleur_sol
+    debuts, fins = limites_colonnes(hauteurs, hauteur_tampon)
+    tampon[masque_murs(debuts, fins, hauteur_tampon)] = couleur_mur
+
+def distances_lignes(hauteur_tampon: int, distance_ecran: float, hauteur_yeux: float = 1) -> np.ndarray:
+    """Retourne la distance (corrigée de l'effet fish-eye) du sol vu par chaque ligne de la moitié basse du tampon
+
+    Args:
+        hauteur_tampon (int): hauteur du tampon en pixels
+        distance_ecran (float): distance de projection de l'écran
+        hauteur_yeux (float, optionnel): hauteur des yeux au-dessus du sol, la moitié de celle des murs, par défaut à 1
+
+    Returns:
+        np.ndarray: distance de chaque ligne, de la ligne hauteur_tampon // 2 à la dernière
+    """
+    decalages = np.arange(hauteur_tampon // 2, hauteur_tampon) + 0.5 - hauteur_tampon / 2 # Écart entre le centre de la ligne et l'horizon
+    return hauteur_yeux * distance_ecran / np.maximum(decalages, 0.5)
+
+def rasteriser_sol_plafond(tampon: np.ndarray, hauteurs: np.ndarray, position: tuple, vecteurs: np.ndarray, corrections: np.ndarray, distances: np.ndarray, texture_sol: np.ndarray, texture_plafond: np.ndarray, bandes_lignes: np.ndarray = None) -> None:
+    """Écrit le sol et le plafond texturés dans le tampon, avant les murs qui les recouvrent
+
+    Args:
+        tampon (np.ndarray): tampon de pixels de forme (nb_colonnes, hauteur), modifié sur place
+        hauteurs (np.ndarray): hauteur projetée du mur de chaque colonne, 0 si aucun mur
+        position (tuple): position de la caméra
+        vecteurs (np.ndarray): direction de chaque colonne, de forme (nb_colonnes, 2)
+        corrections (np.ndarray): correction de l'effet fish-eye de chaque colonne
+        distances (np.ndarray): distance du sol vu par chaque ligne de la moitié basse (voir distances_lignes)
+        texture_sol (np.ndarray): pixels de la texture du sol, indexés [u, v], au format des pixels du tampon,
+                                  ou indexés [bande, u, v] avec les bandes d'ombrage des lignes
+        texture_plafond (np.ndarray): pixels de la texture du plafond, de même forme que celle du sol
+        bandes_lignes (np.ndarray, optionnel): bande d'ombrage de chaque ligne de la moitié basse (voir pa.Palette), aucun ombrage si None
+    """
+    taille = texture_sol.shape[-1]
+    assert taille & (taille - 1) == 0, ("Rasterisation : la taille des textures du sol et du plafond doit être une puissance de 2.")
+    hauteur_tampon = tampon.shape[1]
+    milieu = hauteur_tampon // 2
+    debuts, fins = limites_colonnes(hauteurs, hauteur_tampon)
+
+    # Ne calculer que les lignes de la moitié basse dont le sol, ou le reflet au plafond, n'est pas caché par les murs de toutes les colonnes
+    premiere = max(min(int(fins.min()) - milieu, hauteur_tampon - milieu - int(debuts.max())), 0)
+    if premiere >= hauteur_tampon - milieu:
+        return
+
+    # Position dans le monde du sol vu par chaque pixel, en texels, décalée pour rester positive (la troncature est alors un arrondi inférieur)
+    etendues = distances[premiere:][None, :] * (taille / corrections)[:, None] # Distance le long du rayon, en texels
+    u = (position[0] * taille + DECALAGE_TEXELS + vecteurs[:, 0, None] * etendues).astype(np.int32) & (taille - 1)
+    v = (position[1] * taille + DECALAGE_TEXELS + vecteurs[:, 1, None] * etendues).astype(np.int32) & (taille - 1)
+    texels = u * taille + v
+    if bandes_lignes is not None: texels += (bandes_lignes[premiere:] * (taille * taille)).astype(np.int32)[None, :] # Lire la texture ombrée de la bande de chaque ligne
+    tampon[:, milieu + premiere:] = np.take(texture_sol.ravel(), texels)
+
+    # Le plafond de la ligne l est le reflet du sol de la ligne hauteur_tampon - 1 - l, la ligne du milieu n'en ayant pas si la hauteur est impaire
+    sans_reflet = max(hauteur_tampon - 2 * milieu - premiere, 0)
+    fin_plafond = hauteur_tampon - milieu - premiere - sans_reflet # Lignes du plafond au-dessus de celles cachées dans toutes les colonnes
+    if fin_plafond > 0:
+        tampon[:, fin_plafond - 1::-1] = np.take(texture_plafond.ravel(), texels[:, sans_reflet:])
+
+class Cache_Hauteurs:
+    """Classe représentant les lignes de texture à lire pour chaque hauteur de mur, calculées une seule fois
+    """
+
+    def __init__(self, hauteur_tampon: int, taille_texture: int, pas_hauteur: int = 2, hauteur_max: int = None) -> None:
+        """Créer un cache des lignes de texture, les hauteurs étant arrondies au pas et bornées
+
+        Args:
+            hauteur_tampon (int): hauteur du tampon en pixels
+            taille_texture (int): hauteur des textures en pixels
+            pas_hauteur (int, optionnel): arrondi des hauteurs de mur, par défaut à 2
+            hauteur_max (int, optionnel): hauteur de mur maximum, par défaut à 4 fois la hauteur du tampon
+        """
+        if hauteur_max == None: hauteur_max = 4 * hauteur_tampon
+
+        self.hauteur_tampon = hauteur_tampon # Hauteur du tampon en pixels
+        self.pas_hauteur = pas_hauteur # Arrondi des hauteurs de mur
+        self.taille_texture = taille_texture # Hauteur des textures en pixels
+
+        # Calculer la ligne de texture de chaque pixel pour chaque hauteur arrondie, -1 hors du mur
+        hauteurs = np.arange(hauteur_max // pas_hauteur + 1) * pas_hauteur
+        debuts, fins = limites_colonnes(hauteurs.astype(np.float64), hauteur_tampon)
+        lignes = np.arange(hauteur_tampon)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            v = np.floor((lignes[None, :] - (hauteur_tampon / 2 - hauteurs[:, None] / 2)) * taille_texture / hauteurs[:, None])
+        v = np.clip(np.nan_to_num(v), 0, taille_texture - 1).astype(np.int16)
+        v[~masque_murs(debuts, fins, hauteur_tampon)] = -1
+        self.lignes_texture = v # Ligne de texture à lire, indexée [hauteur arrondie, ligne du tampon]
+
+    def get_lignes_texture(self, hauteurs: np.ndarray) -> np.ndarray:
+        """Retourne la ligne de texture à lire pour chaque pixel de chaque colonne
+
+        Args:
+            hauteurs (np.ndarray): hauteur projetée du mur de chaque colonne, 0 si aucun mur
+
+        Returns:
+            np.ndarray: ligne de texture de chaque pixel, -1 hors du mur, de forme (nb_colonnes, hauteur_tampon)
+        """
+        indices = np.rint(np.nan_to_num(hauteurs, nan = 0, posinf = 0) / self.pas_hauteur)
+        indices = np.clip(indices, 0, len(self.lignes_texture) - 1).astype(np.intp)
+        return self.lignes_texture[indices]
+
+    def is_compatible(self, hauteur_tampon: int, taille_texture: int) -> bool:
+        """Retourne si le cache correspond à une hauteur de tampon et une taille de texture
+
+        Args:
+            hauteur_tampon (int): hauteur du tampon en pixels
+            taille_texture (int): hauteur des textures en pixels
+
+        Returns:
+            bool: si le cache peut être utilisé
+        """
+        return self.hauteur_tampon == hauteur_tampon and self.taille_texture == taille_texture
+
+def coordonnees_murs(faces: np.ndarray, positions: np.ndarray, vecteurs: np.ndarray) -> np.ndarray:
+    """Retourne la coordonnée horizontale, entre 0 et 1, de l'impact de chaque rayon sur son mur
+
+    Args:
+        faces (np.ndarray): face touchée par chaque rayon (voir raycast.py)
+        positions (np.ndarray): position de chaque impact, de forme (n, 2)
+        vecteurs (np.ndarray): vecteur de chaque rayon, de forme (n, 2)
+
+    Returns:
+        np.ndarray: coordonnée de chaque impact sur son mur, 0 si rien n'est touché
+    """
+    positions = np.nan_to_num(positions)
+    coordonnees = np.where(faces == 0, positions[:, 1], positions[:, 0]) # Une face "h" est le long de y, une face "v" le long de x
+    coordonnees = coordonnees - np.floor(coordonnees)
+    inverser = ((faces == 0) & (vecteurs[:, 0] < 0)) | ((faces == 1) & (vecteurs[:, 1] > 0)) # Ne pas voir les textures en miroir
+    return np.where(inverser, 1 - coordonnees, coordonnees)
+
+def rasteriser_colonnes_texturees(tampon: np.ndarray, hauteurs: np.ndarray, pile_textures: np.ndarray, textures: np.ndarray, coordonnees: np.ndarray, cache_hauteurs: Cache_Hauteurs, couleur_plafond: int, couleur_sol: int, fond: bool = True) -> None:
+    """Écrit le plafond, les murs texturés et le sol de chaque colonne dans le tampon
+
+    Args:
+        tampon (np.ndarray): tampon de pixels de forme (nb_colonnes, hauteur), modifié sur place
+        hauteurs (np.ndarray): hauteur projetée du mur de chaque colonne, 0 si aucun mur
+        pile_textures (np.ndarray): pixels des textures, indexés [texture, u, v], au format des pixels du tampon
+        textures (np.ndarray): indice de la texture du mur de chaque colonne
+        coordonnees (np.ndarray): coordonnée de l'impact sur le mur de chaque colonne, entre 0 et 1
+        cache_hauteurs (Cache_Hauteurs): lignes de texture à lire pour chaque hauteur de mur
+        couleur_plafond (int): couleur du plafond, au format des pixels du tampon
+        couleur_sol (int): couleur du sol, au format des pixels du tampon
+        fond (bool, optionnel): si le plafond et le sol unis sont écrits, "False" s'ils sont déjà dans le tampon (voir rasteriser_sol_plafond), par défaut à "True"
+    """
+    if fond:
+        hauteur_tampon = tampon.shape[1]
+        tampon[:, :hauteur_tampon // 2] = couleur_plafond
+        tampon[:, hauteur_tampon // 2:] = couleur_sol
+
+    u = np.minimum((coordonnees * pile_textures.shape[1]).astype(np.intp), pile_textures.shape[1] - 1)
+    colonnes = pile_textures[textures, u] # Colonne de texture de chaque colonne du tampon
+    v = cache_hauteurs.get_lignes_texture(hauteurs)
+    texels = np.take_along_axis(colonnes, np.maximum(v, 0).astype(np.intp), axis = 1)
+    np.copyto(tampon, texels, where = v >= 0)
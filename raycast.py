@@ -0,0 +1,255 @@
+#-------------------------------------
+#             Raycast.py
+#-------------------------------------
+
+# Fichier contenant le raycast par lot, qui fait avancer tous les rayons d'une frame ensemble avec NumPy.
+# Informations importantes :
+# -Le parcours reproduit exactement celui de Scene_Graphique.ray_cast :
+#     -le parcours "h" avance de ligne verticale de la grille en ligne verticale (x entier),
+#     -le parcours "v" avance de ligne horizontale de la grille en ligne horizontale (y entier),
+#     -le plus proche des deux impacts est gardé, le parcours "v" gagnant en cas d'égalité.
+# -Avec un champ de distance aux murs (voir distances_murs), un rayon dans une zone vide saute d'un coup toutes les cellules
+#  dont le champ garantit qu'elles sont vides, et ne teste plus qu'une cellule par saut. Les coordonnées d'un rayon sont
+#  toujours calculées depuis son nombre de pas (départ + pas × nombre de pas), avec ou sans saut : un saut n'ajoute que des
+#  pas, les impacts sont identiques au bit près.
+# -Par lot, chaque tour de boucle coûte surtout ses appels NumPy : les sauts ne font gagner du temps que sur les cartes
+#  ouvertes (voir saut_rentable), même s'ils réduisent toujours le nombre de cellules testées.
+# -Les rayons d'un lot peuvent partir chacun d'une position différente : les rayons de plusieurs caméras (par exemple
+#  ceux de tous les environnements d'environnements.py) avancent alors dans la même boucle.
+
+# Importer les librairies
+import numpy as np
+
+FACE_AUCUNE = -1 # Aucun mur touché
+FACE_H = 0 # Mur touché par le parcours horizontal (ligne x entière)
+FACE_V = 1 # Mur touché par le parcours vertical (ligne y entière)
+DISTANCE_MAX = 32 # Distance maximum gardée dans un champ de distance aux murs, en cellules
+DISTANCE_MOYENNE_SAUT = 6 # Distance moyenne aux murs des cellules vides à partir de laquelle sauter les zones vides accélère le raycast par lot
+
+class Raycast_Lot:
+    """Classe contenant les résultats d'un raycast par lot
+    """
+
+    def __init__(self, distances: np.ndarray, cellules_touchees: np.ndarray, faces_touchees: np.ndarray, positions_touchees: np.ndarray, nb_pas: np.ndarray = None) -> None:
+        """Crée un résultat de raycast par lot
+        """
+        if nb_pas is None: nb_pas = np.zeros(len(distances), dtype=np.intp)
+
+        self.cellules_touchees = cellules_touchees
+        self.distances = distances
+        self.faces_touchees = faces_touchees
+        self.nb_pas = nb_pas # Nombre de cellules testées par chaque rayon, parcours "h" et "v" compris
+        self.positions_touchees = positions_touchees
+
+    def get_cellules_touchees(self) -> np.ndarray:
+        """Retourne les cellules touchées par chaque rayon, (-1, -1) si rien n'est touché
+
+        Returns:
+            np.ndarray: cellules touchées, de forme (n, 2)
+        """
+        return self.cellules_touchees
+
+    def get_distances(self) -> np.ndarray:
+        """Retourne la distance de chaque impact à la position de départ, infinie si rien n'est touché
+
+        Returns:
+            np.ndarray: distances des impacts, de forme (n,)
+        """
+        return self.distances
+
+    def get_faces_touchees(self) -> np.ndarray:
+        """Retourne la face touchée par chaque rayon (FACE_H, FACE_V ou FACE_AUCUNE)
+
+        Returns:
+            np.ndarray: faces touchées, de forme (n,)
+        """
+        return self.faces_touchees
+
+    def get_nb_pas(self) -> np.ndarray:
+        """Retourne le nombre de cellules testées par chaque rayon
+
+        Returns:
+            np.ndarray: nombre de cellules testées, de forme (n,)
+        """
+        return self.nb_pas
+
+    def get_positions_touchees(self) -> np.ndarray:
+        """Retourne la position de chaque impact, NaN si rien n'est touché
+
+        Returns:
+            np.ndarray: positions des impacts, de forme (n, 2)
+        """
+        return self.positions_touchees
+
+    def get_touches(self) -> np.ndarray:
+        """Retourne un masque des rayons ayant touché un mur
+
+        Returns:
+            np.ndarray: masque des rayons ayant touché un mur, de forme (n,)
+        """
+        return self.faces_touchees != FACE_AUCUNE
+
+def _parcourir(occupation: np.ndarray, x: np.ndarray, y: np.ndarray, pas_x: np.ndarray, pas_y: np.ndarray, decalage_x: np.ndarray, decalage_y: np.ndarray, actifs: np.ndarray, nb_pas: np.ndarray, distances: np.ndarray = None) -> np.ndarray:
+    """Fait avancer des rayons de ligne de grille en ligne de grille jusqu'à un mur ou la sortie de la carte
+
+    Args:
+        occupation (np.ndarray): carte d'occupation, non nulle là où se trouve un mur
+        x (np.ndarray): coordonnées x des rayons au premier pas, modifiées sur place
+        y (np.ndarray): coordonnées y des rayons au premier pas, modifiées sur place
+        pas_x (np.ndarray): avancée en x à chaque pas
+        pas_y (np.ndarray): avancée en y à chaque pas
+        decalage_x (np.ndarray): décalage entre x et la cellule testée (1 si le rayon va vers les x négatifs)
+        decalage_y (np.ndarray): décalage entre y et la cellule testée (1 si le rayon va vers les y négatifs)
+        actifs (np.ndarray): masque des rayons à faire avancer
+        nb_pas (np.ndarray): nombre de cellules testées par chaque rayon, augmenté sur place
+        distances (np.ndarray, optionnel): champ de distance aux murs de la carte, pour sauter les cellules vides, par défaut aucun
+
+    Returns:
+        np.ndarray: masque des rayons ayant touché un mur
+    """
+    largeur, hauteur = occupation.shape
+    if distances is not None: # Nombre de cellules franchies par un pas, sur l'axe qui avance le plus
+        pas_max = np.maximum(np.abs(pas_x), np.abs(pas_y))
+        etapes = np.zeros(len(x)) # Nombre de pas de chaque rayon depuis son premier pas, les sauts compris
+    departs_x, departs_y = x.copy(), y.copy()
+    tours = 0 # Nombre de pas de chaque rayon sans saut, le même pour tous
+    touche = np.zeros(len(x), dtype=np.bool_)
+    indices = np.flatnonzero(actifs)
+    while indices.size > 0: # Avancer tant qu'il reste des rayons dans la carte
+        cellule_x = x[indices] - decalage_x[indices]
+        cellule_y = y[indices] - decalage_y[indices]
+        dans_carte = (cellule_x >= 0) & (x[indices] < largeur) & (cellule_y >= 0) & (y[indices] < hauteur)
+        indices = indices[dans_carte]
+        cellule_x = np.floor(cellule_x[dans_carte]).astype(np.intp)
+        cellule_y = np.floor(cellule_y[dans_carte]).astype(np.intp)
+        nb_pas[indices] += 1
+
+        if distances is None:
+            mur = occupation[cellule_x, cellule_y] != 0
+        else:
+            distance = distances[cellule_x, cellule_y]
+            mur = distance == 0
+        touche[indices[mur]] = True
+        indices = indices[~mur]
+
+        tours += 1
+        if distances is None:
+            nb = tours
+        else: # Les cellules à moins de "distance" cellules (Chebyshev) de la cellule testée sont vides : les sauter sans les tester
+            nb = etapes[indices] + 1 + np.maximum(np.floor((distance[~mur] - 1 - 1e-9) / pas_max[indices]), 0)
+            etapes[indices] = nb
+        x[indices] = departs_x[indices] + pas_x[indices] * nb
+        y[indices] = departs_y[indices] + pas_y[indices] * nb
+    return touche
+
+def distances_murs(occupation: np.ndarray, distance_max: int = DISTANCE_MAX) -> np.ndarray:
+    """Retourne le champ de distance aux murs d'une carte : pour chaque cellule, la distance de Chebyshev au mur le plus proche
+
+    Args:
+        occupation (np.ndarray): carte d'occupation indexée [x, y], non nulle là où se trouve un mur
+        distance_max (int, optionnel): distance à partir de laquelle le champ n'est plus précis, par défaut à DISTANCE_MAX
+
+    Returns:
+        np.ndarray: distances indexées [x, y], 0 pour un mur, le dehors de la carte comptant comme des murs
+    """
+    murs = np.ones((occupation.shape[0] + 2, occupation.shape[1] + 2), dtype=bool) # Entourer la carte de murs
+    murs[1:-1, 1:-1] = np.asarray(occupation) != 0
+    retour = np.full(murs.shape, distance_max, dtype=np.uint8)
+    retour[murs] = 0
+    atteintes = murs.copy()
+    for distance in range(1, distance_max): # Grossir les murs d'une cellule (voisinage 3x3) à chaque distance
+        grossies = atteintes.copy()
+        grossies[1:, :] |= atteintes[:-1, :]
+        grossies[:-1, :] |= atteintes[1:, :]
+        lignes = grossies.copy()
+        grossies[:, 1:] |= lignes[:, :-1]
+        grossies[:, :-1] |= lignes[:, 1:]
+        nouvelles = grossies & ~atteintes
+        if not nouvelles.any():
+            break
+        retour[nouvelles] = distance
+        atteintes = grossies
+    return retour[1:-1, 1:-1]
+
+def saut_rentable(occupation: np.ndarray, distances: np.ndarray) -> bool:
+    """Retourne si sauter les zones vides accélère le raycast par lot sur une carte, c'est-à-dire si la carte est assez ouverte
+
+    Args:
+        occupation (np.ndarray): carte d'occupation indexée [x, y], non nulle là où se trouve un mur
+        distances (np.ndarray): champ de distance aux murs de la carte (voir distances_murs)
+
+    Returns:
+        bool: si la distance moyenne aux murs des cellules vides atteint DISTANCE_MOYENNE_SAUT
+    """
+    vides = np.asarray(occupation) == 0
+    return bool(vides.any() and distances[vides].mean() >= DISTANCE_MOYENNE_SAUT)
+
+def ray_cast_batch(occupation: np.ndarray, position_debut: tuple, vecteurs: np.ndarray, distances: np.ndarray = None) -> Raycast_Lot:
+    """Effectue un raycast pour tous les vecteurs en même temps
+
+    Args:
+        occupation (np.ndarray): carte d'occupation indexée [x, y], non nulle là où se trouve un mur
+        position_debut (tuple): position du début des raycasts, ou début de chaque raycast de forme (n, 2) ou (n, 3)
+        vecteurs (np.ndarray): vecteurs des raycasts, de forme (n, 2) ou (n, 3)
+        distances (np.ndarray, optionnel): champ de distance aux murs de la carte (voir distances_murs), pour sauter les zones vides, par défaut aucun
+
+    Returns:
+        Raycast_Lot: résultats des raycasts
+    """
+    vecteurs = np.asarray(vecteurs, dtype=np.float64)
+    vecteur_x = vecteurs[:, 0]
+    vecteur_y = vecteurs[:, 1]
+    debuts = np.asarray(position_debut, dtype=np.float64)
+    debut_x = debuts[..., 0] # Un seul départ pour tous les rayons, ou un départ par rayon
+    debut_y = debuts[..., 1]
+    negatif_x = vecteur_x < 0
+    negatif_y = vecteur_y < 0
+    inversion = negatif_x != (vecteur_y <= 0) # Les ratios changent de signe selon le quadrant
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio_h = np.where(vecteur_x != 0, np.abs(vecteur_y / vecteur_x), -1.0)
+        ratio_v = np.where(vecteur_y != 0, np.abs(vecteur_x / vecteur_y), -1.0)
+
+    # Préparer le parcours horizontal
+    multiplier_h = np.where(negatif_x, -1.0, 1.0)
+    arrondissement_h = negatif_x.astype(np.float64)
+    x_h = np.where(negatif_x, np.floor(debut_x), np.ceil(debut_x))
+    difference_h = np.where(negatif_x, x_h - debut_x, debut_x - x_h)
+    y_h = np.where(negatif_y, debut_y - ratio_h * -difference_h, debut_y - ratio_h * difference_h)
+    ratio_h = np.where(inversion, -ratio_h, ratio_h)
+
+    # Préparer le parcours vertical
+    multiplier_v = np.where(negatif_y, -1.0, 1.0)
+    arrondissement_v = negatif_y.astype(np.float64)
+    y_v = np.where(vecteur_y > 0, np.ceil(debut_y), np.floor(debut_y))
+    difference_v = np.where(vecteur_y > 0, y_v - debut_y, debut_y - y_v)
+    x_v = np.where(negatif_x, debut_x + ratio_v * -difference_v, debut_x + ratio_v * difference_v)
+    ratio_v = np.where(inversion, -ratio_v, ratio_v)
+
+    zeros = np.zeros(len(vecteurs))
+    nb_pas = np.zeros(len(vecteurs), dtype=np.intp)
+    touche_h = _parcourir(occupation, x_h, y_h, multiplier_h, ratio_h * multiplier_h, arrondissement_h, zeros, vecteur_x != 0, nb_pas, distances)
+    touche_v = _parcourir(occupation, x_v, y_v, ratio_v * multiplier_v, multiplier_v, zeros, arrondissement_v, vecteur_y != 0, nb_pas, distances)
+
+    # Garder l'impact le plus proche
+    distance_h = np.sqrt((debut_x - x_h) ** 2 + (debut_y - y_h) ** 2)
+    distance_v = np.sqrt((debut_x - x_v) ** 2 + (debut_y - y_v) ** 2)
+    choix_h = touche_h & (~touche_v | (distance_h < distance_v))
+    choix_v = touche_v & ~choix_h
+
+    faces = np.full(len(vecteurs), FACE_AUCUNE, dtype=np.int8)
+    faces[choix_h] = FACE_H
+    faces[choix_v] = FACE_V
+    distances = np.where(choix_h, distance_h, np.where(choix_v, distance_v, np.inf))
+    positions = np.full((len(vecteurs), 2), np.nan)
+    positions[choix_h, 0] = x_h[choix_h]
+    positions[choix_h, 1] = y_h[choix_h]
+    positions[choix_v, 0] = x_v[choix_v]
+    positions[choix_v, 1] = y_v[choix_v]
+    cellules = np.full((len(vecteurs), 2), -1, dtype=np.intp)
+    cellules[choix_h, 0] = (x_h[choix_h] - arrondissement_h[choix_h]).astype(np.intp)
+    cellules[choix_h, 1] = np.floor(y_h[choix_h]).astype(np.intp)
+    cellules[choix_v, 0] = np.floor(x_v[choix_v]).astype(np.intp)
+    cellules[choix_v, 1] = (y_v[choix_v] - arrondissement_v[choix_v]).astype(np.intp)
+
+    return Raycast_Lot(distances, cellules, faces, positions, nb_pas)
@@ -0,0 +1,348 @@
+#-------------------------------------
+#         Rendu_parallele.py
+#-------------------------------------
+
+# Fichier contenant le rendu en simili-3D réparti sur plusieurs travailleurs.
+# Informations importantes :
+# -L'écran est découpé en bandes verticales de colonnes, chaque travailleur lance les rayons de sa bande
+#  et écrit ses colonnes dans sa propre tranche du tampon, les rayons d'une frame étant indépendants.
+# -En mode "fils", les travailleurs sont des fils d'exécution qui partagent directement la carte et le tampon,
+#  NumPy relâchant le GIL pendant les calculs.
+# -En mode "processus", la carte, les textures et le tampon sont placés en mémoire partagée,
+#  ils ne sont recopiés que lorsqu'ils changent. Une carte fragmentée est alors rendue en mode "fils".
+#  Chaque mémoire partagée est libérée par fermer, ou sinon quand son tableau disparaît ou à la sortie du programme.
+# -Sans travailleurs, la scène rend tout l'écran comme une seule bande avec rendre_bande : le rendu en série et le rendu
+#  réparti passent par le même code.
+# -Chaque bande renvoie la profondeur du mur de ses colonnes, qui sert ensuite de tampon de profondeur aux sprites.
+# -En couleurs indexées, chaque bande décale elle-même les indices de texture vers les textures ombrées de la bande de
+#  distance de ses colonnes et de ses lignes (voir pa.Palette.get_pile_ombree).
+
+# Importer les librairies
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import palette as pa
+import profileur as pf
+import rasterisation as ra
+import raycast as rc
+import weakref
+
+MODES = ("fils", "processus")
+
+_memoires_travailleur = {} # Mémoires partagées ouvertes par un processus travailleur, de clé leur nom
+_caches_hauteurs_travailleur = {} # Caches des lignes de texture d'un processus travailleur, de clé (hauteur du tampon, taille des textures)
+
+def rendre_bande(tampon: np.ndarray, tuiles: np.ndarray, position: tuple, vecteurs: np.ndarray, corrections: np.ndarray, distance_ecran: float, couleurs: tuple, indices_textures: np.ndarray = None, pile_textures: np.ndarray = None, cache_hauteurs: ra.Cache_Hauteurs = None, sol_plafond: tuple = None, ombrage: tuple = None, distances_murs: np.ndarray = None, profileur: pf.Profileur = None) -> np.ndarray:
+    """Lance les rayons d'une bande de colonnes et écrit les colonnes dans le tampon de la bande
+
+    Args:
+        tampon (np.ndarray): tampon de pixels de la bande, de forme (nb_colonnes, hauteur), modifié sur place
+        tuiles (np.ndarray): identifiants des tuiles de la carte, indexés [x, y]
+        position (tuple): position de départ des rayons
+        vecteurs (np.ndarray): direction de chaque colonne de la bande, de forme (nb_colonnes, 2)
+        corrections (np.ndarray): correction de l'effet fish-eye de chaque colonne de la bande
+        distance_ecran (float): distance de projection de l'écran
+        couleurs (tuple): couleurs du plafond, des murs et du sol, au format des pixels du tampon
+        indices_textures (np.ndarray, optionnel): indice de texture de chaque type de tuile, murs unis si None
+        pile_textures (np.ndarray, optionnel): pixels des textures, indexés [texture, u, v]
+        cache_hauteurs (ra.Cache_Hauteurs, optionnel): lignes de texture à lire pour chaque hauteur de mur
+        sol_plafond (tuple, optionnel): distance du sol vu par chaque ligne, indices des textures du sol et du plafond, sol et plafond unis si None
+        ombrage (tuple, optionnel): nombre de bandes, distance du brouillard et nombre de textures de la palette, la pile étant
+                                    alors celle des textures ombrées (voir pa.Palette.get_pile_ombree), aucun ombrage si None
+        distances_murs (np.ndarray, optionnel): champ de distance aux murs de la carte, pour sauter les zones vides, par défaut aucun
+        profileur (pf.Profileur, optionnel): profileur où mesurer les étapes de la bande, aucune mesure si None (travailleurs)
+
+    Returns:
+        np.ndarray: profondeur du mur de chaque colonne de la bande, corrigée de l'effet fish-eye
+    """
+    mesurer = (lambda nom: pf.MESURE_VIDE) if profileur == None else profileur.mesurer
+    hauteur_mur = 2
+    with mesurer("raycast"):
+        raycasts = rc.ray_cast_batch(tuiles, position, vecteurs, distances_murs)
+    if profileur != None and profileur.is_actif(): profileur.compter("cellules", int(raycasts.get_nb_pas().sum()))
+    distances = (raycasts.get_distances() + 0.0001) * corrections
+    hauteurs = (hauteur_mur / distances) * distance_ecran
+    if indices_textures is None:
+        with mesurer("rasterisation"):
+            ra.rasteriser_colonnes(tampon, hauteurs, couleurs[0], couleurs[1], couleurs[2])
+        return distances
+
+    cellules = raycasts.get_cellules_touchees()
+    touches = raycasts.get_touches()
+    types = np.zeros(len(cellules), dtype=np.intp) # Le vide pour les rayons sans mur, dont la cellule est -1
+    types[touches] = tuiles[cellules[touches, 0], cellules[touches, 1]]
+    coordonnees = ra.coordonnees_murs(raycasts.get_faces_touchees(), raycasts.get_positions_touchees(), vecteurs)
+    indices_murs = indices_textures[types]
+    if ombrage != None: # Lire la texture ombrée de la bande de chaque colonne
+        indices_murs = indices_murs + pa.bandes_distances(distances, ombrage[0], ombrage[1]) * ombrage[2]
+    if sol_plafond != None:
+        with mesurer("sol_plafond"):
+            if ombrage == None:
+                ra.rasteriser_sol_plafond(tampon, hauteurs, position, vecteurs, corrections, sol_plafond[0], pile_textures[sol_plafond[1]], pile_textures[sol_plafond[2]])
+            else: # Une texture ombrée par bande, et la bande de chaque ligne
+                ra.rasteriser_sol_plafond(tampon, hauteurs, position, vecteurs, corrections, sol_plafond[0], pile_textures[sol_plafond[1]::ombrage[2]], pile_textures[sol_plafond[2]::ombrage[2]], pa.bandes_distances(sol_plafond[0], ombrage[0], ombrage[1]))
+    with mesurer("rasterisation"):
+        ra.rasteriser_colonnes_texturees(tampon, hauteurs, pile_textures, indices_murs, coordonnees, cache_hauteurs, couleurs[0], couleurs[2], fond = sol_plafond == None)
+    return distances
+
+def _liberer_memoire(memoire: shared_memory.SharedMemory) -> None:
+    """Supprime une mémoire partagée créée par ce processus, appelé une seule fois par son finaliseur
+
+    Args:
+        memoire (shared_memory.SharedMemory): mémoire partagée à libérer
+    """
+    memoire.unlink()
+    try:
+        memoire.close()
+    except BufferError: # Un tableau l'utilise encore à la sortie du programme, elle est fermée avec le processus
+        pass
+
+def _ouvrir_memoire(nom: str, forme: tuple, type_donnee: str) -> np.ndarray:
+    """Retourne un tableau sur une mémoire partagée, ouverte une seule fois par processus travailleur
+
+    Args:
+        nom (str): nom de la mémoire partagée
+        forme (tuple): forme du tableau
+        type_donnee (str): type des éléments du tableau
+
+    Returns:
+        np.ndarray: tableau sur la mémoire partagée
+    """
+    memoire = _memoires_travailleur.get(nom)
+    if memoire == None:
+        if len(_memoires_travailleur) > 8: # Fermer les mémoires des anciennes cartes et des anciens tampons
+            for ancienne in _memoires_travailleur.values(): ancienne.close()
+            _memoires_travailleur.clear()
+        memoire = shared_memory.SharedMemory(name = nom)
+        _memoires_travailleur[nom] = memoire
+    return np.ndarray(forme, dtype=type_donnee, buffer=memoire.buf)
+
+def _rendre_bande_processus(tache: dict) -> np.ndarray:
+    """Rend une bande dans un processus travailleur, depuis les tableaux en mémoire partagée
+
+    Args:
+        tache (dict): description de la bande et des mémoires partagées à utiliser
+
+    Returns:
+        np.ndarray: profondeur du mur de chaque colonne de la bande
+    """
+    debut, fin = tache["colonnes"]
+    tampon = _ouvrir_memoire(*tache["tampon"])[debut:fin]
+    tuiles = _ouvrir_memoire(*tache["tuiles"])
+    pile_textures = None
+    cache_hauteurs = None
+    if tache["textures"] != None:
+        pile_textures = _ouvrir_memoire(*tache["textures"])
+        cle = (tampon.shape[1], pile_textures.shape[2])
+        cache_hauteurs = _caches_hauteurs_travailleur.get(cle)
+        if cache_hauteurs == None:
+            cache_hauteurs = ra.Cache_Hauteurs(cle[0], cle[1])
+            _caches_hauteurs_travailleur[cle] = cache_hauteurs
+    return rendre_bande(tampon, tuiles, tache["position"], tache["vecteurs"], tache["corrections"], tache["distance_ecran"], tache["couleurs"], tache["indices_textures"], pile_textures, cache_hauteurs, tache["sol_plafond"], tache["ombrage"])
+
+class Tableau_Partage:
+    """Classe représentant un tableau NumPy placé en mémoire partagée entre processus
+    """
+
+    def __init__(self, forme: tuple, type_donnee: np.dtype) -> None:
+        """Créer un tableau en mémoire partagée
+
+        Args:
+            forme (tuple): forme du tableau
+            type_donnee (np.dtype): type des éléments du tableau
+        """
+        type_donnee = np.dtype(type_donnee)
+        self.memoire = shared_memory.SharedMemory(create = True, size = max(int(np.prod(forme)) * type_donnee.itemsize, 1)) # Mémoire partagée
+        self.tableau = np.ndarray(forme, dtype=type_donnee, buffer=self.memoire.buf) # Tableau sur la mémoire partagée
+        self.finaliseur = weakref.finalize(self, _liberer_memoire, self.memoire) # Libère la mémoire sans fermer, au plus tard à la sortie du programme
+
+    def fermer(self) -> None:
+        """Libère la mémoire partagée
+        """
+        self.tableau = None
+        self.finaliseur()
+
+    def get_description(self) -> tuple:
+        """Retourne ce qu'il faut à un processus travailleur pour ouvrir le tableau
+
+        Returns:
+            tuple: nom de la mémoire partagée, forme et type des éléments du tableau
+        """
+        return (self.memoire.name, self.tableau.shape, self.tableau.dtype.str)
+
+    def get_tableau(self) -> np.ndarray:
+        """Retourne le tableau sur la mémoire partagée
+
+        Returns:
+            np.ndarray: tableau
+        """
+        return self.tableau
+
+class Rendu_Parallele:
+    """Classe représentant un rendu en simili-3D réparti en bandes sur un groupe de travailleurs
+    """
+
+    def __init__(self, nb_travailleurs: int, mode: str = "fils") -> None:
+        """Créer un rendu parallèle
+
+        Args:
+            nb_travailleurs (int): nombre de travailleurs, et donc de bandes
+            mode (str, optionnel): "fils" (fils d'exécution) ou "processus" (processus et mémoire partagée), par défaut à "fils"
+        """
+        assert nb_travailleurs > 0, ("Rendu parallèle : le nombre de travailleurs doit être positif.")
+        assert mode in MODES, ("Rendu parallèle : le mode \"" + str(mode) + "\" n'existe pas, les modes sont " + str(MODES) + ".")
+
+        self.cle_tuiles = None # Carte et version des tuiles copiées en mémoire partagée
+        self.fils = None # Groupe de fils d'exécution, créé à la première frame
+        self.mode = mode # Type des travailleurs
+        self.nb_travailleurs = nb_travailleurs # Nombre de travailleurs
+        self.processus = None # Groupe de processus, créé à la première frame en mode "processus"
+        self.source_textures = None # Pile de textures copiée en mémoire partagée
+        self.tampon_partage = None # Tampon de pixels en mémoire partagée
+        self.textures_partagees = None # Pixels des textures en mémoire partagée
+        self.tuiles_partagees = None # Tuiles de la carte en mémoire partagée
+
+    def bandes(self, nb_colonnes: int) -> list:
+        """Retourne les colonnes de début et de fin de chaque bande
+
+        Args:
+            nb_colonnes (int): nombre de colonnes de l'écran
+
+        Returns:
+            list: colonnes de début (incluses) et de fin (exclues) de chaque bande non vide
+        """
+        limites = np.linspace(0, nb_colonnes, min(self.get_nb_travailleurs(), nb_colonnes) + 1).astype(int)
+        return [(int(limites[i]), int(limites[i + 1])) for i in range(len(limites) - 1) if limites[i + 1] > limites[i]]
+
+    def fermer(self) -> None:
+        """Arrête les travailleurs et libère les mémoires partagées
+        """
+        if self.fils != None: self.fils.shutdown()
+        if self.processus != None: self.processus.shutdown()
+        self.fils = None
+        self.processus = None
+        for tableau in (self.tampon_partage, self.textures_partagees, self.tuiles_partagees):
+            if tableau != None: tableau.fermer()
+        self.cle_tuiles = None
+        self.source_textures = None
+        self.tampon_partage = None
+        self.textures_partagees = None
+        self.tuiles_partagees = None
+
+    def get_mode(self) -> str:
+        """Retourne le type des travailleurs
+
+        Returns:
+            str: "fils" ou "processus"
+        """
+        return self.mode
+
+    def get_nb_travailleurs(self) -> int:
+        """Retourne le nombre de travailleurs
+
+        Returns:
+            int: nombre de travailleurs
+        """
+        return self.nb_travailleurs
+
+    def partager(self, tableau: Tableau_Partage, valeurs: np.ndarray) -> Tableau_Partage:
+        """Copie des valeurs en mémoire partagée, en recréant la mémoire si leur forme a changé
+
+        Args:
+            tableau (Tableau_Partage): tableau partagé actuel, None s'il n'existe pas encore
+            valeurs (np.ndarray): valeurs à copier
+
+        Returns:
+            Tableau_Partage: tableau partagé contenant les valeurs
+        """
+        if tableau == None or tableau.get_tableau().shape != valeurs.shape or tableau.get_tableau().dtype != valeurs.dtype:
+            if tableau != None: tableau.fermer()
+            tableau = Tableau_Partage(valeurs.shape, valeurs.dtype)
+        np.copyto(tableau.get_tableau(), valeurs)
+        return tableau
+
+    def rendre(self, tampon: np.ndarray, carte, position: tuple, vecteurs: np.ndarray, corrections: np.ndarray, distance_ecran: float, couleurs: tuple, indices_textures: np.ndarray = None, pile_textures: np.ndarray = None, cache_hauteurs: ra.Cache_Hauteurs = None, sol_plafond: tuple = None, ombrage: tuple = None) -> np.ndarray:
+        """Rend toutes les colonnes dans le tampon, bande par bande sur les travailleurs
+
+        Args:
+            tampon (np.ndarray): tampon de pixels de forme (nb_colonnes, hauteur), modifié sur place
+            carte (ca.Carte): carte de la scène
+            position (tuple): position de départ des rayons
+            vecteurs (np.ndarray): direction de chaque colonne, de forme (nb_colonnes, 2)
+            corrections (np.ndarray): correction de l'effet fish-eye de chaque colonne
+            distance_ecran (float): distance de projection de l'écran
+            couleurs (tuple): couleurs du plafond, des murs et du sol, au format des pixels du tampon
+            indices_textures (np.ndarray, optionnel): indice de texture de chaque type de tuile, murs unis si None
+            pile_textures (np.ndarray, optionnel): pixels des textures, indexés [texture, u, v]
+            cache_hauteurs (ra.Cache_Hauteurs, optionnel): lignes de texture à lire pour chaque hauteur de mur
+            sol_plafond (tuple, optionnel): distance du sol vu par chaque ligne, indices des textures du sol et du plafond, sol et plafond unis si None
+            ombrage (tuple, optionnel): nombre de bandes, distance du brouillard et nombre de textures de la palette, la pile étant
+                                        alors celle des textures ombrées (voir pa.Palette.get_pile_ombree), aucun ombrage si None
+
+        Returns:
+            np.ndarray: profondeur du mur de chaque colonne, corrigée de l'effet fish-eye
+        """
+        bandes = self.bandes(len(vecteurs))
+        if self.get_mode() == "processus" and isinstance(carte.get_tuiles(), np.ndarray):
+            return self.rendre_processus(tampon, carte, bandes, position, vecteurs, corrections, distance_ecran, couleurs, indices_textures, pile_textures, sol_plafond, ombrage)
+
+        if self.fils == None: self.fils = ThreadPoolExecutor(max_workers = self.get_nb_travailleurs())
+        tuiles = carte.get_tuiles()
+        travaux = [self.fils.submit(rendre_bande, tampon[debut:fin], tuiles, position, vecteurs[debut:fin], corrections[debut:fin], distance_ecran, couleurs, indices_textures, pile_textures, cache_hauteurs, sol_plafond, ombrage) for debut, fin in bandes]
+        return np.concatenate([travail.result() for travail in travaux]) # Attendre toutes les bandes, en remontant leurs erreurs
+
+    def rendre_processus(self, tampon: np.ndarray, carte, bandes: list, position: tuple, vecteurs: np.ndarray, corrections: np.ndarray, distance_ecran: float, couleurs: tuple, indices_textures: np.ndarray, pile_textures: np.ndarray, sol_plafond: tuple = None, ombrage: tuple = None) -> np.ndarray:
+        """Rend toutes les colonnes dans le tampon avec le groupe de processus
+
+        Args:
+            tampon (np.ndarray): tampon de pixels de forme (nb_colonnes, hauteur), modifié sur place
+            carte (ca.Carte): carte de la scène, entièrement en mémoire
+            bandes (list): colonnes de début et de fin de chaque bande
+            position (tuple): position de départ des rayons
+            vecteurs (np.ndarray): direction de chaque colonne, de forme (nb_colonnes, 2)
+            corrections (np.ndarray): correction de l'effet fish-eye de chaque colonne
+            distance_ecran (float): distance de projection de l'écran
+            couleurs (tuple): couleurs du plafond, des murs et du sol, au format des pixels du tampon
+            indices_textures (np.ndarray): indice de texture de chaque type de tuile, murs unis si None
+            pile_textures (np.ndarray): pixels des textures, indexés [texture, u, v]
+            sol_plafond (tuple, optionnel): distance du sol vu par chaque ligne, indices des textures du sol et du plafond, sol et plafond unis si None
+            ombrage (tuple, optionnel): nombre de bandes, distance du brouillard et nombre de textures de la palette, la pile étant
+                                        alors celle des textures ombrées (voir pa.Palette.get_pile_ombree), aucun ombrage si None
+
+        Returns:
+            np.ndarray: profondeur du mur de chaque colonne, corrigée de l'effet fish-eye
+        """
+        if self.processus == None: self.processus = ProcessPoolExecutor(max_workers = self.get_nb_travailleurs())
+
+        # Ne recopier la carte et les textures que lorsqu'elles changent
+        cle_tuiles = (id(carte), carte.get_revision(), carte.get_tuiles().dtype)
+        if cle_tuiles != self.cle_tuiles:
+            self.tuiles_partagees = self.partager(self.tuiles_partagees, carte.get_tuiles())
+            self.cle_tuiles = cle_tuiles
+        description_textures = None
+        if indices_textures is not None:
+            if self.textures_partagees == None or self.source_textures is not pile_textures: # La pile est remplacée à chaque changement
+                self.textures_partagees = self.partager(self.textures_partagees, pile_textures)
+                self.source_textures = pile_textures
+            description_textures = self.textures_partagees.get_description()
+        if self.tampon_partage == None or self.tampon_partage.get_tableau().shape != tampon.shape or self.tampon_partage.get_tableau().dtype != tampon.dtype:
+            if self.tampon_partage != None: self.tampon_partage.fermer()
+            self.tampon_partage = Tableau_Partage(tampon.shape, tampon.dtype)
+
+        taches = [{
+            "colonnes": (debut, fin),
+            "corrections": corrections[debut:fin],
+            "couleurs": couleurs,
+            "distance_ecran": distance_ecran,
+            "indices_textures": indices_textures,
+            "ombrage": ombrage,
+            "position": tuple(position),
+            "sol_plafond": sol_plafond,
+            "tampon": self.tampon_partage.get_description(),
+            "textures": description_textures,
+            "tuiles": self.tuiles_partagees.get_description(),
+            "vecteurs": vecteurs[debut:fin],
+        } for debut, fin in bandes]
+        profondeurs = np.concatenate(list(self.processus.map(_rendre_bande_processus, taches))) # Attendre toutes les bandes, en remontant leurs erreurs
+        np.copyto(tampon, self.tampon_partage.get_tableau())
+        return profondeurs
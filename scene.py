@@ -7,13 +7,44 @@
 #     -Scene permet de créer un contexte de jeu.
 #     -Scene_Graphique permet un affichage graphique.
 #     -Scene_Physique permet de donner une physique au jeu.
+# -pygame (avec la minicarte et les textures) n'est importé qu'à la création d'une scène graphique : une scène sans partie
+#  graphique, avec sa carte, son raycast, sa physique et ses entités, se charge et se simule sans pygame.
 
 # Importer les librairies
+from __future__ import annotations
+import camera as cm
+import carte as ca
+import entites as en
+import format_carte as fc
+import index_spatial as isp
 import math
+import numpy as np
 import objet as ob
 import os
-import pygame as pg
+import palette as pa
+import physique as ph
+import rasterisation as ra
+import raycast as rc
+import sprites as sp
 import structure_de_base as sb
+import time
+import visibilite as vi
+
+def creer_surface(taille: tuple, structure_de_base: sb.Structure_De_Base) -> pg.Surface:
+    """Crée une surface avec transparence, au format de la fenêtre s'il y en a une
+
+    Args:
+        taille (tuple): taille de la surface
+        structure_de_base (sb.Structure_De_Base): structure de base du jeu
+
+    Returns:
+        pg.Surface: surface créée
+    """
+    import pygame as pg # Seule la partie graphique dépend de pygame
+
+    if structure_de_base.is_sans_fenetre(): # Sans fenêtre, il n'y a pas de format d'écran vers lequel convertir
+        return pg.Surface(taille, pg.SRCALPHA, 32)
+    return pg.Surface(taille).convert_alpha()
 
 class Raycast:
     """Classe contenant les résultats d'un raycast
@@ -54,15 +85,99 @@ class Scene_Physique:
     """Classe représentant une scène physique
     """
 
-    def __init__(self, structure_de_base: sb.Structure_De_Base) -> None:
+    def __init__(self, structure_de_base: sb.Structure_De_Base, carte: ca.Carte = None, index_spatial: isp.Index_Spatial = None) -> None:
         """Créer une scène physique
 
         Args:
             structure_de_base (sb.Structure_De_Base): structure de base du jeu
+            carte (ca.Carte, optionnel): carte partagée avec la scène, par défaut à None
+            index_spatial (isp.Index_Spatial, optionnel): index contenant les objets des corps, tenu à jour quand ils bougent, par défaut aucun
         """
-        self.objets = {}
+        self.carte = carte
+        self.index_spatial = index_spatial # Index des objets des corps
+        self.objets = {} # Corps de la scène physique, de clé leur nom
+        self.stocks = {} # Stocks contenant les objets des corps, de clé leur identifiant
         self.structure_de_base = structure_de_base
 
+    def ajouter_objet(self, nom: str, objet: ob.Objet_Physique) -> None:
+        """Ajoute un corps dans la scène physique
+
+        Args:
+            nom (str): nom de l'objet
+            objet (ob.Objet_Physique): corps à ajouter
+        """
+        assert nom not in self.get_objets(), ("Scene physique : un objet de nom \"" + nom + "\" existe déjà.") # Si l'objet n'existe pas déjà
+        self.get_objets()[nom] = objet
+        stock = objet.get_objet().get_stock()
+        stock.set_corps(objet.get_objet().get_ligne(), True) # Sa vitesse du stock passe maintenant par les collisions
+        self.stocks[id(stock)] = stock
+
+    def deplacer(self, stock: en.Stock_Entites, lignes: np.ndarray, deplacements: np.ndarray) -> np.ndarray:
+        """Déplace des corps d'un stock en une fois avec les collisions contre les murs, sans passer par leur déplacement demandé
+
+        Args:
+            stock (en.Stock_Entites): stock contenant les objets des corps
+            lignes (np.ndarray): lignes des corps à déplacer
+            deplacements (np.ndarray): déplacement de chaque corps, de forme (n, 2)
+
+        Returns:
+            np.ndarray: si chaque corps a été bloqué sur chaque axe, de forme (n, 2)
+        """
+        anciennes_positions = stock.get_positions()[lignes]
+        positions, bloques = ph.deplacer_corps(self.get_carte().get_tuiles(), anciennes_positions[:, :2], deplacements, stock.get_tailles_corps()[lignes], stock.get_cercles()[lignes])
+        stock.get_positions()[lignes, :2] = positions
+        bougent = np.any(positions != anciennes_positions[:, :2], axis = 1) # Les corps bloqués sur place ne changent pas la révision de l'index
+        if self.get_index_spatial() != None and bougent.any():
+            self.get_index_spatial().mettre_a_jour_lot(stock.get_objets()[lignes[bougent]], anciennes_positions[bougent], stock.get_positions()[lignes[bougent]])
+        return bloques
+
+    def frame(self, delta_time: float = None) -> None:
+        """Réalise une étape de la physique : tous les corps qui bougent sont déplacés ensemble, avec les collisions, selon leur
+        vitesse, celle de leur objet dans le stock et leur déplacement demandé
+
+        Args:
+            delta_time (float, optionnel): durée de l'étape, par défaut le delta time de la structure de base
+        """
+        if delta_time == None: delta_time = self.get_structure_de_base().get_delta_time()
+
+        for stock in self.stocks.values():
+            # Ne garder que les corps qui bougent pendant cette étape
+            lignes = stock.get_lignes_corps()
+            deplacements = (stock.get_vitesses_corps()[lignes, :2] + stock.get_vitesses()[lignes, :2]) * delta_time + stock.get_deplacements()[lignes, :2]
+            stock.get_deplacements()[lignes] = 0
+            bougent = np.any(deplacements != 0, axis = 1)
+            if not bougent.any():
+                continue
+            lignes, deplacements = lignes[bougent], deplacements[bougent]
+
+            bloques = self.deplacer(stock, lignes, deplacements)
+            for vitesses in (stock.get_vitesses_corps(), stock.get_vitesses()): # Arrêter les corps contre les murs, sur l'axe bloqué
+                vitesses[lignes, :2] = np.where(bloques, 0, vitesses[lignes, :2])
+
+    def get_carte(self) -> ca.Carte:
+        """Retourne la carte de la scène physique
+
+        Returns:
+            ca.Carte: carte de la scène physique
+        """
+        return self.carte
+
+    def get_index_spatial(self) -> isp.Index_Spatial:
+        """Retourne l'index contenant les objets des corps
+
+        Returns:
+            isp.Index_Spatial: index des objets des corps, None s'il n'y en a pas
+        """
+        return self.index_spatial
+
+    def get_objets(self) -> dict:
+        """Retourne les corps de la scène physique
+
+        Returns:
+            dict: corps de la scène physique, de clé leur nom
+        """
+        return self.objets
+
     def get_structure_de_base(self) -> sb.Structure_De_Base:
         """Retourne la structure de base du jeu
 
@@ -71,55 +186,203 @@ class Scene_Physique:
         """
         return self.structure_de_base
 
+    def nouvel_objet(self, nom: str, objet: ob.Objet, forme: str = "cercle", taille: float = 0.25) -> ob.Objet_Physique:
+        """Crée un nouveau corps dans la scène physique et le retourne
+
+        Args:
+            nom (str): nom de l'objet
+            objet (ob.Objet): objet lié à ce corps
+            forme (str, optionnel): forme du corps, "cercle" ou "boite", par défaut à "cercle"
+            taille (float, optionnel): rayon du cercle ou demi-côté de la boîte, par défaut à 0.25
+
+        Returns:
+            ob.Objet_Physique: corps créé
+        """
+        objet_physique = ob.Objet_Physique(objet, forme = forme, taille = taille)
+        self.ajouter_objet(nom, objet_physique)
+        return objet_physique
+
 class Scene_Graphique:
     """Classe représentant une scène graphique
     """
 
-    def __init__(self, nom: str, taille: tuple, taille_fenetre: tuple, structure_de_base: sb.Structure_De_Base) -> None:
+    def __init__(self, nom: str, taille: tuple, taille_fenetre: tuple, structure_de_base: sb.Structure_De_Base, carte: ca.Carte = None, index_spatial: isp.Index_Spatial = None) -> None:
         """Créer une scène graphique
 
         Args:
             nom (str): nom de la scène graphique
             taille (tuple): taille de la fenêtre graphique
             structure_de_base (sb.Structure_De_Base): structure de base du jeu
+            carte (ca.Carte, optionnel): carte partagée avec la scène, par défaut une nouvelle carte vide
+            index_spatial (isp.Index_Spatial, optionnel): index des objets mobiles, dont la révision fait partie de la clé de vue, par défaut aucun
         """
-        self.carte = []
+        import minicarte as mc # Seule la partie graphique dépend de pygame
+        import texture as tx
+
+        if carte == None: carte = ca.Carte(taille) # Une nouvelle carte est vide
+
+        self.cache_rendu_actif = True # Si le rendu en simili-3D est gardé tant que la clé de vue ne change pas
+        self.camera = cm.Camera(structure_de_base.get_fov(), 275, taille_fenetre) # Caméra utilisée pour le rendu en simili-3D
+        self.carte = carte # Grille des tuiles de la scène
+        self.cle_distances_murs = None # Carte et révision ayant servi à calculer le champ de distance aux murs
+        self.cle_vue = None # Clé de vue du dernier rendu en simili-3D, None si le rendu ne correspond à aucune vue
+        self.distances_murs = None # Champ de distance aux murs de la carte, pour que les rayons sautent les zones vides
+        self.index_spatial = index_spatial # Index des objets mobiles de la scène
+        self.minicarte = mc.Minicarte(taille_fenetre, structure_de_base) # Minicarte du rendu en 2D, sur toute la fenêtre
+        self.minicarte_incrustee = None # Minicarte incrustée dans le rendu en simili-3D, None si pas d'incrustation
+        self.mode_couleurs = "rgb" # Couleurs du tampon, "rgb" (pixels de la surface) ou "palette" (indices d'une palette de 256 couleurs, avec lumière et brouillard)
+        self.mode_rasterisation = "tampon" # Rasterisation du rendu en simili-3D, "tampon" (tampon de pixels) ou "rect" (un rectangle par colonne)
+        self.nb_rendus = 0 # Nombre d'appels au rendu en simili-3D
+        self.nb_succes_cache = 0 # Nombre de rendus en simili-3D évités grâce à la clé de vue
         self.nom = nom
         self.objets = {}
+        self.objets_carte = {} # Objets placés sur la carte, de clé leur cellule, créés seulement quand on les demande
+        self.objets_mobiles = {} # Objets qui ne sont pas des tuiles de la carte, dessinés sur la couche dynamique de la minicarte
+        self.palette = pa.Palette() # Palette et textures ombrées du rendu en couleurs indexées
+        self.raycast_batch = True # Si le rendu utilise le raycast par lot
+        self.rendu_inchange = False # Si le dernier rendu en simili-3D a été repris du cache
+        self.rendu_parallele = None # Rendu réparti sur plusieurs travailleurs, créé selon la structure de base
+        self.saut_espace_vide = True # Si les rayons sautent les zones vides grâce au champ de distance aux murs
+        self.revision_sprites = 0 # Nombre d'ajouts d'objets ayant un sprite
+        self.saut_rentable = False # Si la carte est assez ouverte pour que les sauts accélèrent aussi le raycast par lot
+        self.sprites = {} # Objets ayant un sprite dans le rendu en simili-3D, de clé leur nom
+        self.sprites_actifs = True # Si les sprites sont dessinés, en rasterisation "tampon"
         self.structure_de_base = structure_de_base
         self.taille = taille
         self.taille_fenetre = taille_fenetre
 
-        self.remplir_carte()
-
-        self.hauteur_carre_2d = self.get_taille_fenetre()[1] / len(self.get_carte()[0]) # Créer les tailles d'un carré pour un rendu 2D
-        self.largeur_carre_2d = self.get_taille_fenetre()[0] / len(self.get_carte())
-        self.rendu = pg.Surface(self.get_taille_fenetre()).convert_alpha() # Créer le rendu de la scène
-
-    def ajouter_objet(self, nom: str, objet: ob.Objet_Graphique) -> None:
+        self.hauteur_carre_2d = self.get_taille_fenetre()[1] / self.get_taille()[1] # Créer les tailles d'un carré pour un rendu 2D
+        self.largeur_carre_2d = self.get_taille_fenetre()[0] / self.get_taille()[0]
+        self.rendu = creer_surface(self.get_taille_fenetre(), structure_de_base) # Créer le rendu de la scène
+        self.cache_hauteurs = None # Lignes de texture à lire pour chaque hauteur de mur dans le tampon
+        self.revision_palette_surfaces = None # Révision de la palette donnée aux surfaces du tampon en couleurs indexées
+        self.surface_echelle = None # Surface en couleurs indexées de la taille du rendu, où le tampon est mis à l'échelle avant d'être converti
+        self.surface_tampon = None # Surface d'une colonne par pixel, mise à l'échelle dans le rendu
+        self.tableaux_sprites = None # Révision des sprites, objets, stock commun, lignes, hauteurs et indices de texture des sprites
+        self.tampon = None # Tampon de pixels des colonnes
+        self.textures = tx.Gestionnaire_Textures(self.get_rendu()) # Textures des murs
+        self.sol_plafond_textures = True # Si le sol et le plafond sont texturés quand les murs le sont, en rasterisation "tampon"
+        self.texture_plafond = "plafond" # Nom de la texture du plafond
+        self.texture_sol = "sol" # Nom de la texture du sol
+        self.textures_actives = True # Si les murs sont texturés
+
+    def ajouter_objet(self, nom: str, objet: ob.Objet_Graphique, type_tuile: int = 1) -> None:
         """Ajoute un objet dans la scène
 
         Args:
             nom (str): nom de l'objet
             objet (ob.Objet_Graphique): objet à ajouter dans la scène
+            type_tuile (int, optionnel): identifiant de la tuile placée sous un objet rectangulaire dans la carte, par défaut à 1
         """
-        assert list(self.get_objets().keys()).count(nom) <= 0, ("Scene graphique \"" + self.get_nom() + "\" : un objet de nom \"" + nom + "\" existe déjà.") # Si l'objet n'existe pas déjà
-        position = objet.get_objet().get_position()
-        self.get_carte()[position[0]][position[1]] = objet # Placer l'objet dans la carte
+        assert nom not in self.get_objets(), ("Scene graphique \"" + self.get_nom() + "\" : un objet de nom \"" + nom + "\" existe déjà.") # Si l'objet n'existe pas déjà
+        if objet.get_forme_2d() == "rectangle": # Placer les objets rectangulaires dans la carte
+            x, y = int(objet.get_objet().get_position()[0]), int(objet.get_objet().get_position()[1]) # Cellule de l'objet, les positions du stock étant des flottants
+            self.get_carte().set_tuile(x, y, type_tuile)
+            self.objets_carte[(x, y)] = objet
+        else:
+            self.objets_mobiles[nom] = objet
+        if objet.get_sprite() != None: # Dessiner l'objet dans le rendu en simili-3D
+            self.sprites[nom] = objet
+            self.revision_sprites += 1
         self.get_objets()[nom] = objet # Ajouter l'objet à la scène
 
+    def afficher_tampon(self) -> None:
+        """Met le tampon à l'échelle dans le rendu en une seule fois
+        """
+        import pygame as pg
+
+        if self.tampon.dtype == np.uint8: # Couleurs indexées : mettre les indices à l'échelle, puis les convertir vers le format du rendu en une copie
+            palette = self.get_palette()
+            if self.revision_palette_surfaces != palette.get_revision():
+                couleurs = [tuple(couleur) for couleur in palette.get_couleurs()]
+                self.surface_tampon.set_palette(couleurs)
+                self.surface_echelle.set_palette(couleurs)
+                self.revision_palette_surfaces = palette.get_revision()
+            pg.surfarray.blit_array(self.surface_tampon, self.tampon)
+            pg.transform.scale(self.surface_tampon, self.surface_echelle.get_size(), self.surface_echelle)
+            self.get_rendu().blit(self.surface_echelle, (0, 0))
+            return
+        pg.surfarray.blit_array(self.surface_tampon, self.tampon)
+        pg.transform.scale(self.surface_tampon, self.get_rendu().get_size(), self.get_rendu())
+
+    def couleur_tampon(self, couleur: tuple) -> int:
+        """Retourne une couleur au format des pixels du tampon
+
+        Args:
+            couleur (tuple): couleur à convertir
+
+        Returns:
+            int: couleur au format des pixels du tampon, ou indice de la couleur la plus proche en couleurs indexées
+        """
+        if self.tampon.dtype == np.uint8:
+            return self.get_palette().get_indice(couleur)
+        return self.surface_tampon.map_rgb(couleur) & 0xFFFFFFFF
+
     def frame(self) -> None:
         """Réalise une frame de la scène graphique
         """
 
-    def get_carte(self) -> list:
+    def get_cache_hauteurs(self) -> ra.Cache_Hauteurs:
+        """Retourne les lignes de texture à lire pour chaque hauteur de mur dans le tampon, recalculées si le tampon ou les textures ont changé de taille
+
+        Returns:
+            ra.Cache_Hauteurs: lignes de texture à lire pour chaque hauteur de mur
+        """
+        hauteur_tampon = int(self.get_taille_fenetre()[1])
+        if self.cache_hauteurs == None or not self.cache_hauteurs.is_compatible(hauteur_tampon, self.get_textures().get_taille()):
+            self.cache_hauteurs = ra.Cache_Hauteurs(hauteur_tampon, self.get_textures().get_taille())
+        return self.cache_hauteurs
+
+    def get_camera(self) -> cm.Camera:
+        """Retourne la caméra utilisée pour le rendu en simili-3D
+
+        Returns:
+            cm.Camera: caméra de la scène
+        """
+        return self.camera
+
+    def get_carte(self) -> ca.Carte:
         """Retourne la carte de la scène
 
         Returns:
-            list: carte de la scène
+            ca.Carte: carte de la scène
         """
         return self.carte
     
+    def get_cle_vue(self, angle: float, position: tuple, alpha: float = 1) -> tuple:
+        """Retourne la clé de vue d'un rendu en simili-3D : deux rendus de même clé donnent la même image
+
+        Args:
+            angle (float): angle du raycast
+            position (tuple): position de début du raycast
+            alpha (float, optionnel): avancée entre l'avant-dernière (0) et la dernière (1) étape de simulation, par défaut à 1
+
+        Returns:
+            tuple: pose de la caméra, réglages du rendu et de la palette, révision de la carte, révision des objets mobiles, révision des sprites
+                   et avancée, 1 si aucun objet dessiné n'a bougé pendant la dernière étape
+        """
+        camera = self.get_camera()
+        revision_objets = 0 if self.get_index_spatial() == None else self.get_index_spatial().get_revision()
+        taille_minicarte = None if self.get_minicarte_incrustee() == None else self.get_minicarte_incrustee().get_taille()
+        return (angle, position[0], position[1], self.get_structure_de_base().get_fov(), camera.get_nb_colonnes(), tuple(camera.get_taille_fenetre()),
+                self.get_mode_rasterisation(), self.get_mode_couleurs(), self.palette.get_reglages(), self.is_textures_actives(), self.is_sol_plafond_textures(), self.is_sprites_actifs(), taille_minicarte, id(self.get_carte()), self.get_carte().get_revision(), revision_objets, self.revision_sprites,
+                alpha if alpha < 1 and self.is_objets_dessines_bouges() else 1)
+
+    def get_distances_murs(self) -> np.ndarray:
+        """Retourne le champ de distance aux murs de la carte, recalculé seulement quand la carte change
+
+        Returns:
+            np.ndarray: distances aux murs indexées [x, y] (voir rc.distances_murs), None si les rayons ne sautent pas les zones vides
+        """
+        if not self.is_saut_espace_vide() or isinstance(self.get_carte(), ca.Carte_Fragmentee): # Une carte fragmentée n'est jamais lue en entier
+            return None
+        cle = (id(self.get_carte()), self.get_carte().get_revision())
+        if cle != self.cle_distances_murs:
+            self.distances_murs = rc.distances_murs(self.get_carte().get_tuiles())
+            self.saut_rentable = rc.saut_rentable(self.get_carte().get_tuiles(), self.distances_murs)
+            self.cle_distances_murs = cle
+        return self.distances_murs
+
     def get_hauteur_carre_2d(self) -> float:
         """Retourne la hauteur d'un carré pour un rendu 2D
 
@@ -128,6 +391,23 @@ class Scene_Graphique:
         """
         return self.hauteur_carre_2d
     
+    def get_indices_textures(self) -> np.ndarray:
+        """Retourne l'indice de texture de chaque type de tuile de la carte, en chargeant les textures si besoin
+
+        Returns:
+            np.ndarray: indice de texture de chaque type de tuile, 0 pour le vide
+        """
+        types_tuiles = self.get_carte().get_types_tuiles()
+        return np.array([0 if type_tuile.get_texture() == None else self.get_textures().get_indice(type_tuile.get_texture()) for type_tuile in types_tuiles], dtype=np.intp)
+
+    def get_indices_sol_plafond(self) -> tuple:
+        """Retourne l'indice de la texture du sol et celui de la texture du plafond, en les chargeant si besoin
+
+        Returns:
+            tuple: indices du sol et du plafond dans la pile des textures
+        """
+        return (self.get_textures().get_indice(self.texture_sol), self.get_textures().get_indice(self.texture_plafond))
+
     def get_largeur_carre_2d(self) -> float:
         """Retourne la largeur d'un carré pour un rendu 2D
 
@@ -136,6 +416,38 @@ class Scene_Graphique:
         """
         return self.largeur_carre_2d
 
+    def get_minicarte(self) -> mc.Minicarte:
+        """Retourne la minicarte du rendu en 2D
+
+        Returns:
+            mc.Minicarte: minicarte sur toute la fenêtre
+        """
+        return self.minicarte
+
+    def get_minicarte_incrustee(self) -> mc.Minicarte:
+        """Retourne la minicarte incrustée dans le rendu en simili-3D
+
+        Returns:
+            mc.Minicarte: minicarte incrustée, None si pas d'incrustation
+        """
+        return self.minicarte_incrustee
+
+    def get_mode_couleurs(self) -> str:
+        """Retourne les couleurs du tampon du rendu en simili-3D
+
+        Returns:
+            str: "rgb" (pixels de la surface) ou "palette" (indices d'une palette de 256 couleurs)
+        """
+        return self.mode_couleurs
+
+    def get_mode_rasterisation(self) -> str:
+        """Retourne la rasterisation du rendu en simili-3D
+
+        Returns:
+            str: "tampon" (tampon de pixels) ou "rect" (un rectangle par colonne)
+        """
+        return self.mode_rasterisation
+
     def get_nom(self) -> str:
         """Retourne le nom de la scène graphique
 
@@ -156,16 +468,24 @@ class Scene_Graphique:
         return self.get_objets()[nom]
     
     def get_objet_sur_carte(self, x: int, y: int) -> ob.Objet_Graphique:
-        """Retourne un objet selon sa position sur la carte
+        """Retourne un objet selon sa position sur la carte, en le créant depuis sa tuile si besoin
 
         Args:
             x (int): coordonnée x de l'objet
             y (int): coordonnée y de l'objet
 
         Returns:
-            ob.Objet_Graphique: objet selon sa position sur la carte
+            ob.Objet_Graphique: objet selon sa position sur la carte, 0 si la cellule est vide
         """
-        return self.get_carte()[x][y]
+        identifiant = self.get_carte().get_tuile(x, y)
+        if identifiant == 0:
+            return 0
+        objet = self.objets_carte.get((x, y))
+        if objet == None: # Créer l'objet de la tuile à la demande
+            type_tuile = self.get_carte().get_type_tuile(identifiant)
+            objet = ob.Objet_Graphique(ob.Objet(str(x) + "," + str(y), position = (x, y, 0)), couleur_2d = type_tuile.get_couleur_2d())
+            self.objets_carte[(x, y)] = objet
+        return objet
     
     def get_objets(self) -> dict:
         """Retourne un dictionnaire des objets dans la scène
@@ -175,6 +495,50 @@ class Scene_Graphique:
         """
         return self.objets
     
+    def get_objets_mobiles(self) -> dict:
+        """Retourne les objets de la scène qui ne sont pas des tuiles de la carte
+
+        Returns:
+            dict: objets mobiles, de clé leur nom
+        """
+        return self.objets_mobiles
+
+    def get_index_spatial(self) -> isp.Index_Spatial:
+        """Retourne l'index des objets mobiles de la scène
+
+        Returns:
+            isp.Index_Spatial: index des objets mobiles, None si la scène n'en a pas
+        """
+        return self.index_spatial
+
+    def get_nb_rendus(self) -> int:
+        """Retourne le nombre d'appels au rendu en simili-3D
+
+        Returns:
+            int: nombre de rendus demandés
+        """
+        return self.nb_rendus
+
+    def get_nb_succes_cache(self) -> int:
+        """Retourne le nombre de rendus en simili-3D évités grâce à la clé de vue
+
+        Returns:
+            int: nombre de rendus repris du cache
+        """
+        return self.nb_succes_cache
+
+    def get_palette(self) -> pa.Palette:
+        """Retourne la palette du rendu en couleurs indexées, recalculée si des textures ont été chargées ou si ses réglages ont changé
+
+        Returns:
+            pa.Palette: palette et textures ombrées
+        """
+        self.get_indices_textures() # Charger toutes les textures du rendu avant de calculer la palette
+        self.get_indices_sol_plafond()
+        if len(self.get_sprites()) > 0: self.get_tableaux_sprites()
+        self.palette.mettre_a_jour(self.get_textures().get_couleurs(), [(0, 128, 128), (255, 255, 255), (0, 0, 0)]) # Couleurs unies du rendu
+        return self.palette
+
     def get_rendu(self) -> pg.Surface:
         """Retourne le rendu de la scène
 
@@ -182,6 +546,14 @@ class Scene_Graphique:
             pg.Surface: rendu de la scène
         """
         return self.rendu
+
+    def get_sprites(self) -> dict:
+        """Retourne les objets de la scène ayant un sprite dans le rendu en simili-3D
+
+        Returns:
+            dict: objets ayant un sprite, de clé leur nom
+        """
+        return self.sprites
     
     def get_structure_de_base(self) -> sb.Structure_De_Base:
         """Retourne la structure de base du jeu
@@ -191,6 +563,31 @@ class Scene_Graphique:
         """
         return self.structure_de_base
 
+    def get_tableaux_sprites(self, alpha: float = 1) -> tuple:
+        """Retourne la position, la hauteur et l'indice de texture de chaque sprite, les hauteurs et les textures n'étant recalculées que si des sprites ont été ajoutés
+
+        Args:
+            alpha (float, optionnel): avancée entre l'avant-dernière (0) et la dernière (1) étape de simulation où interpoler les positions, par défaut à 1
+
+        Returns:
+            tuple: positions de forme (n, 3), hauteurs par rapport à celle d'un mur et indices de texture des sprites
+        """
+        if self.tableaux_sprites == None or self.tableaux_sprites[0] != self.revision_sprites:
+            objets = list(self.get_sprites().values())
+            stocks = set(id(objet.get_objet().get_stock()) for objet in objets)
+            stock = objets[0].get_objet().get_stock() if len(stocks) == 1 else None # Lire toutes les positions d'un coup si les objets sont dans le même stock
+            lignes = np.array([objet.get_objet().get_ligne() for objet in objets], dtype=np.intp)
+            tailles = np.array([objet.get_taille_sprite() for objet in objets], dtype=np.float64)
+            textures = np.array([self.get_textures().get_indice(objet.get_sprite()) for objet in objets], dtype=np.intp)
+            self.tableaux_sprites = (self.revision_sprites, objets, stock, lignes, tailles, textures)
+
+        _, objets, stock, lignes, tailles, textures = self.tableaux_sprites
+        if stock != None:
+            positions = stock.interpoler_poses(lignes, alpha)[0]
+        else:
+            positions = np.array([objet.get_objet().get_position_interpolee(alpha) for objet in objets], dtype=np.float64)
+        return positions, tailles, textures
+
     def get_taille(self) -> tuple:
         """Retourne la taille de la scène
 
@@ -207,7 +604,134 @@ class Scene_Graphique:
         """
         return self.taille_fenetre
 
-    def nouvel_objet(self, nom: str, objet: ob.Objet, couleur_2d: tuple = (0, 0, 0), forme_2d: str = "rectangle") -> ob.Objet_Graphique:
+    def get_rendu_parallele(self) -> rp.Rendu_Parallele:
+        """Retourne le rendu parallèle, recréé si le nombre ou le type de travailleurs a changé
+
+        Returns:
+            rp.Rendu_Parallele: rendu parallèle, None si le rendu n'utilise qu'un travailleur
+        """
+        nb_travailleurs = self.get_structure_de_base().get_nb_travailleurs_rendu()
+        mode = self.get_structure_de_base().get_mode_travailleurs_rendu()
+        if self.rendu_parallele != None and (self.rendu_parallele.get_nb_travailleurs() != nb_travailleurs or self.rendu_parallele.get_mode() != mode):
+            self.rendu_parallele.fermer()
+            self.rendu_parallele = None
+        if self.rendu_parallele == None and nb_travailleurs > 1:
+            import rendu_parallele as rp # Les travailleurs ne sont chargés que s'ils sont utilisés
+            self.rendu_parallele = rp.Rendu_Parallele(nb_travailleurs, mode)
+        return self.rendu_parallele
+
+    def get_textures(self) -> tx.Gestionnaire_Textures:
+        """Retourne le gestionnaire des textures des murs
+
+        Returns:
+            tx.Gestionnaire_Textures: gestionnaire des textures
+        """
+        return self.textures
+
+    def incruster_minicarte(self, angle: float, position: tuple, alpha: float = 1) -> None:
+        """Dessine la minicarte incrustée en haut à droite du rendu, s'il y en a une
+
+        Args:
+            angle (float): angle de la caméra
+            position (tuple): position de la caméra
+            alpha (float, optionnel): avancée entre l'avant-dernière (0) et la dernière (1) étape de simulation, par défaut à 1
+        """
+        minicarte = self.get_minicarte_incrustee()
+        if minicarte == None:
+            return
+        with self.get_structure_de_base().get_profileur().mesurer("minicarte"):
+            destination = (self.get_rendu().get_width() - minicarte.get_taille()[0] - 8, 8)
+            minicarte.dessiner(self.get_rendu(), destination, self.get_carte(), self.get_objets_mobiles().values(), position, angle, alpha)
+
+    def is_cache_rendu_actif(self) -> bool:
+        """Retourne si le rendu en simili-3D est gardé tant que la clé de vue ne change pas
+
+        Returns:
+            bool: si le cache du rendu est actif
+        """
+        return self.cache_rendu_actif
+
+    def is_couleurs_indexees(self) -> bool:
+        """Retourne si le rendu en simili-3D utilise la palette, seulement en rasterisation "tampon"
+
+        Returns:
+            bool: si le tampon contient des indices de la palette
+        """
+        return self.get_mode_couleurs() == "palette" and self.get_mode_rasterisation() == "tampon"
+
+    def is_objets_dessines_bouges(self) -> bool:
+        """Retourne si un sprite ou un objet mobile de la minicarte incrustée a bougé pendant la dernière étape de simulation,
+        le rendu dépendant alors de l'avancée entre les deux étapes
+
+        Returns:
+            bool: si un objet dessiné a bougé
+        """
+        if self.is_sprites_actifs() and len(self.get_sprites()) > 0:
+            self.get_tableaux_sprites()
+            _, objets, stock, lignes, _, _ = self.tableaux_sprites
+            if stock != None and stock.ont_bouge(lignes): return True
+            if stock == None and any(objet.get_objet().get_position_interpolee(0) != objet.get_objet().get_position() for objet in objets): return True
+        if self.get_minicarte_incrustee() != None:
+            return any(objet.get_objet().get_position_interpolee(0) != objet.get_objet().get_position() for objet in self.get_objets_mobiles().values())
+        return False
+
+    def is_raycast_batch(self) -> bool:
+        """Retourne si le rendu utilise le raycast par lot
+
+        Returns:
+            bool: si le rendu utilise le raycast par lot
+        """
+        return self.raycast_batch
+
+    def is_rendu_inchange(self) -> bool:
+        """Retourne si le dernier rendu en simili-3D a été repris du cache, le rendu n'ayant alors pas changé
+
+        Returns:
+            bool: si le rendu n'a pas changé
+        """
+        return self.rendu_inchange
+
+    def is_saut_espace_vide(self) -> bool:
+        """Retourne si les rayons sautent les zones vides grâce au champ de distance aux murs
+
+        Returns:
+            bool: si les rayons sautent les zones vides
+        """
+        return self.saut_espace_vide
+
+    def is_saut_rentable(self) -> bool:
+        """Retourne si la carte est assez ouverte pour que les sauts des zones vides accélèrent aussi le raycast par lot
+
+        Returns:
+            bool: si le raycast par lot saute les zones vides
+        """
+        return self.saut_rentable
+
+    def is_sol_plafond_textures(self) -> bool:
+        """Retourne si le sol et le plafond sont texturés quand les murs le sont, en rasterisation "tampon"
+
+        Returns:
+            bool: si le sol et le plafond sont texturés
+        """
+        return self.sol_plafond_textures
+
+    def is_sprites_actifs(self) -> bool:
+        """Retourne si les sprites sont dessinés, en rasterisation "tampon"
+
+        Returns:
+            bool: si les sprites sont dessinés
+        """
+        return self.sprites_actifs
+
+    def is_textures_actives(self) -> bool:
+        """Retourne si les murs sont texturés
+
+        Returns:
+            bool: si les murs sont texturés
+        """
+        return self.textures_actives
+
+    def nouvel_objet(self, nom: str, objet: ob.Objet, couleur_2d: tuple = (0, 0, 0), forme_2d: str = "rectangle", sprite: str = None, taille_sprite: float = 0.5) -> ob.Objet_Graphique:
         """Crée un nouvel objet dans la scène graphique et le retourne
 
         Args:
@@ -215,15 +739,122 @@ class Scene_Graphique:
             objet (ob.Objet): objet à lié à cet objet dans la scène graphique
             couleur_2d (tuple, optionnel): couleur de l'objet lors d'un rendu 2D
             forme_2d (tuple, optionnel): forme de l'objet lors d'un rendu 2D
+            sprite (str, optionnel): nom de la texture du sprite de l'objet dans le rendu en simili-3D, pas de sprite si None
+            taille_sprite (float, optionnel): hauteur du sprite par rapport à celle d'un mur, par défaut à 0.5
 
         Return:
             ob.Objet_Graphique: objet crée
         """
-        assert list(self.objets.keys()).count(nom) <= 0, ("Scene graphique \"" + self.get_nom() + "\" : un objet de nom \"" + nom + "\" existe déjà.") # Si l'objet n'existe pas déjà
-        objet_graphique = ob.Objet_Graphique(objet, couleur_2d = couleur_2d, forme_2d = forme_2d)
+        assert nom not in self.get_objets(), ("Scene graphique \"" + self.get_nom() + "\" : un objet de nom \"" + nom + "\" existe déjà.") # Si l'objet n'existe pas déjà
+        objet_graphique = ob.Objet_Graphique(objet, couleur_2d = couleur_2d, forme_2d = forme_2d, sprite = sprite, taille_sprite = taille_sprite)
         self.ajouter_objet(nom, objet_graphique)
         return objet_graphique
     
+    def rasteriser_rect(self, hauteurs: np.ndarray, largeur: float, textures: tuple = None) -> None:
+        """Dessine les colonnes dans le rendu avec un rectangle, ou une colonne de texture, par colonne
+
+        Args:
+            hauteurs (np.ndarray): hauteur projetée du mur de chaque colonne
+            largeur (float): largeur d'une colonne dans le rendu
+            textures (tuple, optionnel): indice de texture et coordonnée sur le mur de chaque colonne, murs blancs si None
+        """
+        import pygame as pg
+
+        retour = self.get_rendu()
+        retour.fill((0, 0, 0))
+        pg.draw.rect(retour, (0, 128, 128), (0, 0, self.get_taille_fenetre()[0], self.get_taille_fenetre()[1] / 2))
+        taille_texture = self.get_textures().get_taille()
+        colonnes = np.flatnonzero(hauteurs > 0)
+        self.get_structure_de_base().get_profileur().compter("rects", len(colonnes) + 1)
+        for i in colonnes: # Dessiner les colonnes ayant touché un mur
+            x = i * largeur
+            y = self.get_taille_fenetre()[1] / 2 - hauteurs[i] / 2
+            if textures == None:
+                pg.draw.rect(retour, (255, 255, 255), (x, y, largeur, hauteurs[i]))
+                continue
+            u = min(int(textures[1][i] * taille_texture), taille_texture - 1)
+            colonne = self.get_textures().get_colonne_mise_a_l_echelle(textures[0][i], u, hauteurs[i], math.ceil(x + largeur) - int(x))
+            retour.blit(colonne, (int(x), self.get_taille_fenetre()[1] / 2 - colonne.get_height() / 2))
+
+    def rasteriser_sprites(self, angle: float, position: tuple, profondeurs: np.ndarray, alpha: float = 1) -> None:
+        """Dessine les sprites dans le tampon de pixels, derrière les murs plus proches qu'eux
+
+        Args:
+            angle (float): angle de la caméra
+            position (tuple): position de la caméra
+            profondeurs (np.ndarray): profondeur du mur de chaque colonne, corrigée de l'effet fish-eye
+            alpha (float, optionnel): avancée entre l'avant-dernière (0) et la dernière (1) étape de simulation, par défaut à 1
+        """
+        if not self.is_sprites_actifs() or len(self.get_sprites()) == 0:
+            return
+        profileur = self.get_structure_de_base().get_profileur()
+        with profileur.mesurer("sprites"):
+            positions, tailles, textures = self.get_tableaux_sprites(alpha)
+            camera = self.get_camera()
+            projection = sp.projeter_sprites(positions, tailles, position, angle, camera.get_fov(), camera.get_distance_ecran(), camera.get_largeur_colonne(), self.tampon.shape)
+            pile, decalages = self.get_textures().get_pile(), None
+            if self.is_couleurs_indexees(): # Lire la texture ombrée de la bande de chaque sprite
+                palette = self.get_palette()
+                pile, decalages = palette.get_pile_ombree(), palette.get_bandes(projection[7]) * palette.get_nb_textures()
+            nb_sprites = sp.rasteriser_sprites(self.tampon, profondeurs, projection, textures, pile, self.get_textures().get_opacites(), decalages)
+        profileur.compter("sprites", nb_sprites)
+
+    def rasteriser_tampon(self, hauteurs: np.ndarray, textures: tuple = None, position: tuple = None, vecteurs: np.ndarray = None, profondeurs: np.ndarray = None) -> None:
+        """Écrit les colonnes dans le tampon de pixels, mis ensuite à l'échelle dans le rendu par afficher_tampon
+
+        Args:
+            hauteurs (np.ndarray): hauteur projetée du mur de chaque colonne
+            textures (tuple, optionnel): indice de texture et coordonnée sur le mur de chaque colonne, murs blancs si None
+            position (tuple, optionnel): position de la caméra, pour texturer le sol et le plafond, unis si None
+            vecteurs (np.ndarray, optionnel): direction de chaque colonne, pour texturer le sol et le plafond
+            profondeurs (np.ndarray, optionnel): profondeur du mur de chaque colonne, pour ombrer les textures en couleurs indexées
+        """
+        self.preparer_tampon(len(hauteurs))
+        if textures == None:
+            ra.rasteriser_colonnes(self.tampon, hauteurs, self.couleur_tampon((0, 128, 128)), self.couleur_tampon((255, 255, 255)), self.couleur_tampon((0, 0, 0)))
+        else:
+            sol_plafond = position != None and self.is_sol_plafond_textures()
+            indices = self.get_indices_sol_plafond() if sol_plafond else None # Charger les textures avant de lire la pile
+            pile, indices_murs, bandes_lignes = self.get_textures().get_pile(), textures[0], None
+            if self.is_couleurs_indexees(): # Lire les textures ombrées de la bande de chaque colonne et de chaque ligne
+                palette = self.get_palette()
+                pile = palette.get_pile_ombree()
+                indices_murs = indices_murs + palette.get_bandes(profondeurs) * palette.get_nb_textures()
+                bandes_lignes = palette.get_bandes(self.get_camera().get_distances_lignes())
+            if sol_plafond: # Écrire le sol et le plafond texturés, recouverts ensuite par les murs
+                with self.get_structure_de_base().get_profileur().mesurer("sol_plafond"):
+                    if bandes_lignes is None:
+                        texture_sol, texture_plafond = pile[indices[0]], pile[indices[1]]
+                    else: # Une texture ombrée par bande, sans copie
+                        texture_sol, texture_plafond = pile[indices[0]::palette.get_nb_textures()], pile[indices[1]::palette.get_nb_textures()]
+                    ra.rasteriser_sol_plafond(self.tampon, hauteurs, position, vecteurs, self.get_camera().get_corrections(), self.get_camera().get_distances_lignes(), texture_sol, texture_plafond, bandes_lignes)
+            ra.rasteriser_colonnes_texturees(self.tampon, hauteurs, pile, indices_murs, textures[1], self.get_cache_hauteurs(), self.couleur_tampon((0, 128, 128)), self.couleur_tampon((0, 0, 0)), fond = not sol_plafond)
+
+    def preparer_tampon(self, nb_colonnes: int) -> np.ndarray:
+        """Retourne le tampon de pixels des colonnes, recréé si le nombre de colonnes a changé
+
+        Args:
+            nb_colonnes (int): nombre de colonnes du tampon
+
+        Returns:
+            np.ndarray: tampon de pixels, de forme (nb_colonnes, hauteur de la fenêtre), d'un octet par pixel en couleurs indexées
+        """
+        import pygame as pg
+
+        taille = (nb_colonnes, int(self.get_taille_fenetre()[1]))
+        indexees = self.is_couleurs_indexees()
+        if self.tampon is None or self.tampon.shape != taille or (self.tampon.dtype == np.uint8) != indexees:
+            if indexees: # Surfaces de 8 bits par pixel, dont la palette est donnée par afficher_tampon
+                self.surface_tampon = pg.Surface(taille, 0, 8)
+                self.surface_echelle = pg.Surface(self.get_rendu().get_size(), 0, 8)
+                self.revision_palette_surfaces = None
+                self.tampon = np.zeros(taille, dtype=np.uint8)
+            else:
+                self.surface_tampon = pg.Surface(taille, 0, self.get_rendu())
+                self.surface_echelle = None
+                self.tampon = np.zeros(taille, dtype=pg.surfarray.pixels2d(self.surface_tampon).dtype)
+        return self.tampon
+
     def ray_cast(self, position_debut: tuple, vecteur: tuple) -> Raycast:
         """Effectue un raycast
 
@@ -268,39 +899,59 @@ class Scene_Graphique:
         if vecteur[0] < 0: x_v = position_debut[0] + ratio_v * -difference_v
         if (vecteur[0] < 0) != (vecteur[1] <= 0) : ratio_v = -ratio_v
 
+        tuiles = self.get_carte().get_tuiles()
+        distances = self.get_distances_murs()
+        pas_max_h = max(1, abs(ratio_h)) # Nombre de cellules franchies par un pas, sur l'axe qui avance le plus
+        pas_max_v = max(1, abs(ratio_v))
+        depart_h, depart_v = (x_h, y_h), (x_v, y_v) # Premier pas de chaque parcours, les suivants s'en déduisent par leur nombre
+        etapes_h, etapes_v = 0, 0
         condition_h = (objet_h == None and x_h - arrondissement_h >= 0 and x_h < self.get_taille()[0] and y_h >= 0 and y_h < self.get_taille()[1] and vecteur[0] != 0)
         condition_v = (objet_v == None and x_v >= 0 and x_v < self.get_taille()[0] and y_v - arrondissement_v >= 0 and y_v < self.get_taille()[1] and vecteur[1] != 0)
 
         y_h_i = math.floor(y_h)
-        if condition_h and self.get_objet_sur_carte(int(x_h - arrondissement_h), y_h_i) != 0:
+        if condition_h and tuiles[int(x_h - arrondissement_h), y_h_i] != 0:
             objet_h = self.get_objet_sur_carte(int(x_h - arrondissement_h), y_h_i)
             condition_h = (objet_h == None)
 
         x_v_i = math.floor(x_v)
-        if condition_v and self.get_objet_sur_carte(x_v_i, int(y_v - arrondissement_v)) != 0:
+        if condition_v and tuiles[x_v_i, int(y_v - arrondissement_v)] != 0:
             objet_v = self.get_objet_sur_carte(x_v_i, int(y_v - arrondissement_v))
             condition_v = objet_v == None
 
         while (condition_h or condition_v):
             if condition_h: # Réaliser le raycast horizontal
-                x_h += multiplier_h
-                y_h += ratio_h * multiplier_h
+                etapes_h += 1
+                x_h = depart_h[0] + multiplier_h * etapes_h
+                y_h = depart_h[1] + ratio_h * multiplier_h * etapes_h
 
                 condition_h = (x_h - arrondissement_h >= 0 and x_h < self.get_taille()[0] and y_h >= 0 and y_h < self.get_taille()[1])
                 y_h_i = math.floor(y_h)
-                if condition_h and self.get_objet_sur_carte(int(x_h - arrondissement_h), y_h_i) != 0:
+                if condition_h and tuiles[int(x_h - arrondissement_h), y_h_i] != 0:
                         objet_h = self.get_objet_sur_carte(int(x_h - arrondissement_h), y_h_i)
                         condition_h = (objet_h == None)
+                elif condition_h and distances is not None: # Sauter les cellules que le champ garantit vides
+                    nb = math.floor((int(distances[int(x_h - arrondissement_h), y_h_i]) - 1 - 1e-9) / pas_max_h)
+                    if nb > 0:
+                        etapes_h += nb
+                        x_h = depart_h[0] + multiplier_h * etapes_h
+                        y_h = depart_h[1] + ratio_h * multiplier_h * etapes_h
 
             if condition_v: # Réaliser le raycast vertical
-                x_v += ratio_v * multiplier_v
-                y_v += multiplier_v
+                etapes_v += 1
+                x_v = depart_v[0] + ratio_v * multiplier_v * etapes_v
+                y_v = depart_v[1] + multiplier_v * etapes_v
 
                 condition_v = (x_v >= 0 and x_v < self.get_taille()[0] and y_v - arrondissement_v >= 0 and y_v < self.get_taille()[1])
                 x_v_i = math.floor(x_v)
-                if condition_v and self.get_objet_sur_carte(x_v_i, int(y_v - arrondissement_v)) != 0:
+                if condition_v and tuiles[x_v_i, int(y_v - arrondissement_v)] != 0:
                         objet_v = self.get_objet_sur_carte(x_v_i, int(y_v - arrondissement_v))
                         condition_v = objet_v == None
+                elif condition_v and distances is not None:
+                    nb = math.floor((int(distances[x_v_i, int(y_v - arrondissement_v)]) - 1 - 1e-9) / pas_max_v)
+                    if nb > 0:
+                        etapes_v += nb
+                        x_v = depart_v[0] + ratio_v * multiplier_v * etapes_v
+                        y_v = depart_v[1] + multiplier_v * etapes_v
         
         distance_finale = 0
         distance_h = ob.distance(position_debut, (x_h, y_h))
@@ -326,100 +977,327 @@ class Scene_Graphique:
             objet_final = objet_v
             position_finale = (x_v, y_v)
         return Raycast(distance_finale, objet_final, position_finale)
+
+    def ray_cast_batch(self, position_debut: tuple, vecteurs: np.ndarray) -> rc.Raycast_Lot:
+        """Effectue un raycast pour plusieurs vecteurs en même temps, avec les mêmes impacts que ray_cast
+
+        Args:
+            position_debut (tuple): position du début des raycasts
+            vecteurs (np.ndarray): vecteurs des raycasts, de forme (n, 2) ou (n, 3)
+
+        Return:
+            rc.Raycast_Lot: résultats des raycasts
+        """
+        distances = self.get_distances_murs()
+        if not self.is_saut_rentable(): distances = None # Sur une carte dense, le parcours normal est plus rapide par lot
+        return rc.ray_cast_batch(self.get_carte().get_tuiles(), position_debut, vecteurs, distances)
     
+    def ray_cast_colonnes(self, position_debut: tuple, vecteurs: np.ndarray) -> rc.Raycast_Lot:
+        """Effectue un raycast par vecteur avec ray_cast et rassemble les résultats comme ray_cast_batch
+
+        Args:
+            position_debut (tuple): position du début des raycasts
+            vecteurs (np.ndarray): vecteurs des raycasts, de forme (n, 2) ou (n, 3)
+
+        Return:
+            rc.Raycast_Lot: résultats des raycasts
+        """
+        distances = np.full(len(vecteurs), np.inf)
+        cellules = np.full((len(vecteurs), 2), -1, dtype=np.intp)
+        faces = np.full(len(vecteurs), rc.FACE_AUCUNE, dtype=np.int8)
+        positions = np.full((len(vecteurs), 2), np.nan)
+        profileur = self.get_structure_de_base().get_profileur()
+        for i in range(len(vecteurs)):
+            with profileur.mesurer("ray_cast"):
+                raycast = self.ray_cast(position_debut, vecteurs[i])
+            if raycast != None:
+                distances[i] = raycast.get_distance()
+                cellules[i] = raycast.get_objet_touche().get_objet().get_position()[:2]
+                positions[i] = raycast.get_position_touche()
+                faces[i] = rc.FACE_H if positions[i, 0] == math.floor(positions[i, 0]) else rc.FACE_V # Le parcours horizontal s'arrête sur un x entier
+        return rc.Raycast_Lot(distances, cellules, faces, positions)
+
     def remplir_carte(self) -> None:
         """Rempli la carte avec du vide
         """
-        self.get_carte().clear() # Vider la carte
-        for _ in range(self.get_taille()[0]): # Remplir la carte selon la taille défini
-            partie = []
-            for __ in range(self.get_taille()[1]):
-                partie.append(0)
-            self.get_carte().append(partie)
+        self.get_carte().vider()
+        self.objets_carte.clear()
 
     def rendu_2d(self) -> None:
         """Met le rendu à jour avec la scène en 2D
         """
-        retour = self.get_rendu() # Obtenir la scène où dessiner
-        retour.fill((0, 0, 0))
-        self.hauteur_carre = self.get_taille_fenetre()[1] / len(self.get_carte()[0])
-        self.largeur_carre = self.get_taille_fenetre()[0] / len(self.get_carte())
-        for objet in self.get_objets().keys(): # Dessinr objets par objets
-            objet = self.get_objet_de_nom(objet)
-            position = objet.get_objet().get_position()
-            if objet.get_forme_2d() == "rectangle":
-                pg.draw.rect(retour, objet.get_couleur_2d(), (position[0] * self.get_largeur_carre_2d(), position[1] * self.get_hauteur_carre_2d(), self.get_largeur_carre_2d(), self.get_hauteur_carre_2d()))
-            elif objet.get_forme_2d() == "cercle":
-                pg.draw.circle(retour, objet.get_couleur_2d(), (position[0] * self.get_largeur_carre_2d() + self.get_largeur_carre_2d() / 2, position[1] * self.get_hauteur_carre_2d() + self.get_largeur_carre_2d() / 2), self.get_largeur_carre_2d() / 2)
-
-    def rendu_3d(self, angle: float, position: tuple) -> None:
+        self.cle_vue = None # Le rendu ne correspond plus à une vue en simili-3D
+        self.rendu_inchange = False
+        with self.get_structure_de_base().get_profileur().mesurer("minicarte"): # Tuiles pré-rendues, puis objets mobiles par-dessus
+            self.get_minicarte().dessiner(self.get_rendu(), (0, 0), self.get_carte(), self.get_objets_mobiles().values())
+
+    def rendu_3d(self, angle: float, position: tuple, alpha: float = 1) -> None:
         """Met le rendu à jour avec la scène en simili-3D
 
         Args:
             angle (float): angle du raycast
             position (tuple): position de début du raycast
+            alpha (float, optionnel): avancée entre l'avant-dernière (0) et la dernière (1) étape de simulation où interpoler les sprites, par défaut à 1
         """
-        retour = self.get_rendu()
-        retour.fill((0, 0, 0))
-        pg.draw.rect(retour, (0, 128, 128), (0, 0, self.get_taille_fenetre()[0], self.get_taille_fenetre()[1] / 2))
+        # Garder le rendu précédent si rien de visible n'a changé depuis
+        self.nb_rendus += 1
+        cle_vue = self.get_cle_vue(angle, position, alpha)
+        if self.is_cache_rendu_actif() and cle_vue == self.cle_vue:
+            self.nb_succes_cache += 1
+            self.rendu_inchange = True
+            self.get_structure_de_base().get_profileur().compter("cache_rendu")
+            return
+        self.cle_vue = cle_vue
+        self.rendu_inchange = False
+
+        debut = time.perf_counter()
+        camera = self.get_camera()
+        if camera.get_fov() != self.get_structure_de_base().get_fov(): camera.set_fov(self.get_structure_de_base().get_fov())
+        vecteurs = camera.get_vecteurs(angle) # Directions des colonnes, depuis les tables de la caméra
+        hauteur_mur = 2
+        if self.get_mode_rasterisation() == "tampon" and self.is_raycast_batch(): # Rendre les colonnes par bandes, une seule sans travailleurs
+            etape = "rendu_parallele" if self.get_rendu_parallele() != None else "rasterisation"
+            profondeurs = self.rendu_3d_bandes(position, vecteurs)
+            self.get_structure_de_base().get_profileur().compter("rayons", len(vecteurs))
+            self.rasteriser_sprites(angle, position, profondeurs, alpha)
+            with self.get_structure_de_base().get_profileur().mesurer(etape):
+                self.afficher_tampon()
+            camera.ajuster_resolution(time.perf_counter() - debut)
+            self.incruster_minicarte(angle, position, alpha)
+            return
+
+        profileur = self.get_structure_de_base().get_profileur()
+        with profileur.mesurer("raycast"):
+            if self.is_raycast_batch(): # Lancer tous les rayons de la frame ensemble
+                raycasts = self.ray_cast_batch(position, vecteurs)
+            else: # Un rayon après l'autre, comparé au lot
+                raycasts = self.ray_cast_colonnes(position, vecteurs)
+        profileur.compter("rayons", len(vecteurs))
+        if profileur.is_actif(): profileur.compter("cellules", int(raycasts.get_nb_pas().sum()))
+
+        distances = (raycasts.get_distances() + 0.0001) * camera.get_corrections()
+        hauteurs = (hauteur_mur / distances) * camera.get_distance_ecran()
+        textures = None
+        if self.is_textures_actives(): # Trouver la texture et la colonne de texture de chaque mur touché
+            cellules = raycasts.get_cellules_touchees()
+            touches = raycasts.get_touches()
+            tuiles = np.zeros(len(cellules), dtype=np.intp) # Le vide pour les rayons sans mur, dont la cellule est -1
+            tuiles[touches] = self.get_carte().get_tuiles()[cellules[touches, 0], cellules[touches, 1]]
+            textures = (self.get_indices_textures()[tuiles], ra.coordonnees_murs(raycasts.get_faces_touchees(), raycasts.get_positions_touchees(), vecteurs))
+
+        with profileur.mesurer("rasterisation"):
+            if self.get_mode_rasterisation() == "tampon":
+                self.rasteriser_tampon(hauteurs, textures, position, vecteurs, distances)
+            else:
+                self.rasteriser_rect(hauteurs, camera.get_largeur_colonne(), textures)
+        if self.get_mode_rasterisation() == "tampon": # Dessiner les sprites par-dessus les murs, avant la mise à l'échelle
+            self.rasteriser_sprites(angle, position, distances, alpha)
+            with profileur.mesurer("rasterisation"):
+                self.afficher_tampon()
+
+        camera.ajuster_resolution(time.perf_counter() - debut)
+        self.incruster_minicarte(angle, position, alpha)
+
+    def rendu_3d_bandes(self, position: tuple, vecteurs: np.ndarray) -> np.ndarray:
+        """Écrit les colonnes dans le tampon de pixels par bandes de colonnes, chaque travailleur lançant les rayons et rasterisant
+        une bande, ou tout l'écran en une seule bande (voir rp.rendre_bande) sans travailleurs
 
-        fov = self.get_structure_de_base().get_fov()
-        nb_raycast = 275
-        ratio = fov / nb_raycast
-        ratio_fenetre_raycast = self.get_taille_fenetre()[0] / nb_raycast
+        Args:
+            position (tuple): position de début du raycast
+            vecteurs (np.ndarray): direction de chaque colonne, de forme (nb_colonnes, 2)
 
-        distance_ecran = self.get_taille_fenetre()[1] / 2 * math.tan(math.radians(fov / 2))
-        hauteur_mur = 2
-        for i in range(nb_raycast):
-            angle_actuel = angle - fov / 2 + i * ratio
-            vecteur_avant = ob.calculer_vecteur(angle_actuel)
-            raycast = self.ray_cast(position, vecteur_avant)
-            if raycast != None:
-                distance = (raycast.get_distance() + 0.0001) * math.cos(math.radians(angle - angle_actuel))
+        Returns:
+            np.ndarray: profondeur du mur de chaque colonne, corrigée de l'effet fish-eye
+        """
+        import rendu_parallele as rp
+
+        camera = self.get_camera()
+        tampon = self.preparer_tampon(len(vecteurs))
+        couleurs = (self.couleur_tampon((0, 128, 128)), self.couleur_tampon((255, 255, 255)), self.couleur_tampon((0, 0, 0)))
+        textures = {} # Arguments des textures, murs unis si vide
+        if self.is_textures_actives():
+            textures["indices_textures"] = self.get_indices_textures() # Charger les textures avant de lire la pile
+            if self.is_sol_plafond_textures(): textures["sol_plafond"] = (camera.get_distances_lignes(),) + self.get_indices_sol_plafond()
+            textures["pile_textures"] = self.get_textures().get_pile()
+            textures["cache_hauteurs"] = self.get_cache_hauteurs()
+            if self.is_couleurs_indexees(): # Les bandes lisent les textures ombrées de la bande de chaque colonne et de chaque ligne
+                palette = self.get_palette()
+                textures["pile_textures"] = palette.get_pile_ombree()
+                textures["ombrage"] = (palette.get_nb_bandes(), palette.get_distance_brouillard(), palette.get_nb_textures())
+
+        profileur = self.get_structure_de_base().get_profileur()
+        if self.get_rendu_parallele() != None:
+            with profileur.mesurer("rendu_parallele"):
+                return self.get_rendu_parallele().rendre(tampon, self.get_carte(), position, vecteurs, camera.get_corrections(), camera.get_distance_ecran(), couleurs, **textures)
+        distances_murs = self.get_distances_murs()
+        if not self.is_saut_rentable(): distances_murs = None # Sur une carte dense, le parcours normal est plus rapide par lot
+        return rp.rendre_bande(tampon, self.get_carte().get_tuiles(), position, vecteurs, camera.get_corrections(), camera.get_distance_ecran(), couleurs, distances_murs = distances_murs, profileur = profileur, **textures)
+
+    def set_cache_rendu_actif(self, cache_rendu_actif: bool) -> None:
+        """Change si le rendu en simili-3D est gardé tant que la clé de vue ne change pas
+
+        Args:
+            cache_rendu_actif (bool): si le cache du rendu est actif
+        """
+        self.cache_rendu_actif = cache_rendu_actif
+        self.cle_vue = None
+
+    def set_brouillard(self, distance_brouillard: float, couleur_brouillard: tuple = None, lumiere: float = None) -> None:
+        """Change le brouillard et la lumière du rendu en couleurs indexées
+
+        Args:
+            distance_brouillard (float): distance où le brouillard recouvre tout, en cellules
+            couleur_brouillard (tuple, optionnel): couleur du brouillard, inchangée si None
+            lumiere (float, optionnel): niveau de lumière entre 0 et 1, inchangé si None
+        """
+        self.palette.set_brouillard(distance_brouillard, couleur_brouillard, lumiere)
+
+    def set_distances_murs(self, distances: np.ndarray) -> None:
+        """Change le champ de distance aux murs de la carte actuelle, par exemple calculé pendant un préchargement
+
+        Args:
+            distances (np.ndarray): distances aux murs de la carte indexées [x, y] (voir rc.distances_murs)
+        """
+        assert distances.shape == tuple(self.get_carte().get_taille()), ("Scene graphique \"" + self.get_nom() + "\" : le champ de distance aux murs n'a pas la taille de la carte.")
+        self.distances_murs = distances
+        self.saut_rentable = rc.saut_rentable(self.get_carte().get_tuiles(), distances)
+        self.cle_distances_murs = (id(self.get_carte()), self.get_carte().get_revision())
+
+    def set_minicarte_incrustee(self, incrustee: bool, proportion: float = 0.25) -> None:
+        """Active ou désactive la minicarte incrustée dans le rendu en simili-3D
+
+        Args:
+            incrustee (bool): si la minicarte est incrustée
+            proportion (float, optionnel): largeur de la minicarte par rapport à celle de la fenêtre, par défaut à 0.25
+        """
+        import minicarte as mc
+
+        assert 0 < proportion <= 1, ("Scene graphique \"" + self.get_nom() + "\" : la proportion de la minicarte doit être entre 0 et 1.")
+        if not incrustee:
+            self.minicarte_incrustee = None
+            return
+        largeur = max(int(self.get_taille_fenetre()[0] * proportion), 1)
+        hauteur = max(min(int(largeur * self.get_carte().get_taille()[1] / self.get_carte().get_taille()[0]), int(self.get_taille_fenetre()[1]) - 16), 1) # Garder les proportions de la carte
+        self.minicarte_incrustee = mc.Minicarte((largeur, hauteur), self.get_structure_de_base())
+
+    def set_mode_couleurs(self, mode_couleurs: str) -> None:
+        """Change les couleurs du tampon du rendu en simili-3D, la palette ne servant qu'en rasterisation "tampon"
+
+        Args:
+            mode_couleurs (str): "rgb" (pixels de la surface) ou "palette" (indices d'une palette de 256 couleurs, avec lumière et brouillard)
+        """
+        assert mode_couleurs in ("rgb", "palette"), ("Scene graphique \"" + self.get_nom() + "\" : les couleurs \"" + mode_couleurs + "\" n'existent pas.")
+        self.mode_couleurs = mode_couleurs
 
-                hauteur = (hauteur_mur / distance) * distance_ecran
-                largeur = ratio_fenetre_raycast
-                x = i * ratio_fenetre_raycast
-                y = self.get_taille_fenetre()[1] / 2 - hauteur / 2
-                
-                pg.draw.rect(retour, (255, 255, 255), (x, y, largeur, hauteur))
+    def set_mode_rasterisation(self, mode_rasterisation: str) -> None:
+        """Change la rasterisation du rendu en simili-3D
+
+        Args:
+            mode_rasterisation (str): "tampon" (tampon de pixels) ou "rect" (un rectangle par colonne)
+        """
+        assert mode_rasterisation in ("tampon", "rect"), ("Scene graphique \"" + self.get_nom() + "\" : la rasterisation \"" + mode_rasterisation + "\" n'existe pas.")
+        self.mode_rasterisation = mode_rasterisation
+
+    def set_raycast_batch(self, raycast_batch: bool) -> None:
+        """Change si le rendu utilise le raycast par lot
+
+        Args:
+            raycast_batch (bool): si le rendu utilise le raycast par lot
+        """
+        self.raycast_batch = raycast_batch
+
+    def set_saut_espace_vide(self, saut_espace_vide: bool) -> None:
+        """Change si les rayons sautent les zones vides grâce au champ de distance aux murs, les impacts restant les mêmes
+
+        Args:
+            saut_espace_vide (bool): si les rayons sautent les zones vides
+        """
+        self.saut_espace_vide = saut_espace_vide
+
+    def set_sol_plafond_textures(self, sol_plafond_textures: bool, texture_sol: str = None, texture_plafond: str = None) -> None:
+        """Change si le sol et le plafond sont texturés quand les murs le sont, et leurs textures
+
+        Args:
+            sol_plafond_textures (bool): si le sol et le plafond sont texturés
+            texture_sol (str, optionnel): nom de la texture du sol, inchangée par défaut
+            texture_plafond (str, optionnel): nom de la texture du plafond, inchangée par défaut
+        """
+        self.sol_plafond_textures = sol_plafond_textures
+        if texture_sol != None: self.texture_sol = texture_sol
+        if texture_plafond != None: self.texture_plafond = texture_plafond
+        self.cle_vue = None
+
+    def set_sprites_actifs(self, sprites_actifs: bool) -> None:
+        """Change si les sprites sont dessinés, en rasterisation "tampon"
+
+        Args:
+            sprites_actifs (bool): si les sprites sont dessinés
+        """
+        self.sprites_actifs = sprites_actifs
+
+    def set_textures_actives(self, textures_actives: bool) -> None:
+        """Change si les murs sont texturés
+
+        Args:
+            textures_actives (bool): si les murs sont texturés
+        """
+        self.textures_actives = textures_actives
 
 class Scene:
     """Classe représentant une scène normal
     """
 
-    def __init__(self, nom: str, carte: str, taille_fenetre: tuple, structure_de_base: sb.Structure_De_Base, graphique: bool = True, physique: bool = True) -> None:
+    def __init__(self, nom: str, carte: str | ca.Carte, taille_fenetre: tuple, structure_de_base: sb.Structure_De_Base, graphique: bool = True, physique: bool = True, finaliser: bool = True, rapporter = None, visibilite: bool = False) -> None:
         """Créer une scène
 
         Args:
             nom (str): nom de la scène
-            carte (str): chemin d'accés vers la carte représentant la scène
+            carte (str | ca.Carte): chemin d'accés vers la carte représentant la scène, ou carte déjà lue, partagée avec d'autres scènes
             structure_de_base (sb.Structure_De_Base): structure de base du jeu
             graphique (bool, optionnel): si la scène contient une partie graphique ou non, par défaut à "True"
             physique (bool, optionnel): si la scène contient une partie physique ou non, par défaut à "True"
+            finaliser (bool, optionnel): si la scène graphique et le joueur sont créés tout de suite, sinon il faut appeler finaliser sur le fil principal, par défaut à "True"
+            rapporter (optionnel): fonction appelée avec l'étape (str) et la progression (float) du chargement, par défaut aucune
+            visibilite (bool, optionnel): si le PVS de la carte est lu ou calculé avec la scène, pour get_objets_visibles, par défaut à "False"
         """
-        contenu = self.contenu_carte(carte)
+        debut = time.perf_counter()
+        self.nom = nom # Nom de la scène
+        self.structure_de_base = structure_de_base # Structure du base de jeu
 
-        self.carte = [] # Contenu de la carte de la scène
+        if rapporter != None: rapporter("lecture", 0)
+        self.chemin_pvs = None # Fichier du PVS de la carte, à côté de la carte compilée, None s'il n'est pas gardé
+        self.cle_pvs = None # Carte et révision ayant servi au PVS
+        self.pvs = None # Cellules visibles depuis chaque cellule vide de la carte, lues ou calculées au chargement, None sans PVS
+        self.carte = carte if isinstance(carte, ca.Carte) else self.lire_carte(carte) # Grille des tuiles de la scène, partagée avec les scènes graphique et physique
+        self.distances_murs = None # Champ de distance aux murs calculé avec la scène, donné à la scène graphique en la finalisant
+        self.finalisee = False # Si la scène graphique et le joueur ont été créés
         self.graphique = graphique #Si la scène utilise une scène graphique
-        self.nom = nom # Nom de la scène
+        self.index_spatial = isp.Index_Spatial() # Index spatial des objets de la scène, par cellule de la carte
+        self.joueur = None # Joueur de la scène, créé en la finalisant
         self.objets = {} # Objets dans la scène, de clé leur nom et de valeur l'objet
+        self.objets_animes = {} # Objets simulés un par un à chaque étape : ceux qui redéfinissent frame ou qui sont hors du stock de la scène
+        self.objets_carte = {} # Objets des murs de la carte, de clé leur cellule, créés seulement quand on les demande
         self.physique = physique # Si la scène utilise une scène physique
         self.scene_graphique = None #Scène graphique de la scène
         self.scene_physique = None # Scène physique de la scène
-        self.structure_de_base = structure_de_base # Structure du base de jeu
-        self.taille = (int(contenu[0].split(" ")[0]), int(contenu[0].split(" ")[0])) # Obtenir la taille de la carte
-
-        if graphique: # Si la scène contient une partie graphique
-            self.scene_graphique = Scene_Graphique(self.get_nom(), self.get_taille(), taille_fenetre, self.get_structure_de_base())
+        self.stock_entites = en.Stock_Entites() # Positions, angles et vitesses des objets de la scène, simulés ensemble
+        self.taille = self.get_carte().get_taille() # Taille de la carte
+        self.taille_fenetre = taille_fenetre # Taille de la fenêtre, pour la scène graphique
 
+        if rapporter != None: rapporter("structures", 0.5)
         if physique: # Si la scène contient une partie physique
-            self.scene_physique = Scene_Physique(self.get_structure_de_base())
+            self.scene_physique = Scene_Physique(self.get_structure_de_base(), carte = self.get_carte(), index_spatial = self.get_index_spatial())
+
+        if graphique and not isinstance(self.get_carte(), ca.Carte_Fragmentee): # Calculer ici le champ de distance plutôt qu'au premier rendu
+            if rapporter != None: rapporter("distances", 0.7)
+            self.distances_murs = rc.distances_murs(self.get_carte().get_tuiles())
 
-        self.remplir_carte() # Préparer la carte
-        self.charger_carte(contenu[1:])
+        if visibilite: # Lire ou calculer le PVS ici, dans le travailleur d'un préchargement, plutôt que pendant le jeu
+            if rapporter != None: rapporter("visibilite", 0.8)
+            self.charger_pvs()
 
-        self.joueur = self.nouvel_objet("joueur", 1.5, 1.5, couleur_2d = (0, 255, 0), graphique = False, physique = False, type = "joueur")
+        self.temps_chargement = time.perf_counter() - debut # Temps de lecture et de chargement de la carte, en secondes
+        if finaliser: self.finaliser()
 
     def ajouter_objet(self, nom: str, objet: ob.Objet) -> None:
         """Rajoute un objet déjà crée dans le jeu
@@ -428,22 +1306,33 @@ class Scene:
             nom (str): nom de l'objet à rajouter
             objet (ob.Objet): objet à rajouter
         """
-        assert list(self.get_objets().keys()).count(nom) <= 0, ("Scene \"" + self.get_nom() + "\" : un objet de nom \"" + nom + "\" existe déjà.") # Si l'objet n'existe pas déjà
+        assert nom not in self.get_objets(), ("Scene \"" + self.get_nom() + "\" : un objet de nom \"" + nom + "\" existe déjà.") # Si l'objet n'existe pas déjà
         self.objets[nom] = objet
+        if type(objet).frame != ob.Objet.frame or objet.get_stock() != self.get_stock_entites(): # Les autres objets sont simulés en bloc par le stock
+            self.objets_animes[nom] = objet
+        self.get_index_spatial().ajouter(objet) # Indexer l'objet selon sa position
 
-    def charger_carte(self, carte: list) -> None:
+    def charger_carte(self, carte: list, destination: ca.Carte = None) -> None:
         """Charge la carte depuis le retour de contenu_carte
 
         Args:
             carte (list): retour de contenu_carte
+            destination (ca.Carte, optionnel): carte où charger les tuiles, par défaut la carte de la scène
+        """
+        if destination == None: destination = self.get_carte()
+        taille = destination.get_taille()
+        assert len(carte) == taille[1], ("Scene \"" + self.get_nom() + "\" : la carte que vous voulez chargé n'a pas la même hauteur en métadonnée qu'en contenu.")
+        for i in range(len(carte)): # Vérifier la largeur de chaque ligne
+            assert len(carte[i]) == taille[0], ("Scene \"" + self.get_nom() + "\" : la carte que vous voulez chargé n'a pas la même largeur en métadonnée qu'en contenu.")
+        destination.charger_tuiles(fc.tuiles_depuis_texte(carte, taille)) # Lire toute la carte en une fois
+
+    def charger_pvs(self) -> None:
+        """Lit le PVS de la carte à côté de la carte compilée, ou le calcule et l'y écrit, à rappeler après avoir retiré des murs
         """
-        assert len(carte) == self.get_taille()[1], ("Scene \"" + self.get_nom() + "\" : la carte que vous voulez chargé n'a pas la même hauteur en métadonnée qu'en contenu.")
-        for i in range(len(carte)): # Parcourir la carte
-            assert len(carte[i]) == self.get_taille()[0], ("Scene \"" + self.get_nom() + "\" : la carte que vous voulez chargé n'a pas la même largeur en métadonnée qu'en contenu.")
-            for j in range(len(carte[i])):
-                if int(carte[i][j]) != 0:
-                    nom = str(j) + "," + str(i) # Demander la création de l'objet
-                    self.nouvel_objet(nom, j, i)
+        carte = self.get_carte()
+        assert not isinstance(carte, ca.Carte_Fragmentee), ("Scene \"" + self.get_nom() + "\" : une carte fragmentée n'a pas de PVS, elle n'est jamais chargée en entier.")
+        self.pvs = vi.charger_pvs(self.chemin_pvs, carte.get_tuiles(), self.get_structure_de_base().get_nb_rayons_visibilite())
+        self.cle_pvs = (id(carte), carte.get_revision())
 
     def contenu_carte(self, carte: str) -> list:
         """Retourne le contenu d'une carte
@@ -468,17 +1357,33 @@ class Scene:
 
         return contenu
     
+    def finaliser(self) -> None:
+        """Termine la création de la scène sur le fil principal : la scène graphique et ses surfaces pygame, puis le joueur
+        """
+        assert not self.is_finalisee(), ("Scene \"" + self.get_nom() + "\" : la scène est déjà finalisée.")
+        debut = time.perf_counter()
+        if self.is_graphique(): # Si la scène contient une partie graphique
+            self.scene_graphique = Scene_Graphique(self.get_nom(), self.get_taille(), self.taille_fenetre, self.get_structure_de_base(), carte = self.get_carte(), index_spatial = self.get_index_spatial())
+            if self.distances_murs is not None: self.get_scene_graphique().set_distances_murs(self.distances_murs)
+            self.get_scene_graphique().get_indices_textures() # Charger les textures maintenant plutôt qu'au premier rendu
+        self.temps_chargement += time.perf_counter() - debut
+        self.finalisee = True
+
+        self.joueur = self.nouvel_objet("joueur", 1.5, 1.5, couleur_2d = (0, 255, 0), graphique = False, physique = True, type = "joueur")
+
     def frame(self) -> None:
-        """Réalise une frame de la scène
+        """Réalise une frame de la scène : le rendu de la position actuelle, puis une étape de simulation de la durée du delta time
         """
-        for objet in self.get_objets().values(): # Réaliser une frame dans chaques objets
-            objet.frame(self.get_structure_de_base().get_delta_time())
+        self.rendre()
+        self.simuler()
 
-        if self.is_graphique(): # Réalise une frame de la scène graphique si il y en a une
-            self.get_scene_graphique().frame()
-            self.get_scene_graphique().rendu_3d(self.get_joueur().get_angle(), self.get_joueur().get_position())
+    def get_index_spatial(self) -> isp.Index_Spatial:
+        """Retourne l'index spatial des objets de la scène, pour trouver les objets proches d'une position
 
-        self.simuler_joueur() # S'occuper du joueur
+        Returns:
+            isp.Index_Spatial: index spatial des objets
+        """
+        return self.index_spatial
 
     def get_joueur(self) -> ob.Joueur:
         """Retourne le joueur dans la scène
@@ -495,6 +1400,26 @@ class Scene:
             str: nom de la scène
         """
         return self.nom
+
+    def get_objet_sur_carte(self, x: int, y: int) -> ob.Objet:
+        """Retourne l'objet du mur d'une cellule de la carte, en le créant depuis sa tuile si besoin
+
+        Args:
+            x (int): coordonnée x de la cellule
+            y (int): coordonnée y de la cellule
+
+        Returns:
+            ob.Objet: objet du mur de la cellule, None si la cellule est vide
+        """
+        if self.get_carte().get_tuile(x, y) == 0:
+            return None
+        if self.is_graphique(): # Partager l'objet avec la scène graphique
+            return self.get_scene_graphique().get_objet_sur_carte(x, y).get_objet()
+        objet = self.objets_carte.get((x, y))
+        if objet == None:
+            objet = ob.Objet(str(x) + "," + str(y), position = (x, y, 0))
+            self.objets_carte[(x, y)] = objet
+        return objet
     
     def get_objets(self) -> dict:
         """Retourne le dictionnaire d'objets dans le jeu
@@ -504,6 +1429,38 @@ class Scene:
         """
         return self.objets
 
+    def get_objets_visibles(self, position: tuple) -> list:
+        """Retourne les objets de la scène potentiellement visibles depuis une position, avec le PVS de la carte, ou tous sans PVS
+
+        Args:
+            position (tuple): position de l'observateur
+
+        Returns:
+            list: objets potentiellement visibles
+        """
+        if self.get_pvs() == None: return list(self.get_objets().values())
+        stock = self.get_stock_entites()
+        lignes = stock.get_lignes_utilisees()
+        visibles = self.get_pvs().sont_visibles(position, stock.get_positions()[lignes]) # Une lecture de bit par objet, sans raycast
+        retour = stock.get_objets()[lignes[visibles]].tolist()
+        for objet in self.objets_animes.values(): # Objets hors du stock de la scène
+            if objet.get_stock() != stock and self.get_pvs().est_visible(position, objet.get_position()): retour.append(objet)
+        return retour
+
+    def get_pvs(self) -> vi.Pvs:
+        """Retourne les cellules visibles depuis chaque cellule vide de la carte, jamais recalculées ici : le PVS est oublié
+        si des murs ont été retirés depuis, et gardé si des murs ont seulement été ajoutés, car il reste alors un sur-ensemble
+
+        Returns:
+            vi.Pvs: PVS de la carte, None s'il n'a pas été chargé ou s'il a été oublié
+        """
+        carte = self.get_carte()
+        cle = (id(carte), carte.get_revision())
+        if self.pvs != None and self.cle_pvs != cle:
+            if np.any((self.pvs.get_lignes() < 0) & (carte.get_tuiles() == 0)): self.pvs = None # Un mur retiré ouvre des vues absentes du PVS
+            self.cle_pvs = cle
+        return self.pvs
+
     def get_scene_graphique(self) -> Scene_Graphique:
         """Retourne la scène graphique dans la scène
 
@@ -519,7 +1476,23 @@ class Scene:
             Scene_Physique: scène physique dans la scène
         """
         return self.scene_physique
+
+    def get_carte(self) -> ca.Carte:
+        """Retourne la carte de la scène
+
+        Returns:
+            ca.Carte: carte de la scène
+        """
+        return self.carte
     
+    def get_stock_entites(self) -> en.Stock_Entites:
+        """Retourne le stock des positions, angles et vitesses des objets de la scène
+
+        Returns:
+            en.Stock_Entites: stock des entités de la scène
+        """
+        return self.stock_entites
+
     def get_structure_de_base(self) -> sb.Structure_De_Base:
         """Retourne la structure de base du jeu
 
@@ -536,6 +1509,22 @@ class Scene:
         """
         return self.taille
 
+    def get_temps_chargement(self) -> float:
+        """Retourne le temps de chargement de la carte de la scène
+
+        Returns:
+            float: temps de chargement de la carte, en secondes
+        """
+        return self.temps_chargement
+
+    def is_finalisee(self) -> bool:
+        """Retourne si la scène graphique et le joueur ont été créés, la scène pouvant alors être jouée
+
+        Returns:
+            bool: si la scène est finalisée
+        """
+        return self.finalisee
+
     def is_graphique(self) -> bool:
         """Retourne si la scène contient une partie graphique
 
@@ -552,7 +1541,64 @@ class Scene:
         """
         return self.physique
     
-    def nouvel_objet(self, nom: str, x: int, y: int, couleur_2d: tuple = (255, 0, 0), graphique: bool = True, physique: bool = True, type: str = "") -> ob.Objet:
+    def is_rendu_inchange(self) -> bool:
+        """Retourne si le rendu de la scène n'a pas changé depuis la frame précédente
+
+        Returns:
+            bool: si le rendu de la scène n'a pas changé
+        """
+        return self.is_graphique() and self.get_scene_graphique().is_rendu_inchange()
+
+    def lire_carte(self, carte: str) -> ca.Carte:
+        """Lit une carte texte (.wad), depuis le cache si elle n'a pas changé, ou une carte compilée (.cwad)
+
+        Args:
+            carte (str): chemin d'accés vers la carte
+
+        Returns:
+            ca.Carte: carte lue
+        """
+        assert os.path.exists(carte), ("Scene \"" + self.get_nom() + "\" : la carte que vous voulez chargé, de chemin d'accés \"" + carte + "\", n'existe pas.")
+        extension = carte.split(".")[-1]
+        if extension == "cwad": # Carte déjà compilée
+            self.chemin_pvs = carte[:-len(extension)] + "pvs"
+            return self.lire_carte_compilee(carte)
+
+        dossier_cache = self.get_structure_de_base().get_dossier_cache_cartes()
+        chemin_cache = None
+        if dossier_cache != None and extension == "wad":
+            chemin_cache = fc.chemin_cache(carte, dossier_cache)
+            self.chemin_pvs = chemin_cache[:-len("cwad")] + "pvs"
+            if os.path.exists(chemin_cache): # La carte n'a pas changé depuis sa mise en cache
+                return self.lire_carte_compilee(chemin_cache)
+
+        contenu = self.contenu_carte(carte)
+        retour = ca.Carte((int(contenu[0].split(" ")[0]), int(contenu[0].split(" ")[1]))) # Obtenir la taille de la carte
+        self.charger_carte(contenu[1:], retour)
+        if chemin_cache != None:
+            try:
+                fc.ecrire_carte_compilee(chemin_cache, retour)
+                fc.nettoyer_cache(chemin_cache) # Ne pas garder les versions précédentes de la carte
+            except OSError: # Un cache impossible à écrire ne doit pas empêcher de jouer
+                pass
+        return retour
+
+    def lire_carte_compilee(self, chemin: str) -> ca.Carte:
+        """Lit une carte compilée, en fragments si elle dépasse le seuil de fragmentation
+
+        Args:
+            chemin (str): chemin d'accés vers la carte compilée
+
+        Returns:
+            ca.Carte: carte lue
+        """
+        structure_de_base = self.get_structure_de_base()
+        _, taille, _, _ = fc.lire_en_tete(chemin)
+        if structure_de_base.get_seuil_fragmentation() != None and taille[0] * taille[1] >= structure_de_base.get_seuil_fragmentation():
+            return fc.lire_carte_fragmentee(chemin, structure_de_base.get_taille_fragments(), structure_de_base.get_budget_memoire_fragments())
+        return fc.lire_carte_compilee(chemin)
+
+    def nouvel_objet(self, nom: str, x: int, y: int, couleur_2d: tuple = (255, 0, 0), graphique: bool = True, physique: bool = True, type: str = "", sprite: str = None, taille_sprite: float = 0.5) -> ob.Objet:
         """Crée un objet dans la scène et le retourne
 
         Args:
@@ -563,22 +1609,30 @@ class Scene:
             graphique (bool, optionnel): si l'objet à une partie graphique, par défaut à "True"
             physique (bool, optionnel): si l'objet à une partie physique, par défaut à "True"
             type (str, optionnel): type de l'objet a crée, apr défaut à ""
+            sprite (str, optionnel): nom de la texture du sprite de l'objet, qui n'est alors pas un mur de la carte, par défaut aucun
+            taille_sprite (float, optionnel): hauteur du sprite par rapport à celle d'un mur, par défaut à 0.5
 
         Return:
             ob.Objet: objet crée
         """
-        assert list(self.get_objets().keys()).count(nom) <= 0, ("Scene \"" + self.get_nom() + "\" : un objet de nom \"" + nom + "\" existe déjà.") # Si l'objet n'existe pas déjà
+        assert nom not in self.get_objets(), ("Scene \"" + self.get_nom() + "\" : un objet de nom \"" + nom + "\" existe déjà.") # Si l'objet n'existe pas déjà
         objet = None
         if type == "joueur":
-            objet = ob.Joueur(position = (x, y, 0)) # Création du joueur
+            objet = ob.Joueur(position = (x, y, 0), stock = self.get_stock_entites()) # Création du joueur
 
             if self.is_graphique() and graphique: # Créer un nouvel objet graphique pour le joueur
                 self.get_scene_graphique().nouvel_objet(nom, objet, couleur_2d, forme_2d = "cercle")
+
+            if self.is_physique() and physique: # Donner un corps au joueur pour qu'il ne traverse pas les murs
+                self.get_scene_physique().nouvel_objet(nom, objet, forme = "cercle", taille = 0.2)
         else:
-            objet = ob.Objet(nom, position = (x, y, 0)) # Création de l'objet
+            objet = ob.Objet(nom, position = (x, y, 0), stock = self.get_stock_entites()) # Création de l'objet
 
-            if self.is_graphique() and graphique: # Créer un nouvel objet graphique
-                self.get_scene_graphique().nouvel_objet(nom, objet, couleur_2d)
+            graphique = self.is_graphique() and graphique
+            if graphique: # Créer un nouvel objet graphique, un mur de la carte s'il n'a pas de sprite
+                self.get_scene_graphique().nouvel_objet(nom, objet, couleur_2d, forme_2d = "rectangle" if sprite == None else "cercle", sprite = sprite, taille_sprite = taille_sprite)
+            if self.is_physique() and physique and (not graphique or sprite != None): # Un objet graphique rectangulaire devient un mur de la carte, seuls les autres ont un corps
+                self.get_scene_physique().nouvel_objet(nom, objet)
 
         self.ajouter_objet(nom, objet) # Ajouter l'objet à la scène
         return objet
@@ -586,12 +1640,24 @@ class Scene:
     def remplir_carte(self) -> None:
         """Rempli la carte avec du vide
         """
-        self.carte.clear() # Vider la carte
-        for _ in range(self.get_taille()[0]): # Remplir la carte selon la taille défini
-            partie = []
-            for __ in range(self.get_taille()[1]):
-                partie.append(0)
-            self.carte.append(partie)
+        self.get_carte().vider()
+        self.objets_carte.clear()
+        if self.is_graphique():
+            self.get_scene_graphique().remplir_carte()
+
+    def rendre(self, alpha: float = 1) -> None:
+        """Met à jour le rendu de la scène, avec la position du joueur interpolée entre les deux dernières étapes de simulation
+
+        Args:
+            alpha (float, optionnel): avancée entre l'avant-dernière (0) et la dernière (1) étape de simulation, par défaut à 1
+        """
+        joueur = self.get_joueur()
+        self.get_carte().precharger_autour(joueur.get_position(), self.get_structure_de_base().get_taille_fragments()) # Charger les fragments proches du joueur
+
+        if self.is_graphique(): # Réalise une frame de la scène graphique si il y en a une
+            self.get_scene_graphique().frame()
+            with self.get_structure_de_base().get_profileur().mesurer("rendu_3d"):
+                self.get_scene_graphique().rendu_3d(joueur.get_angle_interpole(alpha), joueur.get_position_interpolee(alpha), alpha)
 
     def rendu(self) -> pg.Surface:
         """Retourne le rendu de la scène
@@ -599,25 +1665,54 @@ class Scene:
         Returns:
             pg.Surface: rendu de la scène
         """
+        import pygame as pg
+
         if self.is_graphique():
             return self.get_scene_graphique().get_rendu()
-        retour = pg.image.load("textures/inconnu.png").convert_alpha()
+        retour = pg.image.load("textures/inconnu.png")
+        if not self.get_structure_de_base().is_sans_fenetre(): retour = retour.convert_alpha()
         return retour
     
+    def simuler(self) -> None:
+        """Réalise une étape de simulation de la scène, de la durée du delta time de la structure de base
+        """
+        profileur = self.get_structure_de_base().get_profileur()
+        delta_time = self.get_structure_de_base().get_delta_time()
+        with profileur.mesurer("objets"):
+            stock = self.get_stock_entites()
+            stock.memoriser_poses() # Garder la pose de toutes les entités du stock pour l'interpolation
+            for objet in self.objets_animes.values(): # Réaliser une frame dans les objets qui en ont besoin
+                if objet.get_stock() != stock: objet.memoriser_pose()
+                objet.frame(delta_time)
+
+            lignes, anciennes_positions = stock.integrer(delta_time) # Déplacer et tourner ensemble les entités ayant une vitesse
+            if len(lignes) > 0:
+                self.get_index_spatial().mettre_a_jour_lot(stock.get_objets()[lignes], anciennes_positions, stock.get_positions()[lignes])
+
+        with profileur.mesurer("joueur"):
+            self.simuler_joueur() # S'occuper du joueur
+
+        if self.is_physique(): # Déplacer tous les corps ensemble, avec les collisions
+            with profileur.mesurer("physique"):
+                self.get_scene_physique().frame()
+
     def simuler_joueur(self) -> None:
         """Simule la frame pour le joueur
         """
         joueur = self.get_joueur()
         vecteur_avant = joueur.get_vecteur_avant()
 
-        # Vérifier si les touches sont pressées
-        touches_h = (self.get_structure_de_base().get_touches_pressees().count(pg.K_LEFT) > 0, self.get_structure_de_base().get_touches_pressees().count(pg.K_RIGHT) > 0)
-        touches_v = (self.get_structure_de_base().get_touches_pressees().count(pg.K_UP) > 0, self.get_structure_de_base().get_touches_pressees().count(pg.K_DOWN) > 0)
+        # Vérifier si les actions sont pressées
+        touches_h = (self.get_structure_de_base().is_action_pressee("gauche"), self.get_structure_de_base().is_action_pressee("droite"))
+        touches_v = (self.get_structure_de_base().is_action_pressee("avancer"), self.get_structure_de_base().is_action_pressee("reculer"))
         vitesse = joueur.get_vitesse() * self.get_structure_de_base().get_delta_time()
         vitesse_rotation = joueur.get_vitesse_rotation() * self.get_structure_de_base().get_delta_time()
 
         mouvement_avant = (vitesse * vecteur_avant[0] * touches_v[0] - vitesse * vecteur_avant[0] * touches_v[1], vitesse * vecteur_avant[1] * touches_v[0] - vitesse * vecteur_avant[1] * touches_v[1], 0)
-        joueur.move(mouvement_avant) # Faire bouger le joueur vers l'avant
+        if self.is_physique() and joueur.get_nom() in self.get_scene_physique().get_objets(): # Faire bouger le joueur vers l'avant, sans traverser les murs
+            self.get_scene_physique().get_objets()[joueur.get_nom()].deplacer(mouvement_avant)
+        else:
+            joueur.move(mouvement_avant)
 
         rotation = (vitesse_rotation * touches_h[1] - vitesse_rotation * touches_h[0])
         joueur.rotate(rotation)
\ No newline at end of file
@@ -0,0 +1,122 @@
+#-------------------------------------
+#             Sprites.py
+#-------------------------------------
+
+# Fichier contenant la projection et la rasterisation des sprites (objets toujours face à la caméra) dans le tampon de pixels.
+# Informations importantes :
+# -Les sprites sont dessinés après les murs, le sol et le plafond : la profondeur du mur de chaque colonne (distance corrigée
+#  de l'effet fish-eye, déjà calculée par le rendu en simili-3D) sert de tampon de profondeur par colonne.
+# -Tout est fait pour tous les sprites ensemble avec NumPy : les sprites derrière la caméra, hors de l'écran ou plus loin
+#  que tous les murs sont écartés avant d'être découpés en colonnes, puis les colonnes cachées par leur mur avant d'être
+#  découpées en pixels.
+# -Les colonnes de sprites sont rangées en couches : dans une couche, une colonne du tampon n'a qu'un seul sprite, du plus
+#  lointain (couche 0) au plus proche. Chaque couche est écrite en une seule affectation, dans l'ordre : les sprites proches
+#  recouvrent les lointains sans test par pixel.
+
+# Importer les librairies
+import math
+import numpy as np
+
+HAUTEUR_MUR = 2 # Hauteur des murs, la même que celle du rendu en simili-3D
+PROFONDEUR_MIN = 0.05 # Profondeur en dessous de laquelle un sprite est considéré derrière la caméra
+
+def projeter_sprites(positions: np.ndarray, tailles: np.ndarray, position: tuple, angle: float, fov: float, distance_ecran: float, largeur_colonne: float, taille_tampon: tuple) -> tuple:
+    """Retourne la place à l'écran des sprites visibles par la caméra, posés sur le sol
+
+    Args:
+        positions (np.ndarray): position de chaque sprite, de forme (n, 2) ou (n, 3)
+        tailles (np.ndarray): hauteur de chaque sprite, par rapport à celle d'un mur
+        position (tuple): position de la caméra
+        angle (float): angle de la caméra, en degrés
+        fov (float): champ de vision de la caméra, en degrés
+        distance_ecran (float): distance de projection de l'écran
+        largeur_colonne (float): largeur d'une colonne du tampon dans la fenêtre, les sprites y gardant leurs proportions
+        taille_tampon (tuple): nombre de colonnes et de lignes du tampon
+
+    Returns:
+        tuple: indices des sprites à l'écran, colonnes de début (incluses) et de fin (exclues), bord gauche et largeur en colonnes,
+               haut et hauteur en lignes et profondeur de chaque sprite à l'écran
+    """
+    radians = math.radians(angle)
+    avant = (math.cos(radians), math.sin(radians))
+    relatives = positions[:, :2] - (position[0], position[1])
+    profondeurs = relatives[:, 0] * avant[0] + relatives[:, 1] * avant[1] # Distance le long de l'avant de la caméra, comme celle des murs
+    indices = np.flatnonzero(profondeurs > PROFONDEUR_MIN) # Écarter les sprites derrière la caméra
+    profondeurs = profondeurs[indices]
+    lateraux = relatives[indices, 1] * avant[0] - relatives[indices, 0] * avant[1] # Décalage vers les colonnes suivantes
+
+    # Colonne du centre de chaque sprite, les colonnes ayant des angles régulièrement espacés (voir cm.Camera.calculer_tables)
+    centres = (np.arctan2(lateraux, profondeurs) + math.radians(fov) / 2) * (taille_tampon[0] / math.radians(fov))
+    hauteurs_murs = HAUTEUR_MUR * distance_ecran / profondeurs # Hauteur d'un mur à la profondeur du sprite, dont le bas est le sol
+    hauteurs = tailles[indices] * hauteurs_murs
+    hauts = taille_tampon[1] / 2 + hauteurs_murs / 2 - hauteurs
+    largeurs = hauteurs / largeur_colonne
+    gauches = centres - largeurs / 2
+    debuts = np.clip(np.ceil(gauches), 0, taille_tampon[0]).astype(np.intp) # Colonnes dont le centre est dans le sprite
+    fins = np.clip(np.ceil(gauches + largeurs), 0, taille_tampon[0]).astype(np.intp)
+
+    garder = np.flatnonzero((debuts < fins) & (hauts < taille_tampon[1]) & (hauts + hauteurs > 0)) # Écarter les sprites hors de l'écran
+    return indices[garder], debuts[garder], fins[garder], gauches[garder], largeurs[garder], hauts[garder], hauteurs[garder], profondeurs[garder]
+
+def rasteriser_sprites(tampon: np.ndarray, profondeurs_murs: np.ndarray, projection: tuple, textures: np.ndarray, pile_textures: np.ndarray, opacites: np.ndarray, decalages: np.ndarray = None) -> int:
+    """Écrit les sprites projetés dans le tampon, colonne par colonne, derrière les murs plus proches qu'eux
+
+    Args:
+        tampon (np.ndarray): tampon de pixels de forme (nb_colonnes, hauteur), modifié sur place
+        profondeurs_murs (np.ndarray): profondeur du mur de chaque colonne, infinie si aucun mur
+        projection (tuple): retour de projeter_sprites
+        textures (np.ndarray): indice de texture de chaque sprite, indexé comme les positions données à projeter_sprites
+        pile_textures (np.ndarray): pixels des textures, indexés [texture, u, v], au format des pixels du tampon
+        opacites (np.ndarray): opacité des texels des textures, indexée [texture, u, v]
+        decalages (np.ndarray, optionnel): décalage de l'indice de texture de chaque sprite projeté dans la pile, pour lire sa texture ombrée
+                                           (voir pa.Palette.get_pile_ombree), l'opacité étant lue sans décalage, par défaut aucun
+
+    Returns:
+        int: nombre de sprites dont au moins une colonne a été dessinée
+    """
+    indices, debuts, fins, gauches, largeurs, hauts, hauteurs, profondeurs = projection
+    proches = np.flatnonzero(profondeurs < np.max(profondeurs_murs, initial = 0)) # Un sprite plus loin que tous les murs est caché
+    if len(proches) == 0:
+        return 0
+
+    # Découper les sprites en colonnes et garder celles devant leur mur
+    nb_colonnes = fins[proches] - debuts[proches]
+    sprites = np.repeat(proches, nb_colonnes)
+    colonnes = debuts[sprites] + np.arange(len(sprites)) - np.repeat(np.cumsum(nb_colonnes) - nb_colonnes, nb_colonnes)
+    devant = np.flatnonzero(profondeurs[sprites] < profondeurs_murs[colonnes])
+    if len(devant) == 0:
+        return 0
+    sprites, colonnes = sprites[devant], colonnes[devant]
+
+    # Ranger les colonnes en couches : le rang de chaque colonne de sprite parmi celles de la même colonne du tampon, de la plus lointaine à la plus proche
+    ordre = np.lexsort((-profondeurs[sprites], colonnes))
+    sprites, colonnes = sprites[ordre], colonnes[ordre]
+    rangs = np.arange(len(colonnes))
+    nouvelles = np.ones(len(colonnes), dtype=bool)
+    nouvelles[1:] = colonnes[1:] != colonnes[:-1]
+    couches = rangs - np.maximum.accumulate(np.where(nouvelles, rangs, 0))
+    ordre = np.argsort(couches, kind = "stable")
+    sprites, colonnes, couches = sprites[ordre], colonnes[ordre], couches[ordre]
+
+    # Découper les colonnes en pixels, seulement sur les lignes du tampon : la ligne de texture avance d'un pas fixe par pixel
+    taille = pile_textures.shape[1]
+    hauteur_tampon = tampon.shape[1]
+    premieres = np.clip(np.ceil(hauts - 0.5), 0, hauteur_tampon).astype(np.intp)[sprites] # Lignes dont le centre est dans le sprite
+    nb_lignes = np.clip(np.ceil(hauts + hauteurs - 0.5), 0, hauteur_tampon).astype(np.intp)[sprites] - premieres
+    pas = taille / hauteurs[sprites]
+    u = np.clip(((colonnes - gauches[sprites]) * (taille / largeurs[sprites])).astype(np.intp), 0, taille - 1)
+    debuts_texels = (textures[indices[sprites]] * taille + u) * taille # Premier texel de la colonne de texture de chaque colonne
+    rangs = np.arange(nb_lignes.sum()) - np.repeat(np.cumsum(nb_lignes) - nb_lignes, nb_lignes) # Rang de chaque pixel dans sa colonne
+    v = np.minimum((np.repeat((premieres + 0.5 - hauts[sprites]) * pas, nb_lignes) + rangs * np.repeat(pas, nb_lignes)).astype(np.intp), taille - 1)
+    texels = np.repeat(debuts_texels, nb_lignes) + v
+
+    # Écrire les texels opaques, couche par couche, à leur place dans le tampon aplati
+    opaques = np.flatnonzero(np.take(opacites.ravel(), texels))
+    if decalages is not None: texels += np.repeat(decalages[sprites] * (taille * taille), nb_lignes)
+    places = (np.repeat(colonnes * hauteur_tampon + premieres, nb_lignes) + rangs)[opaques]
+    pixels = np.take(pile_textures.ravel(), texels[opaques])
+    limites = np.searchsorted(np.repeat(couches, nb_lignes)[opaques], np.arange(couches[-1] + 2))
+    plat = tampon.reshape(-1) # Vue sur le tampon, contigu
+    for debut, fin in zip(limites[:-1], limites[1:]):
+        plat[places[debut:fin]] = pixels[debut:fin]
+    return len(np.unique(sprites))
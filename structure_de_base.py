@@ -3,21 +3,56 @@
 #-------------------------------------
 
 # Fichier pour rendre accessible tous ce qui est nécessaire pour le jeu facilement.
+# Informations importantes :
+# -Les scènes ne lisent pas les touches mais des actions ("avancer", "reculer", "gauche", "droite") : une action est pressée
+#  si elle est dans les actions pressées (par exemple par un bot, sans pygame) ou si une touche pressée lui est associée.
+# -Les codes des touches dépendent de pygame : le moteur de jeu les associe aux actions en créant la fenêtre.
 
 # Importer les librairies
+import profileur as pf
 
 class Structure_De_Base:
     """Classe représentant une structure de base
     """
 
-    def __init__(self, taille_fenetre: tuple) -> None:
+    def __init__(self, taille_fenetre: tuple, sans_fenetre: bool = False) -> None:
         """Créer une structure de base
         """
+        self.actions_pressees = [] # Actions pressées directement, sans touche
+        self.budget_memoire_fragments = 64 * 1024 * 1024 # Mémoire maximum occupée par les fragments d'une carte fragmentée, en octets
         self.delta_time = 0
+        self.dossier_cache_cartes = ".cache_cartes" # Dossier du cache des cartes compilées, pas de cache si None
         self.fov = 60
+        self.frequence_rendu = 120 # Nombre maximum de rendus par seconde, sans limite si None
+        self.frequence_simulation = 60 # Nombre d'étapes de simulation par seconde, de durée fixe
+        self.mode_travailleurs_rendu = "fils" # Type des travailleurs du rendu, "fils" ou "processus" (voir rendu_parallele.py)
+        self.nb_rayons_visibilite = 64 # Nombre de rayons lancés depuis chaque coin de cellule pour calculer le PVS d'une carte, resserrés ensuite là où ils s'écartent
+        self.nb_etapes_rattrapage = 5 # Nombre maximum d'étapes de simulation par rendu pour rattraper le retard
+        self.nb_travailleurs_rendu = 1 # Nombre de travailleurs se partageant les colonnes du rendu en simili-3D
+        self.profileur = pf.Profileur() # Profileur des étapes de chaque frame, désactivé par défaut
+        self.sans_fenetre = sans_fenetre # Si le jeu est rendu hors écran, sans fenêtre
+        self.seuil_fragmentation = 4096 * 4096 # Nombre de cellules à partir duquel une carte compilée est lue en fragments
         self.taille_fenetre = taille_fenetre
+        self.taille_fragments = 64 # Côté d'un fragment de carte, en cellules
+        self.touches_actions = {} # Action associée à chaque code de touche
         self.touches_pressees = []
 
+    def get_actions_pressees(self) -> list:
+        """Retourne la liste des actions pressées directement, sans touche
+
+        Returns:
+            list: liste d'actions pressées
+        """
+        return self.actions_pressees
+
+    def get_budget_memoire_fragments(self) -> int:
+        """Retourne la mémoire maximum occupée par les fragments d'une carte fragmentée
+
+        Returns:
+            int: mémoire maximum, en octets
+        """
+        return self.budget_memoire_fragments
+
     def get_delta_time(self) -> float:
         """Retourne le temps entre la dernière frame et cette frame
 
@@ -26,6 +61,14 @@ class Structure_De_Base:
         """
         return self.delta_time
     
+    def get_dossier_cache_cartes(self) -> str:
+        """Retourne le dossier du cache des cartes compilées
+
+        Returns:
+            str: dossier du cache des cartes compilées, None si le cache est désactivé
+        """
+        return self.dossier_cache_cartes
+
     def get_fov(self) -> float:
         """Retourne le fov du jeu
 
@@ -34,6 +77,70 @@ class Structure_De_Base:
         """
         return self.fov
 
+    def get_frequence_rendu(self) -> float:
+        """Retourne le nombre maximum de rendus par seconde
+
+        Returns:
+            float: nombre maximum de rendus par seconde, None si le rendu n'est pas limité
+        """
+        return self.frequence_rendu
+
+    def get_frequence_simulation(self) -> float:
+        """Retourne le nombre d'étapes de simulation par seconde
+
+        Returns:
+            float: nombre d'étapes de simulation par seconde
+        """
+        return self.frequence_simulation
+
+    def get_mode_travailleurs_rendu(self) -> str:
+        """Retourne le type des travailleurs du rendu
+
+        Returns:
+            str: "fils" (fils d'exécution) ou "processus" (processus et mémoire partagée)
+        """
+        return self.mode_travailleurs_rendu
+
+    def get_nb_etapes_rattrapage(self) -> int:
+        """Retourne le nombre maximum d'étapes de simulation par rendu pour rattraper le retard
+
+        Returns:
+            int: nombre maximum d'étapes de simulation par rendu
+        """
+        return self.nb_etapes_rattrapage
+
+    def get_nb_rayons_visibilite(self) -> int:
+        """Retourne le nombre de rayons lancés depuis chaque coin de cellule pour calculer le PVS d'une carte
+
+        Returns:
+            int: nombre de rayons
+        """
+        return self.nb_rayons_visibilite
+
+    def get_nb_travailleurs_rendu(self) -> int:
+        """Retourne le nombre de travailleurs se partageant les colonnes du rendu en simili-3D
+
+        Returns:
+            int: nombre de travailleurs, 1 pour un rendu sans parallélisme
+        """
+        return self.nb_travailleurs_rendu
+
+    def get_profileur(self) -> pf.Profileur:
+        """Retourne le profileur des étapes de chaque frame
+
+        Returns:
+            pf.Profileur: profileur du jeu
+        """
+        return self.profileur
+
+    def get_seuil_fragmentation(self) -> int:
+        """Retourne le nombre de cellules à partir duquel une carte compilée est lue en fragments
+
+        Returns:
+            int: nombre de cellules, None si les cartes ne sont jamais fragmentées
+        """
+        return self.seuil_fragmentation
+
     def get_taille_fenetre(self) -> tuple:
         """Retourne la taille de la fenêtre
 
@@ -42,6 +149,22 @@ class Structure_De_Base:
         """
         return self.taille_fenetre
     
+    def get_taille_fragments(self) -> int:
+        """Retourne le côté d'un fragment de carte
+
+        Returns:
+            int: côté d'un fragment, en cellules
+        """
+        return self.taille_fragments
+
+    def get_touches_actions(self) -> dict:
+        """Retourne l'action associée à chaque code de touche
+
+        Returns:
+            dict: actions, de clé le code de leur touche
+        """
+        return self.touches_actions
+
     def get_touches_pressees(self) -> list:
         """Retourne une liste de touches pressées
 
@@ -50,10 +173,136 @@ class Structure_De_Base:
         """
         return self.touches_pressees
     
+    def is_action_pressee(self, action: str) -> bool:
+        """Retourne si une action est pressée, directement ou par une touche qui lui est associée
+
+        Args:
+            action (str): nom de l'action
+
+        Returns:
+            bool: si l'action est pressée
+        """
+        if action in self.actions_pressees:
+            return True
+        for touche in self.touches_pressees:
+            if self.touches_actions.get(touche) == action: return True
+        return False
+
+    def is_sans_fenetre(self) -> bool:
+        """Retourne si le jeu est rendu hors écran, sans fenêtre
+
+        Returns:
+            bool: si le jeu est rendu sans fenêtre
+        """
+        return self.sans_fenetre
+
+    def set_budget_memoire_fragments(self, budget_memoire_fragments: int) -> None:
+        """Change la mémoire maximum occupée par les fragments d'une carte fragmentée, pour les prochaines cartes lues
+
+        Args:
+            budget_memoire_fragments (int): nouvelle mémoire maximum, en octets
+        """
+        self.budget_memoire_fragments = budget_memoire_fragments
+
     def set_delta_time(self, delta_time: float) -> None:
         """Change la valeur entre la dernière frame et cette frame
 
         Args:
             delta_time (float): valeur entre la dernière frame et cette frame
         """
-        self.delta_time = delta_time
\ No newline at end of file
+        self.delta_time = delta_time
+
+    def set_dossier_cache_cartes(self, dossier_cache_cartes: str) -> None:
+        """Change le dossier du cache des cartes compilées
+
+        Args:
+            dossier_cache_cartes (str): nouveau dossier du cache, None pour désactiver le cache
+        """
+        self.dossier_cache_cartes = dossier_cache_cartes
+
+    def set_fov(self, fov: float) -> None:
+        """Change le fov du jeu
+
+        Args:
+            fov (float): nouveau fov du jeu
+        """
+        self.fov = fov
+
+    def set_frequence_rendu(self, frequence_rendu: float) -> None:
+        """Change le nombre maximum de rendus par seconde
+
+        Args:
+            frequence_rendu (float): nouveau nombre maximum de rendus par seconde, None pour ne pas limiter le rendu
+        """
+        assert frequence_rendu == None or frequence_rendu > 0, ("Structure de base : la fréquence de rendu doit être positive.")
+        self.frequence_rendu = frequence_rendu
+
+    def set_frequence_simulation(self, frequence_simulation: float) -> None:
+        """Change le nombre d'étapes de simulation par seconde
+
+        Args:
+            frequence_simulation (float): nouveau nombre d'étapes de simulation par seconde
+        """
+        assert frequence_simulation > 0, ("Structure de base : la fréquence de simulation doit être positive.")
+        self.frequence_simulation = frequence_simulation
+
+    def set_mode_travailleurs_rendu(self, mode_travailleurs_rendu: str) -> None:
+        """Change le type des travailleurs du rendu
+
+        Args:
+            mode_travailleurs_rendu (str): "fils" (fils d'exécution) ou "processus" (processus et mémoire partagée)
+        """
+        assert mode_travailleurs_rendu in ("fils", "processus"), ("Structure de base : le type de travailleurs \"" + str(mode_travailleurs_rendu) + "\" n'existe pas.")
+        self.mode_travailleurs_rendu = mode_travailleurs_rendu
+
+    def set_nb_etapes_rattrapage(self, nb_etapes_rattrapage: int) -> None:
+        """Change le nombre maximum d'étapes de simulation par rendu pour rattraper le retard
+
+        Args:
+            nb_etapes_rattrapage (int): nouveau nombre maximum d'étapes de simulation par rendu
+        """
+        assert nb_etapes_rattrapage > 0, ("Structure de base : le nombre d'étapes de rattrapage doit être positif.")
+        self.nb_etapes_rattrapage = nb_etapes_rattrapage
+
+    def set_nb_rayons_visibilite(self, nb_rayons_visibilite: int) -> None:
+        """Change le nombre de rayons lancés depuis chaque coin de cellule pour calculer le PVS d'une carte
+
+        Args:
+            nb_rayons_visibilite (int): nouveau nombre de rayons
+        """
+        assert nb_rayons_visibilite > 0, ("Structure de base : le nombre de rayons de visibilité doit être positif.")
+        self.nb_rayons_visibilite = nb_rayons_visibilite
+
+    def set_nb_travailleurs_rendu(self, nb_travailleurs_rendu: int) -> None:
+        """Change le nombre de travailleurs se partageant les colonnes du rendu en simili-3D
+
+        Args:
+            nb_travailleurs_rendu (int): nouveau nombre de travailleurs, 1 pour un rendu sans parallélisme
+        """
+        assert nb_travailleurs_rendu > 0, ("Structure de base : le nombre de travailleurs du rendu doit être positif.")
+        self.nb_travailleurs_rendu = nb_travailleurs_rendu
+
+    def set_seuil_fragmentation(self, seuil_fragmentation: int) -> None:
+        """Change le nombre de cellules à partir duquel une carte compilée est lue en fragments
+
+        Args:
+            seuil_fragmentation (int): nouveau nombre de cellules, None pour ne jamais fragmenter
+        """
+        self.seuil_fragmentation = seuil_fragmentation
+
+    def set_taille_fragments(self, taille_fragments: int) -> None:
+        """Change le côté d'un fragment de carte, pour les prochaines cartes lues
+
+        Args:
+            taille_fragments (int): nouveau côté d'un fragment, en cellules
+        """
+        assert taille_fragments > 0, ("Structure de base : la taille des fragments doit être positive.")
+        self.taille_fragments = taille_fragments
+
+    def set_touches_actions(self, touches_actions: dict) -> None:
+        """Change l'action associée à chaque code de touche
+
+        Args:
+            touches_actions (dict): actions, de clé le code de leur touche
+        """
+        self.touches_actions = touches_actions
@@ -0,0 +1,220 @@
+#-------------------------------------
+#             Texture.py
+#-------------------------------------
+
+# Fichier contenant le chargement des textures des murs.
+# Informations importantes :
+# -Chaque texture est mise à une taille commune puis découpée en colonnes au chargement.
+# -L'opacité de chaque texel est gardée à part (alpha de l'image au moins à 128), pour les sprites dont le fond est transparent.
+# -Les colonnes mises à l'échelle pour le rendu par rectangles sont gardées dans un cache borné,
+#  avec des hauteurs arrondies pour que des murs de hauteurs proches partagent la même colonne.
+
+# Importer les librairies
+from collections import OrderedDict
+import numpy as np
+import os
+import pygame as pg
+
+class Texture:
+    """Classe représentant une texture découpée en colonnes
+    """
+
+    def __init__(self, nom: str, surface: pg.Surface, alpha: pg.Surface = None) -> None:
+        """Créer une texture
+
+        Args:
+            nom (str): nom de la texture
+            surface (pg.Surface): image de la texture, déjà à la taille commune
+            alpha (pg.Surface, optionnel): image d'origine à la taille commune, avec son canal alpha, texture entièrement opaque si None
+        """
+        self.colonnes = [surface.subsurface((u, 0, 1, surface.get_height())) for u in range(surface.get_width())] # Colonnes de la texture
+        self.nom = nom # Nom de la texture
+        self.opacites = pg.surfarray.array_alpha(alpha) >= 128 if alpha != None else np.ones((surface.get_width(), surface.get_height()), dtype=bool) # Si chaque texel est opaque, indexés [u, v]
+        self.pixels = pg.surfarray.array2d(surface) # Pixels de la texture, au format de la surface, indexés [u, v]
+        self.surface = surface # Image de la texture
+
+    def get_colonne(self, u: int) -> pg.Surface:
+        """Retourne une colonne de la texture
+
+        Args:
+            u (int): indice de la colonne
+
+        Returns:
+            pg.Surface: colonne de la texture, d'un pixel de large
+        """
+        return self.colonnes[u]
+
+    def get_nom(self) -> str:
+        """Retourne le nom de la texture
+
+        Returns:
+            str: nom de la texture
+        """
+        return self.nom
+
+    def get_opacites(self) -> np.ndarray:
+        """Retourne si chaque texel de la texture est opaque
+
+        Returns:
+            np.ndarray: opacité de chaque texel, indexée [u, v]
+        """
+        return self.opacites
+
+    def get_pixels(self) -> np.ndarray:
+        """Retourne les pixels de la texture
+
+        Returns:
+            np.ndarray: pixels de la texture, indexés [u, v]
+        """
+        return self.pixels
+
+class Gestionnaire_Textures:
+    """Classe représentant un gestionnaire des textures d'une scène graphique
+    """
+
+    def __init__(self, format_surface: pg.Surface, dossier: str = "textures", taille: int = 64, pas_hauteur: int = 2, hauteur_max: int = 2048, taille_cache: int = 4096) -> None:
+        """Créer un gestionnaire de textures
+
+        Args:
+            format_surface (pg.Surface): surface dont le format de pixel est utilisé pour les textures
+            dossier (str, optionnel): dossier contenant les textures, par défaut à "textures"
+            taille (int, optionnel): taille commune des textures en pixels, par défaut à 64
+            pas_hauteur (int, optionnel): arrondi des hauteurs des colonnes mises à l'échelle, par défaut à 2
+            hauteur_max (int, optionnel): hauteur maximum d'une colonne mise à l'échelle, par défaut à 2048
+            taille_cache (int, optionnel): nombre maximum de colonnes mises à l'échelle gardées, par défaut à 4096
+        """
+        self.cache_colonnes = OrderedDict() # Colonnes mises à l'échelle, de la moins à la plus récemment utilisée
+        self.couleurs = np.zeros((0, taille, taille, 3), dtype=np.uint8) # Couleurs de toutes les textures, indexées [texture, u, v, canal], pour la palette
+        self.dossier = dossier # Dossier contenant les textures
+        self.format_surface = format_surface # Surface donnant le format de pixel des textures
+        self.hauteur_max = hauteur_max # Hauteur maximum d'une colonne mise à l'échelle
+        self.indices = {} # Indice de chaque texture dans la pile, de clé son nom
+        self.opacites = np.zeros((0, taille, taille), dtype=bool) # Opacité des texels de toutes les textures, indexée [texture, u, v]
+        self.pas_hauteur = pas_hauteur # Arrondi des hauteurs des colonnes mises à l'échelle
+        self.pile = np.zeros((0, taille, taille), dtype=np.uint32) # Pixels de toutes les textures, indexés [texture, u, v]
+        self.taille = taille # Taille commune des textures
+        self.taille_cache = taille_cache # Nombre maximum de colonnes mises à l'échelle gardées
+        self.textures = [] # Textures chargées
+
+    def get_colonne_mise_a_l_echelle(self, indice: int, u: int, hauteur: float, largeur: int) -> pg.Surface:
+        """Retourne une colonne de texture mise à l'échelle, depuis le cache si possible
+
+        Args:
+            indice (int): indice de la texture
+            u (int): indice de la colonne dans la texture
+            hauteur (float): hauteur voulue, arrondie au pas et bornée à la hauteur maximum
+            largeur (int): largeur voulue
+
+        Returns:
+            pg.Surface: colonne mise à l'échelle
+        """
+        hauteur = self.quantifier_hauteur(hauteur)
+        cle = (indice, u, hauteur, largeur)
+        colonne = self.cache_colonnes.get(cle)
+        if colonne == None: # Mettre la colonne à l'échelle et la garder
+            colonne = pg.transform.scale(self.get_texture(indice).get_colonne(u), (largeur, hauteur))
+            self.cache_colonnes[cle] = colonne
+            if len(self.cache_colonnes) > self.taille_cache: # Oublier la colonne la moins récemment utilisée
+                self.cache_colonnes.popitem(last = False)
+        else:
+            self.cache_colonnes.move_to_end(cle)
+        return colonne
+
+    def get_couleurs(self) -> np.ndarray:
+        """Retourne les couleurs de toutes les textures
+
+        Returns:
+            np.ndarray: couleurs des texels, indexées [texture, u, v, canal], dans le même ordre que la pile
+        """
+        return self.couleurs
+
+    def get_indice(self, nom: str) -> int:
+        """Retourne l'indice d'une texture, en la chargeant si besoin
+
+        Args:
+            nom (str): nom de la texture, sans extension
+
+        Returns:
+            int: indice de la texture dans la pile
+        """
+        if nom not in self.indices:
+            self.charger_texture(nom)
+        return self.indices[nom]
+
+    def get_opacites(self) -> np.ndarray:
+        """Retourne l'opacité des texels de toutes les textures
+
+        Returns:
+            np.ndarray: opacité des texels, indexée [texture, u, v], dans le même ordre que la pile
+        """
+        return self.opacites
+
+    def get_pile(self) -> np.ndarray:
+        """Retourne les pixels de toutes les textures
+
+        Returns:
+            np.ndarray: pixels des textures, indexés [texture, u, v]
+        """
+        return self.pile
+
+    def get_taille(self) -> int:
+        """Retourne la taille commune des textures
+
+        Returns:
+            int: taille commune des textures en pixels
+        """
+        return self.taille
+
+    def get_texture(self, indice: int) -> Texture:
+        """Retourne une texture selon son indice
+
+        Args:
+            indice (int): indice de la texture
+
+        Returns:
+            Texture: texture
+        """
+        return self.textures[indice]
+
+    def charger_texture(self, nom: str) -> int:
+        """Charge une texture depuis le dossier des textures, ou la texture "inconnu" si elle n'existe pas
+
+        Args:
+            nom (str): nom de la texture, sans extension
+
+        Returns:
+            int: indice de la texture dans la pile
+        """
+        chemin = os.path.join(self.dossier, nom + ".png")
+        if not os.path.exists(chemin): chemin = os.path.join(self.dossier, "inconnu.png")
+
+        originale = pg.image.load(chemin)
+        alpha = None
+        if originale.get_flags() & pg.SRCALPHA: # Garder la transparence des sprites à part, puis poser l'image sur un fond opaque
+            alpha = pg.transform.scale(originale, (self.taille, self.taille))
+            opaque = pg.Surface(originale.get_size())
+            opaque.blit(originale, (0, 0))
+            originale = opaque
+        image = pg.transform.smoothscale(originale.convert(self.format_surface), (self.taille, self.taille))
+        surface = pg.Surface((self.taille, self.taille), 0, self.format_surface)
+        surface.blit(image, (0, 0))
+        texture = Texture(nom, surface, alpha)
+
+        self.textures.append(texture)
+        self.pile = np.concatenate((self.pile, texture.get_pixels()[None].astype(self.pile.dtype)))
+        self.opacites = np.concatenate((self.opacites, texture.get_opacites()[None]))
+        self.couleurs = np.concatenate((self.couleurs, pg.surfarray.array3d(surface)[None]))
+        self.indices[nom] = len(self.textures) - 1
+        return self.indices[nom]
+
+    def quantifier_hauteur(self, hauteur: float) -> int:
+        """Retourne une hauteur arrondie au pas et bornée à la hauteur maximum
+
+        Args:
+            hauteur (float): hauteur à arrondir
+
+        Returns:
+            int: hauteur arrondie
+        """
+        hauteur = int(round(hauteur / self.pas_hauteur)) * self.pas_hauteur
+        return min(max(hauteur, self.pas_hauteur), self.hauteur_max)
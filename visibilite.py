@@ -0,0 +1,613 @@
+#-------------------------------------
+#            Visibilite.py
+#-------------------------------------
+
+# Fichier contenant l'ensemble potentiellement visible (PVS) de chaque cellule vide d'une carte.
+# Informations importantes :
+# -Des rayons partent de chaque coin de cellule touchant une cellule vide, dans toutes les directions (avec le raycast par
+#  lot), et toutes les cellules traversées jusqu'au premier mur sont marquées visibles depuis les quatre cellules autour du
+#  coin, le mur compris. Chaque coin est partagé par quatre cellules : ses rayons ne sont lancés qu'une fois.
+# -Le PVS doit être conservateur (ne jamais cacher une cellule visible depuis un point quelconque de la cellule). Entre deux
+#  rayons voisins, des rayons sont ajoutés tant que le plus long s'écarte de l'autre de plus de ECART_RAYONS cellules, et de
+#  part et d'autre du coin de mur derrière lequel la longueur des rayons saute : les rayons ne se multiplient que là où ils vont
+#  loin. Les cellules voisines des cellules marquées le sont aussi, pour les cellules frôlées.
+# -Une vue entre deux cellules éloignées peut ne passer par aucun coin de l'une ou de l'autre, mais seulement entre deux coins
+#  de murs. Les rayons partis d'un coin de mur et frôlant un autre coin de mur sont donc prolongés derrière leur départ, et
+#  les cellules traversées derrière voient toutes celles traversées devant (voir marquer_droites).
+#  Voir verifier_pvs, qui compare le PVS à la ligne de vue exacte entre des points tirés au hasard.
+# -Les rayons des coins d'un bloc de cellules partent ensemble dans un seul raycast par lot (chacun depuis son départ), et les
+#  lignes sont compressées en bits bloc par bloc : seules les lignes d'un bloc existent en entier à la fois.
+# -La visibilité est ensuite rendue symétrique (si a voit b, b voit a), ce qui rattrape les cellules manquées par les rayons.
+#  Elle aussi est faite lot par lot, directement sur les lignes de bits.
+# -Chaque cellule vide a une ligne de bits, un bit par cellule de la carte (indice x * hauteur + y) : savoir si une cellule
+#  est visible depuis une autre ne coûte qu'une lecture de bit, sans raycast.
+# -Un fichier .pvs est écrit à côté de la carte, avec l'empreinte des murs de la carte : il est réutilisé tant que les murs ne
+#  changent pas. Sa taille est d'environ (nombre de cellules vides) * (nombre de cellules) / 8 octets.
+# -Le PVS est lu ou calculé avec la carte, au chargement de la scène (voir Scene.charger_pvs), jamais pendant le jeu.
+#  Une carte fragmentée n'a pas de PVS : elle n'est jamais chargée en entier.
+# -Utilisation en ligne de commande : python visibilite.py carte.cwad carte.pvs (affiche aussi le résultat de verifier_pvs)
+
+# Importer les librairies
+import format_carte as fc
+import hashlib
+import math
+import numpy as np
+import os
+import raycast as rc
+import struct
+import sys
+
+EN_TETE = struct.Struct("<4sHxxIIIII20s") # Signature, version, largeur, hauteur, nombre de rayons, nombre de cellules vides, octets par ligne, empreinte
+SIGNATURE = b"RPVS"
+VERSION = 2
+ANGLE_MINIMUM = 1e-3 # Écart angulaire sous lequel deux rayons voisins ne sont plus séparés, en radians
+ECART_RAYONS = 1 # Écart maximum entre deux rayons voisins au bout du plus long, en cellules
+OCTETS_LOT = 32 * 1024 * 1024 # Octets des lignes décompressées d'un lot de cellules
+RAYONS_PAR_LOT = 32768 # Nombre de rayons de départ lancés ensemble, qui fixe le nombre de cellules d'un lot
+PAIRES_LOT = 4 * 1024 * 1024 # Nombre de paires de cellules des droites traitées ensemble
+OCTETS_SYMETRIE = 16 * 1024 * 1024 # Octets lus dans toutes les lignes pour rendre un lot de lignes symétrique
+
+class Pvs:
+    """Classe représentant les cellules visibles depuis chaque cellule vide d'une carte
+    """
+
+    def __init__(self, taille: tuple, lignes: np.ndarray, bits: np.ndarray, empreinte: bytes, nb_rayons: int) -> None:
+        """Créer un ensemble potentiellement visible
+
+        Args:
+            taille (tuple): taille de la carte
+            lignes (np.ndarray): ligne de bits de chaque cellule, indexée [x, y], -1 pour un mur
+            bits (np.ndarray): cellules visibles depuis chaque cellule vide, une ligne d'octets par cellule vide
+            empreinte (bytes): empreinte des murs de la carte
+            nb_rayons (int): nombre de rayons lancés depuis chaque départ
+        """
+        self.bits = bits # Cellules visibles depuis chaque cellule vide, un bit par cellule de la carte
+        self.empreinte = empreinte # Empreinte des murs de la carte
+        self.lignes = lignes # Ligne de bits de chaque cellule, -1 pour un mur
+        self.nb_rayons = nb_rayons # Nombre de rayons lancés depuis chaque départ
+        self.taille = taille # Taille de la carte
+
+    def est_visible(self, depuis: tuple, cellule: tuple) -> bool:
+        """Retourne si une cellule est potentiellement visible depuis une position
+
+        Args:
+            depuis (tuple): position de l'observateur
+            cellule (tuple): cellule ou position à tester
+
+        Returns:
+            bool: si la cellule est potentiellement visible
+        """
+        return bool(self.sont_visibles(depuis, np.array([cellule[:2]], dtype=np.float64))[0])
+
+    def get_bits(self) -> np.ndarray:
+        """Retourne les lignes de bits des cellules vides
+
+        Returns:
+            np.ndarray: une ligne d'octets par cellule vide
+        """
+        return self.bits
+
+    def get_cellules_visibles(self, x: int, y: int) -> np.ndarray:
+        """Retourne les cellules potentiellement visibles depuis une cellule
+
+        Args:
+            x (int): coordonnée x de la cellule
+            y (int): coordonnée y de la cellule
+
+        Returns:
+            np.ndarray: masque des cellules visibles, indexé [x, y], tout visible depuis un mur ou hors de la carte
+        """
+        ligne = self.get_ligne(x, y)
+        if ligne < 0:
+            return np.ones(self.taille, dtype=bool)
+        return np.unpackbits(self.bits[ligne], count = self.taille[0] * self.taille[1]).astype(bool).reshape(self.taille)
+
+    def get_empreinte(self) -> bytes:
+        """Retourne l'empreinte des murs de la carte
+
+        Returns:
+            bytes: empreinte des murs
+        """
+        return self.empreinte
+
+    def get_ligne(self, x: int, y: int) -> int:
+        """Retourne la ligne de bits d'une cellule
+
+        Args:
+            x (int): coordonnée x de la cellule
+            y (int): coordonnée y de la cellule
+
+        Returns:
+            int: ligne de la cellule, -1 pour un mur ou hors de la carte
+        """
+        if x < 0 or y < 0 or x >= self.taille[0] or y >= self.taille[1]:
+            return -1
+        return int(self.lignes[x, y])
+
+    def get_lignes(self) -> np.ndarray:
+        """Retourne la ligne de bits de chaque cellule
+
+        Returns:
+            np.ndarray: lignes, indexées [x, y], -1 pour un mur
+        """
+        return self.lignes
+
+    def get_nb_rayons(self) -> int:
+        """Retourne le nombre de rayons lancés depuis chaque départ
+
+        Returns:
+            int: nombre de rayons
+        """
+        return self.nb_rayons
+
+    def get_taille(self) -> tuple:
+        """Retourne la taille de la carte
+
+        Returns:
+            tuple: taille de la carte
+        """
+        return self.taille
+
+    def sont_visibles(self, depuis: tuple, positions: np.ndarray) -> np.ndarray:
+        """Retourne si des positions sont potentiellement visibles depuis une position, une lecture de bit par position
+
+        Args:
+            depuis (tuple): position de l'observateur
+            positions (np.ndarray): positions à tester, de forme (n, 2) ou (n, 3)
+
+        Returns:
+            np.ndarray: masque des positions visibles, celles hors de la carte ne l'étant jamais
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(len(positions), -1)
+        ligne = self.get_ligne(math.floor(depuis[0]), math.floor(depuis[1]))
+        x = np.floor(positions[:, 0]).astype(np.intp)
+        y = np.floor(positions[:, 1]).astype(np.intp)
+        dans_carte = (x >= 0) & (y >= 0) & (x < self.taille[0]) & (y < self.taille[1])
+        if ligne < 0: # Observateur dans un mur ou hors de la carte : ne rien cacher
+            return dans_carte
+
+        retour = np.zeros(len(positions), dtype=bool)
+        indices = x[dans_carte] * self.taille[1] + y[dans_carte]
+        retour[dans_carte] = (self.bits[ligne, indices >> 3] >> (7 - (indices & 7))) & 1 != 0
+        return retour
+
+def angle_coin(occupation: np.ndarray, departs: np.ndarray, angles: np.ndarray, ecarts: np.ndarray, distances: np.ndarray, distances_droite: np.ndarray) -> np.ndarray:
+    """Retourne, pour des intervalles entre deux rayons, l'angle du coin du mur touché par le rayon le plus court derrière
+    lequel passe le rayon le plus long
+
+    Args:
+        occupation (np.ndarray): carte d'occupation indexée [x, y], vraie là où se trouve un mur
+        departs (np.ndarray): départ de chaque intervalle, de forme (n, 2)
+        angles (np.ndarray): angle du rayon gauche de chaque intervalle, en radians
+        ecarts (np.ndarray): angle entre les deux rayons de chaque intervalle, en radians
+        distances (np.ndarray): longueur du rayon gauche de chaque intervalle
+        distances_droite (np.ndarray): longueur du rayon droit de chaque intervalle
+
+    Returns:
+        np.ndarray: angle du coin depuis le rayon gauche, nan si aucun coin ne tombe assez loin des deux rayons
+    """
+    largeur, hauteur = occupation.shape
+    gauche_proche = distances < distances_droite
+    angles_proches = np.where(gauche_proche, angles, angles + ecarts)
+    vecteurs = np.stack((np.cos(angles_proches), np.sin(angles_proches)), axis = 1)
+    murs = np.floor(departs + (np.minimum(distances, distances_droite) + 1e-6)[:, None] * vecteurs).astype(np.intp)
+    dans_carte = (murs[:, 0] >= 0) & (murs[:, 1] >= 0) & (murs[:, 0] < largeur) & (murs[:, 1] < hauteur)
+    dans_carte[dans_carte] = occupation[murs[dans_carte, 0], murs[dans_carte, 1]]
+    coins = murs[:, None, :] + np.array(((0, 0), (1, 0), (0, 1), (1, 1)))
+    relatifs = np.mod(np.arctan2(coins[..., 1] - departs[:, None, 1], coins[..., 0] - departs[:, None, 0]) - angles[:, None], 2 * math.pi)
+    marge = ANGLE_MINIMUM / 2
+    dedans = (relatifs > marge) & (relatifs < ecarts[:, None] - marge) & dans_carte[:, None]
+
+    # Le coin qui cache le rayon le plus long est le plus proche de lui
+    angles_coins = np.where(gauche_proche, np.where(dedans, relatifs, -np.inf).max(axis = 1), np.where(dedans, relatifs, np.inf).min(axis = 1))
+    return np.where(np.isfinite(angles_coins), angles_coins, np.nan)
+
+def calculer_pvs(occupation: np.ndarray, nb_rayons: int = 64) -> Pvs:
+    """Calcule les cellules potentiellement visibles depuis chaque cellule vide d'une carte
+
+    Args:
+        occupation (np.ndarray): carte d'occupation indexée [x, y], non nulle là où se trouve un mur, entièrement en mémoire
+        nb_rayons (int, optionnel): nombre de rayons de départ depuis chaque coin de cellule, resserrés ensuite là où ils
+                                    s'écartent, par défaut à 64
+
+    Returns:
+        Pvs: cellules visibles depuis chaque cellule vide
+    """
+    assert isinstance(occupation, np.ndarray), ("Visibilite : le PVS ne se calcule que sur une carte en mémoire, pas sur une carte fragmentée.")
+    occupation = occupation != 0
+    largeur, hauteur = occupation.shape
+    vides = np.argwhere(~occupation)
+    lignes = np.full((largeur, hauteur), -1, dtype=np.int32)
+    lignes[vides[:, 0], vides[:, 1]] = np.arange(len(vides), dtype=np.int32)
+    bits = np.zeros((len(vides), (largeur * hauteur + 7) // 8), dtype=np.uint8)
+
+    # Blocs carrés de cellules, dont les (cote + 1) ** 2 coins ont chacun leur masque décompressé
+    cote = max(min(int((OCTETS_LOT // (largeur * hauteur)) ** 0.5) - 1, int((RAYONS_PAR_LOT // nb_rayons) ** 0.5) - 1), 1)
+    for x0 in range(0, largeur, cote):
+        for y0 in range(0, hauteur, cote):
+            bloc = ~occupation[x0:x0 + cote, y0:y0 + cote]
+            if not bloc.any():
+                continue
+            visibles, droites = cellules_visibles_bloc(occupation, x0, y0, bloc.shape, nb_rayons)
+            cellules = np.argwhere(bloc)
+            rangs = lignes[cellules[:, 0] + x0, cellules[:, 1] + y0]
+            bits[rangs] |= np.packbits(visibles[cellules[:, 0], cellules[:, 1]].reshape(len(cellules), -1), axis = 1)
+            marquer_droites(bits, lignes, occupation, *droites)
+
+    rendre_symetrique(bits, vides[:, 0] * hauteur + vides[:, 1])
+    return Pvs((largeur, hauteur), lignes, bits, empreinte_occupation(occupation), nb_rayons)
+
+def cellules_rayons(occupation: np.ndarray, origines: np.ndarray, vecteurs: np.ndarray, debuts: np.ndarray, distances: np.ndarray) -> tuple:
+    """Retourne les cellules traversées par des rayons entre deux distances : chaque passage d'une ligne de la grille touche
+    les deux cellules de part et d'autre
+
+    Args:
+        occupation (np.ndarray): carte d'occupation indexée [x, y], vraie là où se trouve un mur
+        origines (np.ndarray): départ de chaque rayon, de forme (n, 2)
+        vecteurs (np.ndarray): direction de chaque rayon, de forme (n, 2)
+        debuts (np.ndarray): distance à partir de laquelle chaque rayon compte
+        distances (np.ndarray): longueur de chaque rayon
+
+    Returns:
+        tuple: rayon, x et y de chaque cellule traversée, les passages de tous les rayons étant mis bout à bout
+    """
+    largeur, hauteur = occupation.shape
+    retour = [], [], []
+    for axe in (0, 1):
+        autre = 1 - axe
+        bougent = np.flatnonzero(vecteurs[:, axe] != 0)
+        if len(bougent) == 0:
+            continue
+        composantes = vecteurs[bougent, axe]
+        depart = origines[bougent, axe]
+        limites = distances[bougent] + 1e-9
+        depart_marque = depart + np.maximum(debuts[bougent], 0) * composantes
+        premieres = np.where(composantes > 0, np.floor(depart_marque) + 1, np.floor(depart_marque)) # Première ligne croisée après le début
+        nb_lignes = np.maximum(np.floor(limites * np.abs(composantes) - np.abs(premieres - depart)).astype(np.intp) + 2, 0) # Une ligne de plus que nécessaire, écartée ensuite
+        rayons = np.repeat(np.arange(len(bougent)), nb_lignes)
+        numeros = np.arange(len(rayons)) - np.repeat(np.cumsum(nb_lignes) - nb_lignes, nb_lignes) # Rang de chaque ligne croisée par son rayon
+        lignes = premieres[rayons] + np.sign(composantes[rayons]) * numeros
+        t = (lignes - depart[rayons]) / composantes[rayons]
+        croisent = np.flatnonzero(t <= limites[rayons])
+        rayons = bougent[rayons[croisent]]
+        lignes = lignes[croisent].astype(np.intp)
+        autres = np.floor(origines[rayons, autre] + t[croisent] * vecteurs[rayons, autre]).astype(np.intp)
+        taille_axe, taille_autre = (largeur, hauteur) if axe == 0 else (hauteur, largeur)
+        for cote in (lignes - 1, lignes):
+            valides = (cote >= 0) & (autres >= 0) & (cote < taille_axe) & (autres < taille_autre)
+            retour[0].append(rayons[valides])
+            retour[1 + axe].append(cote[valides])
+            retour[2 - axe].append(autres[valides])
+    if len(retour[0]) == 0:
+        return tuple(np.zeros(0, dtype=np.intp) for _ in range(3))
+    return tuple(np.concatenate(valeurs) for valeurs in retour)
+
+def cellules_visibles_bloc(occupation: np.ndarray, x0: int, y0: int, taille: tuple, nb_rayons: int) -> tuple:
+    """Retourne les cellules vues depuis chaque cellule d'un bloc, l'union de ce que voient ses quatre coins (partagés avec les
+    cellules voisines) dilatée d'une cellule, et les droites passant par deux coins de murs trouvées depuis les coins du bloc
+
+    Args:
+        occupation (np.ndarray): carte d'occupation indexée [x, y], vraie là où se trouve un mur
+        x0 (int): coordonnée x de la première cellule du bloc
+        y0 (int): coordonnée y de la première cellule du bloc
+        taille (tuple): nombre de cellules du bloc sur chaque axe
+        nb_rayons (int): nombre de rayons de départ depuis chaque coin
+
+    Returns:
+        tuple: masques des cellules visibles, de forme (taille[0], taille[1], largeur, hauteur), et droites (voir marquer_droites)
+    """
+    largeur, hauteur = occupation.shape
+    coins = np.argwhere(np.ones((taille[0] + 1, taille[1] + 1), dtype=bool)) + (x0, y0)
+    bordes = np.zeros(len(coins), dtype=bool) # Si chaque coin touche une cellule vide
+    sommets = np.zeros(len(coins), dtype=bool) # Si chaque coin est aussi le coin d'un mur
+    for dx in (-1, 0):
+        for dy in (-1, 0):
+            x, y = coins[:, 0] + dx, coins[:, 1] + dy
+            dans_carte = (x >= 0) & (y >= 0) & (x < largeur) & (y < hauteur)
+            bordes[dans_carte] |= ~occupation[x[dans_carte], y[dans_carte]]
+            sommets[dans_carte] |= occupation[x[dans_carte], y[dans_carte]]
+    masques = np.zeros((len(coins), largeur, hauteur), dtype=bool)
+    droites = marquer_cellules_visibles(masques, occupation, coins[bordes].astype(np.float64), np.flatnonzero(bordes), sommets[bordes], nb_rayons)
+
+    # Chaque cellule réunit les masques de ses quatre coins
+    masques = masques.reshape(taille[0] + 1, taille[1] + 1, largeur, hauteur)
+    visibles = masques[:-1, :-1] | masques[1:, :-1] | masques[:-1, 1:] | masques[1:, 1:]
+    visibles[np.arange(taille[0])[:, None], np.arange(taille[1])[None, :], np.arange(taille[0])[:, None] + x0, np.arange(taille[1])[None, :] + y0] = True
+    dilater(visibles.reshape(-1, largeur, hauteur))
+    return visibles, droites
+
+def charger_pvs(chemin: str, occupation: np.ndarray, nb_rayons: int = 64) -> Pvs:
+    """Lit le PVS d'une carte s'il est à jour, sinon le calcule et l'écrit
+
+    Args:
+        chemin (str): chemin d'accés vers le fichier .pvs, rien n'est lu ni écrit si None
+        occupation (np.ndarray): carte d'occupation indexée [x, y], non nulle là où se trouve un mur
+        nb_rayons (int, optionnel): nombre de rayons de départ depuis chaque coin de cellule, par défaut à 64
+
+    Returns:
+        Pvs: cellules visibles depuis chaque cellule vide
+    """
+    if chemin != None and os.path.exists(chemin) and lire_en_tete(chemin)[1] == VERSION: # Un PVS d'une autre version est recalculé
+        pvs = lire_pvs(chemin)
+        if pvs.get_empreinte() == empreinte_occupation(occupation) and pvs.get_nb_rayons() == nb_rayons: # Les murs n'ont pas changé
+            return pvs
+
+    pvs = calculer_pvs(occupation, nb_rayons)
+    if chemin != None:
+        try:
+            ecrire_pvs(chemin, pvs)
+        except OSError: # Un PVS impossible à écrire sera recalculé la prochaine fois
+            pass
+    return pvs
+
+def dilater(visibles: np.ndarray) -> None:
+    """Marque aussi les huit voisines de chaque cellule marquée
+
+    Args:
+        visibles (np.ndarray): masques des cellules visibles, de forme (nb_cellules, largeur, hauteur), modifiés sur place
+    """
+    for axe in (1, 2):
+        copie = visibles.copy()
+        avant, apres = [slice(None)] * 3, [slice(None)] * 3
+        avant[axe], apres[axe] = slice(None, -1), slice(1, None)
+        visibles[tuple(apres)] |= copie[tuple(avant)]
+        visibles[tuple(avant)] |= copie[tuple(apres)]
+
+def ecrire_pvs(chemin: str, pvs: Pvs) -> None:
+    """Écrit un PVS dans un fichier
+
+    Args:
+        chemin (str): chemin d'accés vers le fichier à écrire
+        pvs (Pvs): PVS à écrire
+    """
+    bits = pvs.get_bits()
+    en_tete = EN_TETE.pack(SIGNATURE, VERSION, pvs.get_taille()[0], pvs.get_taille()[1], pvs.get_nb_rayons(), len(bits), bits.shape[1], pvs.get_empreinte())
+    lignes = np.ascontiguousarray(pvs.get_lignes(), dtype="<i4").tobytes()
+    remplissage = -(EN_TETE.size + len(lignes)) % 16 # Aligner les bits
+    fc.ecrire_fichier(chemin, (en_tete, lignes, bytes(remplissage), np.ascontiguousarray(bits).tobytes()))
+
+def empreinte_occupation(occupation: np.ndarray) -> bytes:
+    """Retourne l'empreinte des murs d'une carte, qui change dès qu'un mur est ajouté ou retiré
+
+    Args:
+        occupation (np.ndarray): carte d'occupation indexée [x, y], non nulle là où se trouve un mur
+
+    Returns:
+        bytes: empreinte SHA-1 des murs et de la taille de la carte
+    """
+    occupation = np.asarray(occupation)
+    return hashlib.sha1(struct.pack("<II", *occupation.shape) + np.packbits(occupation != 0).tobytes()).digest()
+
+def lire_en_tete(chemin: str) -> tuple:
+    """Lit l'en-tête d'un fichier .pvs
+
+    Args:
+        chemin (str): chemin d'accés vers le fichier .pvs
+
+    Returns:
+        tuple: signature, version, largeur, hauteur, nombre de rayons, nombre de cellules vides, octets par ligne et empreinte
+    """
+    fichier = open(chemin, "rb")
+    en_tete = fichier.read(EN_TETE.size)
+    fichier.close()
+    if len(en_tete) < EN_TETE.size: return (b"", 0, 0, 0, 0, 0, 0, b"")
+    return EN_TETE.unpack(en_tete)
+
+def lire_pvs(chemin: str) -> Pvs:
+    """Lit un PVS écrit par ecrire_pvs, les bits étant projetés en mémoire sans copie
+
+    Args:
+        chemin (str): chemin d'accés vers le fichier .pvs
+
+    Returns:
+        Pvs: PVS lu
+    """
+    signature, version, largeur, hauteur, nb_rayons, nb_vides, octets_ligne, empreinte = lire_en_tete(chemin)
+    assert signature == SIGNATURE, ("Visibilite : le fichier \"" + chemin + "\" n'est pas un PVS.")
+    assert version == VERSION, ("Visibilite : le PVS \"" + chemin + "\" a une version non supportée (" + str(version) + ").")
+    fichier = open(chemin, "rb")
+    fichier.seek(EN_TETE.size)
+    lignes = np.frombuffer(fichier.read(largeur * hauteur * 4), dtype="<i4").reshape((largeur, hauteur)).astype(np.int32)
+    fichier.close()
+
+    position_bits = EN_TETE.size + largeur * hauteur * 4
+    position_bits += -position_bits % 16
+    bits = np.memmap(chemin, dtype=np.uint8, mode="r", offset=position_bits, shape=(nb_vides, octets_ligne)) if nb_vides > 0 else np.zeros((0, octets_ligne), dtype=np.uint8)
+    return Pvs((largeur, hauteur), lignes, bits, empreinte, nb_rayons)
+
+def longueurs_rayons(occupation: np.ndarray, origines: np.ndarray, vecteurs: np.ndarray) -> np.ndarray:
+    """Retourne la longueur de rayons jusqu'au premier mur, ou jusqu'au bord de la carte
+
+    Args:
+        occupation (np.ndarray): carte d'occupation indexée [x, y], vraie là où se trouve un mur
+        origines (np.ndarray): départ de chaque rayon, de forme (n, 2)
+        vecteurs (np.ndarray): direction de chaque rayon, de forme (n, 2)
+
+    Returns:
+        np.ndarray: longueur de chaque rayon
+    """
+    distances = rc.ray_cast_batch(occupation, origines + 1e-9 * vecteurs, vecteurs).get_distances() + 1e-9 # Partir d'un sommet de la grille vers la cellule où va le rayon
+    with np.errstate(divide="ignore", invalid="ignore"): # Un rayon qui sort de la carte s'arrête à son bord
+        for axe, taille in enumerate(occupation.shape):
+            sortie = np.where(vecteurs[:, axe] > 0, (taille - origines[:, axe]) / vecteurs[:, axe], np.where(vecteurs[:, axe] < 0, -origines[:, axe] / vecteurs[:, axe], np.inf))
+            distances = np.minimum(distances, sortie)
+    return distances
+
+def marquer_cellules_visibles(masques: np.ndarray, occupation: np.ndarray, departs: np.ndarray, rangs: np.ndarray, sommets: np.ndarray, nb_rayons: int) -> tuple:
+    """Marque les cellules vues depuis plusieurs points, en ajoutant des rayons entre deux rayons voisins trop écartés
+
+    Args:
+        masques (np.ndarray): masques des cellules visibles, de forme (n, largeur, hauteur), modifiés sur place
+        occupation (np.ndarray): carte d'occupation indexée [x, y], vraie là où se trouve un mur
+        departs (np.ndarray): points de départ, de forme (nb_departs, 2)
+        rangs (np.ndarray): masque de chaque point de départ
+        sommets (np.ndarray): si chaque point de départ est le coin d'un mur
+        nb_rayons (int): nombre de rayons de départ depuis chaque point
+
+    Returns:
+        tuple: départ, angle et longueur des rayons partis d'un coin de mur et frôlant un autre coin de mur
+    """
+    ecart = 2 * math.pi / nb_rayons
+    origines = np.repeat(np.arange(len(departs)), nb_rayons) # Départ de chaque rayon
+    angles = np.tile(np.arange(nb_rayons) * ecart, len(departs))
+    distances = marquer_rayons(masques, occupation, departs[origines], angles, rangs[origines], np.zeros(len(angles)))
+
+    # Chaque intervalle va d'un rayon (gauche) au rayon suivant du même départ (droite), et est coupé tant que ses rayons
+    # s'écartent de plus de ECART_RAYONS au bout du plus long (en son milieu), ou qu'un coin de mur peut cacher une ouverture
+    # entre eux (de part et d'autre de ce coin)
+    distances_droite = np.roll(distances.reshape(len(departs), nb_rayons), -1, axis = 1).reshape(-1)
+    ecarts = np.full(len(angles), ecart)
+    droites = [np.zeros((0, 2))], [np.zeros(0)], [np.zeros(0)]
+    while True:
+        discontinus = (np.abs(distances - distances_droite) > ECART_RAYONS) & (ecarts > ANGLE_MINIMUM)
+        a_couper = np.flatnonzero((np.maximum(distances, distances_droite) * ecarts > ECART_RAYONS) | discontinus)
+        if len(a_couper) == 0:
+            break
+        origines, angles, ecarts = origines[a_couper], angles[a_couper], ecarts[a_couper]
+        distances, distances_droite = distances[a_couper], distances_droite[a_couper]
+        coins = angle_coin(occupation, departs[origines], angles, ecarts, distances, distances_droite)
+        coins[~discontinus[a_couper]] = np.nan
+        par_coin = ~np.isnan(coins)
+
+        # Un rayon au milieu, ou deux rayons de part et d'autre du coin
+        coupes = np.where(par_coin, coins - ANGLE_MINIMUM / 4, ecarts / 2)
+        couverts = np.where(par_coin, 0, np.minimum(np.minimum(distances, distances_droite), 2 * ECART_RAYONS / ecarts) - 1) # Longueur déjà couverte par les deux voisins, une fois dilatés
+        distances_coupes = marquer_rayons(masques, occupation, departs[origines], angles + coupes, rangs[origines], couverts)
+        bis = np.flatnonzero(par_coin)
+        coupes_bis = coins[bis] + ANGLE_MINIMUM / 4
+        distances_bis = marquer_rayons(masques, occupation, departs[origines[bis]], angles[bis] + coupes_bis, rangs[origines[bis]], np.zeros(len(bis)))
+        dernieres, distances_dernieres = coupes.copy(), distances_coupes.copy() # Dernier rayon ajouté dans chaque intervalle
+        dernieres[bis], distances_dernieres[bis] = coupes_bis, distances_bis
+
+        # Le plus long des deux rayons autour d'un coin passe ce coin : s'il part lui-même d'un coin, il suit une droite libre
+        # passant par deux coins de murs, qui peut être la seule vue entre deux cellules éloignées
+        frolants = sommets[origines[bis]]
+        longs = distances_bis > distances_coupes[bis]
+        droites[0].append(departs[origines[bis[frolants]]])
+        droites[1].append((angles[bis] + np.where(longs, coupes_bis, coupes[bis]))[frolants])
+        droites[2].append(np.maximum(distances_bis, distances_coupes[bis])[frolants])
+
+        # Intervalles de gauche, de droite, et entre les deux rayons autour d'un coin
+        origines = np.concatenate((origines, origines, origines[bis]))
+        angles, ecarts = np.concatenate((angles, angles + dernieres, angles[bis] + coupes[bis])), np.concatenate((coupes, ecarts - dernieres, coupes_bis - coupes[bis]))
+        distances, distances_droite = np.concatenate((distances, distances_dernieres, distances_coupes[bis])), np.concatenate((distances_coupes, distances_droite, distances_bis))
+    return tuple(np.concatenate(valeurs) for valeurs in droites)
+
+def marquer_droites(bits: np.ndarray, lignes: np.ndarray, occupation: np.ndarray, origines: np.ndarray, angles: np.ndarray, distances: np.ndarray) -> None:
+    """Rend visibles depuis les cellules traversées derrière le départ de droites libres celles traversées devant
+
+    Args:
+        bits (np.ndarray): une ligne d'octets par cellule vide, modifiée sur place
+        lignes (np.ndarray): ligne de bits de chaque cellule, indexée [x, y], -1 pour un mur
+        occupation (np.ndarray): carte d'occupation indexée [x, y], vraie là où se trouve un mur
+        origines (np.ndarray): point de chaque droite, de forme (n, 2)
+        angles (np.ndarray): angle de chaque droite, en radians
+        distances (np.ndarray): longueur libre de chaque droite devant son point
+    """
+    hauteur = occupation.shape[1]
+    vecteurs = np.stack((np.cos(angles), np.sin(angles)), axis = 1)
+    zeros = np.zeros(len(angles))
+    cotes = [] # Droite et cellule de chaque cellule traversée, triées par droite, devant puis derrière
+    for sens, longueurs in ((1, distances), (-1, longueurs_rayons(occupation, origines, -vecteurs))):
+        droites, x, y = cellules_rayons(occupation, origines, sens * vecteurs, zeros, longueurs)
+        cellules = np.unique(droites * occupation.size + x * hauteur + y)
+        cotes.append((cellules // occupation.size, cellules % occupation.size))
+    (droites_avant, avant), (droites_arriere, arriere) = cotes
+
+    # Chaque cellule de derrière voit toutes les cellules de devant de sa droite, par paquets de paires
+    nb_avant = np.bincount(droites_avant, minlength = len(angles))
+    debuts_avant = np.cumsum(nb_avant) - nb_avant
+    repetitions = nb_avant[droites_arriere]
+    cumul = np.cumsum(repetitions.astype(np.int64))
+    debut = 0
+    while debut < len(arriere):
+        fin = max(int(np.searchsorted(cumul, cumul[debut] - repetitions[debut] + PAIRES_LOT, side = "right")), debut + 1)
+        paquet = repetitions[debut:fin]
+        rangs = np.repeat(lignes.reshape(-1)[arriere[debut:fin]], paquet)
+        decalages = np.arange(paquet.sum()) - np.repeat(np.cumsum(paquet) - paquet, paquet)
+        vers = avant[np.repeat(debuts_avant[droites_arriere[debut:fin]], paquet) + decalages]
+        vides = rangs >= 0
+        rangs, vers = rangs[vides], vers[vides]
+        np.bitwise_or.at(bits, (rangs, vers >> 3), (0x80 >> (vers & 7)).astype(np.uint8))
+        debut = fin
+
+def marquer_rayons(visibles: np.ndarray, occupation: np.ndarray, origines: np.ndarray, angles: np.ndarray, rangs: np.ndarray, debuts: np.ndarray) -> np.ndarray:
+    """Marque les cellules traversées par des rayons jusqu'au premier mur, mur compris, et retourne leur longueur
+
+    Args:
+        visibles (np.ndarray): masques des cellules visibles, de forme (nb_cellules, largeur, hauteur), modifiés sur place
+        occupation (np.ndarray): carte d'occupation indexée [x, y], vraie là où se trouve un mur
+        origines (np.ndarray): départ de chaque rayon, de forme (n, 2)
+        angles (np.ndarray): angle de chaque rayon, en radians
+        rangs (np.ndarray): masque de visibles de chaque rayon
+        debuts (np.ndarray): distance à partir de laquelle chaque rayon marque, le début étant déjà marqué par ses voisins
+
+    Returns:
+        np.ndarray: longueur de chaque rayon, arrêté au bord de la carte
+    """
+    vecteurs = np.stack((np.cos(angles), np.sin(angles)), axis = 1)
+    distances = longueurs_rayons(occupation, origines, vecteurs)
+    rayons, x, y = cellules_rayons(occupation, origines, vecteurs, debuts, distances)
+    visibles[rangs[rayons], x, y] = True
+    return distances
+
+def rendre_symetrique(bits: np.ndarray, colonnes: np.ndarray) -> None:
+    """Rend la visibilité symétrique entre cellules vides, lot de lignes par lot de lignes, sans décompresser toutes les lignes
+
+    Args:
+        bits (np.ndarray): une ligne d'octets par cellule vide, modifiée sur place
+        colonnes (np.ndarray): indice x * hauteur + y de la cellule de chaque ligne
+    """
+    taille_lot = max(OCTETS_SYMETRIE // max(len(bits), 1), 1)
+    for debut in range(0, len(bits), taille_lot):
+        fin = min(debut + taille_lot, len(bits))
+        colonnes_lot = colonnes[debut:fin]
+        vues = (bits[:, colonnes_lot >> 3] >> (7 - (colonnes_lot & 7)).astype(np.uint8)) & 1 != 0 # Si chaque cellule vide voit chaque cellule du lot
+        lignes = np.unpackbits(bits[debut:fin], axis = 1).astype(bool)
+        lignes[:, colonnes] |= vues.T # Une ligne plus tard modifiée n'ajoute que des paires déjà symétriques
+        bits[debut:fin] = np.packbits(lignes, axis = 1)
+
+def verifier_pvs(pvs: Pvs, occupation: np.ndarray, nb_paires: int = 500, graine: int = 0) -> tuple:
+    """Compare un PVS à la ligne de vue exacte entre des paires de points tirés au hasard dans les cellules vides
+
+    Args:
+        pvs (Pvs): PVS à vérifier
+        occupation (np.ndarray): carte d'occupation indexée [x, y], non nulle là où se trouve un mur
+        nb_paires (int, optionnel): nombre de paires de points qui se voient à tester, par défaut à 500
+        graine (int, optionnel): graine du tirage des points, par défaut à 0
+
+    Returns:
+        tuple: nombre de paires qui se voient testées, et paires de points (depuis, vers) qui se voient mais que le PVS cache
+    """
+    occupation = np.asarray(occupation) != 0
+    generateur = np.random.default_rng(graine)
+    vides = np.argwhere(~occupation)
+    libres, manquees = 0, []
+    for _ in range(200 * nb_paires):
+        if libres >= nb_paires or len(vides) == 0:
+            break
+        depuis, vers = vides[generateur.integers(len(vides), size = 2)] + generateur.random((2, 2))
+
+        # La ligne de vue est libre si le milieu de chaque morceau du segment entre deux lignes de la grille est vide
+        coupures = [np.array((0.0, 1.0))]
+        for axe in (0, 1):
+            if depuis[axe] != vers[axe]:
+                lignes = np.arange(math.floor(min(depuis[axe], vers[axe])) + 1, math.ceil(max(depuis[axe], vers[axe])))
+                coupures.append((lignes - depuis[axe]) / (vers[axe] - depuis[axe]))
+        coupures = np.unique(np.concatenate(coupures))
+        milieux = np.floor(depuis + ((coupures[:-1] + coupures[1:]) / 2)[:, None] * (vers - depuis)).astype(np.intp)
+        if occupation[milieux[:, 0], milieux[:, 1]].any():
+            continue
+        libres += 1
+        if not pvs.sont_visibles(depuis, vers[None])[0]:
+            manquees.append((tuple(depuis), tuple(vers)))
+    return libres, manquees
+
+if __name__ == "__main__":
+    assert len(sys.argv) == 3, ("Utilisation : python visibilite.py carte.cwad carte.pvs")
+    carte_compilee = fc.lire_carte_compilee(sys.argv[1])
+    pvs_calcule = calculer_pvs(carte_compilee.get_tuiles())
+    ecrire_pvs(sys.argv[2], pvs_calcule)
+    print("PVS de " + str(len(pvs_calcule.get_bits())) + " cellules vides écrit dans \"" + sys.argv[2] + "\".")
+    libres, manquees = verifier_pvs(pvs_calcule, carte_compilee.get_tuiles())
+    print(str(len(manquees)) + " paires visibles cachées par le PVS, sur " + str(libres) + " paires de points qui se voient.")